@@ -0,0 +1,196 @@
+"""Benchmark code block extraction on large synthetic LLM responses.
+
+Compares the single-pass CodeBlockExtractor (whole text and streamed in
+small chunks) with the previous line-splitting implementation.
+
+Usage:
+    python benchmarks/bench_extract_code_blocks.py [--mb 4] [--repeat 3]
+"""
+
+import re
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from typing import Dict
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.tools.code_manager import extract_code_blocks, CodeBlockExtractor
+
+
+def legacy_extract_code_blocks(text: str) -> Dict[str, str]:
+    """Previous two-pass implementation of extract_code_blocks, kept for comparison.
+    
+    Expected format:
+    FILENAME
+    ```LANGUAGE
+    CODE
+    ```
+    
+    Args:
+        text: Text containing markdown code blocks
+        
+    Returns:
+        Dictionary mapping filename to code content
+    """
+    codes = {}
+    
+    # Pattern to match: filename (optional) followed by code block
+    # Matches: FILENAME\n```LANGUAGE\nCODE\n```
+    pattern = r'(?:^|\n)([A-Za-z0-9_\-\.\/]+\.(?:py|js|ts|java|cpp|c|html|css|json|yaml|yml|md|txt|sh|bat|ps1))(?:\n|$)(?:```(?:python|javascript|typescript|java|cpp|c|html|css|json|yaml|bash|shell|powershell|plaintext)?\n(.*?)```|```\n(.*?)```)'
+    
+    # Try more flexible line-by-line parsing
+    lines = text.split('\n')
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        
+        # Check if line looks like a filename indicator
+        # Support matches like: "index.html", "FILENAME: index.html", "File: index.html", "## index.html"
+        clean_line = line
+        prefixes_to_strip = ["FILENAME:", "File:", "Filename:", "##", "**"]
+        for prefix in prefixes_to_strip:
+            if clean_line.upper().startswith(prefix.upper()):
+                clean_line = clean_line[len(prefix):].strip()
+        
+        clean_line = clean_line.strip("*#: ")
+        
+        # Stricter filename validation
+        # 1. Must contain a dot and a valid extension
+        # 2. Must be relatively short (< 100 chars)
+        # 3. Must NOT contain spaces
+        # 4. Must NOT start with common sentence words
+        valid_extensions = ('.py', '.js', '.ts', '.java', '.cpp', '.c', '.h', '.html', '.css', '.json', '.yaml', '.yml', '.md', '.sh', '.bat', '.ps1', '.txt')
+        
+        is_potential_filename = (
+            clean_line and 
+            not clean_line.startswith('```') and
+            any(clean_line.lower().endswith(ext) for ext in valid_extensions) and
+            ' ' not in clean_line and
+            len(clean_line) < 100
+        )
+        
+        if is_potential_filename:
+            # Potential filename
+            filename = clean_line
+            # Remove any characters invalid for filenames (especially :)
+            filename = re.sub(r'[:*?"<>|]', '', filename)
+            
+            # Look for code block starting on next non-empty line
+            j = i + 1
+            while j < len(lines) and not lines[j].strip():
+                j += 1
+            
+            if j < len(lines) and lines[j].strip().startswith('```'):
+                # Found code block
+                code_lines = []
+                j += 1
+                
+                # Collect code until closing ```
+                while j < len(lines):
+                    if lines[j].strip() == '```':
+                        break
+                    code_lines.append(lines[j])
+                    j += 1
+                
+                if code_lines:
+                    codes[filename] = '\n'.join(code_lines)
+                    i = j
+        i += 1
+    
+    # Fallback: extract any code blocks with language hints
+    if not codes:
+        # Pattern: ```language\ncode\n```
+        code_block_pattern = r'```(?:python|javascript|typescript|java|cpp|c|html|css|json|yaml|bash|shell|plaintext)?\n(.*?)```'
+        matches = re.finditer(code_block_pattern, text, re.DOTALL)
+        for idx, match in enumerate(matches):
+            code = match.group(1).strip()
+            if code:
+                # Try to infer filename from context or use default
+                filename = f"file_{idx + 1}.py"  # Default to Python
+                codes[filename] = code
+    
+    return codes
+
+
+def make_response(target_bytes: int, named: bool = True, seed: int = 0) -> str:
+    """Build a synthetic multi-file response of roughly ``target_bytes``.
+
+    With ``named=False`` the blocks have no filename lines, which exercises
+    the unnamed-block fallback.
+    """
+    rng = random.Random(seed)
+    parts = ["Here is the complete implementation.\n\n"]
+    size = 0
+    index = 0
+    while size < target_bytes:
+        index += 1
+        kind = rng.choice(["py", "js", "md"])
+        lines = []
+        for line_no in range(rng.randint(50, 400)):
+            if kind == "py":
+                lines.append(f"    value_{line_no} = compute({line_no}, 'item.{line_no}')  # step {line_no}")
+            elif kind == "js":
+                lines.append(f"  const value{line_no} = compute({line_no}, \"item.{line_no}\");")
+            else:
+                lines.append(f"Paragraph {line_no} describing module_{index}.py in plain prose.")
+        if kind == "py":
+            block = f"module_{index}.py\n```python\ndef run_{index}():\n" + "\n".join(lines) + "\n```\n\n"
+        elif kind == "js":
+            block = f"module_{index}.js\n```javascript\nfunction run{index}() {{\n" + "\n".join(lines) + "\n}}\n```\n\n"
+        else:
+            block = f"README_{index}.md\n```markdown\n# Module {index}\n" + "\n".join(lines) + "\n```\n\n"
+        if not named:
+            block = block.split("\n", 1)[1]
+        parts.append(block)
+        size += len(block)
+    return "".join(parts)
+
+
+def streamed(text: str, chunk_size: int = 64) -> Dict[str, str]:
+    """Extract by feeding the text in small chunks, as when streaming."""
+    extractor = CodeBlockExtractor()
+    for start in range(0, len(text), chunk_size):
+        extractor.feed(text[start:start + chunk_size])
+    extractor.close()
+    return extractor.codes
+
+
+def measure(fn, text: str, repeat: int) -> float:
+    """Best-of-``repeat`` wall time in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=float, nargs="+", default=[1, 4, 16], help="Response sizes in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    print(f"{'input':<16} {'implementation':<22} {'seconds':>9} {'MB/s':>9}")
+    for named in (True, False):
+        for megabytes in args.mb:
+            text = make_response(int(megabytes * 1024 * 1024), named=named)
+            size = len(text) / (1024 * 1024)
+            label = f"{size:.1f}MB {'named' if named else 'unnamed'}"
+            if extract_code_blocks(text) != streamed(text):
+                print(f"{label}: whole-text and streamed results differ")
+            if named and extract_code_blocks(text) != legacy_extract_code_blocks(text):
+                print(f"{label}: single-pass and legacy results differ")
+            for name, fn in (("legacy", legacy_extract_code_blocks),
+                             ("single-pass", extract_code_blocks),
+                             ("single-pass streamed", streamed)):
+                seconds = measure(fn, text, args.repeat)
+                print(f"{label:<16} {name:<22} {seconds:>9.3f} {size / seconds:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -85,3 +85,124 @@ API_CALL_DELAY_SECONDS = 0  # OpenRouter handles balancing, but keep for compati
 OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
 
 
+# Shared HTTP transport configuration
+# A single connection pool is shared by every agent in the process
+HTTP_MAX_CONNECTIONS = int(os.getenv("OPENROUTER_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENROUTER_MAX_KEEPALIVE_CONNECTIONS", "10"))
+HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("OPENROUTER_KEEPALIVE_EXPIRY", "120"))
+HTTP_TIMEOUT_SECONDS = float(os.getenv("OPENROUTER_TIMEOUT", "300"))
+HTTP2_ENABLED = os.getenv("OPENROUTER_HTTP2", "1") != "0"
+
+# LLM response cache configuration
+# Identical requests (model, system prompt, messages, sampling params) are served from disk
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") != "0"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_responses.sqlite3"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "200"))
+LLM_CACHE_MAX_AGE_DAYS = float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "30"))
+
+# Test result cache: run_tests results keyed on the project files, language and runner version
+TEST_CACHE_ENABLED = os.getenv("TEST_CACHE", "1") != "0"
+TEST_CACHE_PATH = os.getenv("TEST_CACHE_PATH", os.path.join(".cache", "test_results.sqlite3"))
+TEST_CACHE_MAX_ENTRIES = int(os.getenv("TEST_CACHE_MAX_ENTRIES", "2000"))
+TEST_CACHE_MAX_MB = float(os.getenv("TEST_CACHE_MAX_MB", "50"))
+TEST_CACHE_MAX_AGE_DAYS = float(os.getenv("TEST_CACHE_MAX_AGE_DAYS", "7"))
+
+# Adaptive rate limiting (per model, shared by all agents in the process)
+RATE_LIMIT_REQUESTS_PER_SECOND = float(os.getenv("OPENROUTER_MAX_RPS", "4"))
+RATE_LIMIT_MAX_CONCURRENCY = int(os.getenv("OPENROUTER_MAX_CONCURRENCY", "8"))
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("OPENROUTER_MAX_RETRIES", "5"))
+RATE_LIMIT_BACKOFF_BASE_SECONDS = 1.0
+RATE_LIMIT_BACKOFF_MAX_SECONDS = 60.0
+
+# Hedged requests: when MODEL_<ROLE>_FALLBACK is set and the primary model is slower
+# than this percentile of its recent latencies, the same request is sent to the fallback
+HEDGE_LATENCY_PERCENTILE = float(os.getenv("OPENROUTER_HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_SAMPLES = 5
+HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("OPENROUTER_HEDGE_DEFAULT_DELAY", "60"))
+HEDGE_MIN_DELAY_SECONDS = 2.0
+
+# Provider prompt caching: these providers only cache prompt prefixes marked with
+# cache_control breakpoints (others, e.g. OpenAI and DeepSeek, cache automatically)
+PROMPT_CACHE_CONTROL_MODEL_PREFIXES = ("anthropic/", "google/gemini")
+
+# Programmer fix mode for the review and testing loops:
+# "full" re-emits whole files, "patch" asks for search/replace blocks or unified diffs
+FIX_MODES = ("full", "patch")
+FIX_MODE = os.getenv("FIX_MODE", "full")
+# Minimum similarity (0-1) for a SEARCH/diff context to match code that has drifted slightly
+PATCH_FUZZY_MATCH_THRESHOLD = 0.85
+
+# Token budget for the code included in each role's prompts. Files named in the
+# feedback or test output stay complete; the rest are reduced to outlines when over budget
+CONTEXT_TOKEN_BUDGETS = {
+    "Reviewer": int(os.getenv("CONTEXT_BUDGET_REVIEWER", "32000")),
+    "Tester": int(os.getenv("CONTEXT_BUDGET_TESTER", "24000")),
+    "Programmer": int(os.getenv("CONTEXT_BUDGET_PROGRAMMER", "32000")),
+}
+
+# Local job queue for `python -m src.worker`
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", os.path.join(".cache", "jobs.sqlite3"))
+# Workers renew their lease every third of this; a job whose lease expires is requeued
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "120"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+# Maximum concurrent agent calls within one project (sharded review, per-file fixes)
+PARALLEL_AGENT_CALLS = int(os.getenv("PARALLEL_AGENT_CALLS", "6"))
+# Fix each file named in the feedback in its own concurrent Programmer call
+# (used when the feedback concerns at least two files)
+PARALLEL_FIXES = os.getenv("PARALLEL_FIXES", "1") != "0"
+
+# Code review mode: "single" reviews all files in one call, "sharded" reviews groups of
+# related files in concurrent calls and merges the feedback
+REVIEW_MODES = ("single", "sharded")
+REVIEW_MODE = os.getenv("REVIEW_MODE", "single")
+# Upper bound on the code tokens of one review shard (small related files are grouped)
+REVIEW_SHARD_MAX_TOKENS = int(os.getenv("REVIEW_SHARD_MAX_TOKENS", "6000"))
+
+# Tester call policy: "on_failure" skips the Tester when the local tests pass with no
+# errors (and sends it only the failures otherwise), "always" analyses every test run
+TESTER_MODES = ("on_failure", "always")
+TESTER_MODE = os.getenv("TESTER_MODE", "on_failure")
+# Upper bound on the tokens of the test failures sent to the Tester: failures with the same
+# exception and innermost frame are sent once with a count, library and repeated frames collapsed
+TEST_REPORT_MAX_TOKENS = int(os.getenv("TEST_REPORT_MAX_TOKENS", "3000"))
+
+# Test execution: scripts are run concurrently on this many workers (mostly waiting on
+# sleeps, servers and timeouts, so more than the CPU count), each with its own timeout,
+# and the whole test run of one iteration must finish within the deadline
+TEST_PARALLEL_WORKERS = int(os.getenv("TEST_PARALLEL_WORKERS", str(min(8, (os.cpu_count() or 1) + 4))))
+TEST_FILE_TIMEOUT_SECONDS = float(os.getenv("TEST_FILE_TIMEOUT", "10"))
+TEST_SUITE_TIMEOUT_SECONDS = float(os.getenv("TEST_SUITE_TIMEOUT", "30"))
+TEST_DEADLINE_SECONDS = float(os.getenv("TEST_DEADLINE", "120"))
+
+# Python scripts and tests run in children forked from pre-warmed interpreters (POSIX only)
+SANDBOX_POOL_ENABLED = os.getenv("SANDBOX_POOL", "1") != "0"
+SANDBOX_POOL_SIZE = int(os.getenv("SANDBOX_POOL_SIZE", str(TEST_PARALLEL_WORKERS)))
+# Imported once by each pooled interpreter instead of by every run
+SANDBOX_PRELOAD_MODULES = (
+    "pytest", "unittest", "json", "re", "collections", "dataclasses", "typing", "datetime",
+    "math", "random", "argparse", "logging", "pathlib", "csv", "sqlite3",
+)
+
+# Resource limits of each test run (POSIX rlimits). The process count is allowed on top
+# of the user's current processes, since the kernel counts them per user
+SANDBOX_CPU_SECONDS = int(os.getenv("SANDBOX_CPU_SECONDS", "60"))
+SANDBOX_MEMORY_MB = int(os.getenv("SANDBOX_MEMORY_MB", "2048"))
+SANDBOX_MAX_OPEN_FILES = int(os.getenv("SANDBOX_MAX_OPEN_FILES", "256"))
+SANDBOX_MAX_PROCESSES = int(os.getenv("SANDBOX_MAX_PROCESSES", "64"))
+SANDBOX_MAX_FILE_MB = int(os.getenv("SANDBOX_MAX_FILE_MB", "64"))
+# Captured output keeps this many bytes from the start and the end of each stream
+SANDBOX_OUTPUT_HEAD_BYTES = int(os.getenv("SANDBOX_OUTPUT_HEAD_BYTES", "16384"))
+SANDBOX_OUTPUT_TAIL_BYTES = int(os.getenv("SANDBOX_OUTPUT_TAIL_BYTES", "16384"))
+
+# Local syntax check before each review and test iteration: Python is compiled in-process,
+# other languages use node --check, tsc, javac or g++/gcc -fsyntax-only when installed.
+# Errors go straight to a Programmer fix call (at most SYNTAX_GATE_MAX_FIXES per iteration)
+SYNTAX_GATE_ENABLED = os.getenv("SYNTAX_GATE", "1") != "0"
+SYNTAX_GATE_MAX_FIXES = int(os.getenv("SYNTAX_GATE_MAX_FIXES", "2"))
+SYNTAX_CHECK_TIMEOUT_SECONDS = float(os.getenv("SYNTAX_CHECK_TIMEOUT", "30"))
+
+# Checkpoint of the development state in <project>/.checkpoint, written after every phase and
+# review/test iteration, from which `main.py --resume <project dir>` continues an interrupted run
+CHECKPOINT_ENABLED = os.getenv("CHECKPOINT", "1") != "0"
@@ -46,15 +46,16 @@ CRITICAL INSTRUCTIONS:
 5. Do not include any sentences that look like filenames between code blocks.
 """
 
-CODE_REVIEW_PROMPT = """Review the following code:
-
-Task: {task_prompt}
+# Stable prefix shared by review, testing and fix prompts. It is sent ahead of the
+# per-call instructions so providers can serve it from their prompt cache.
+CODE_CONTEXT_PROMPT = """Task: {task_prompt}
 Language: {language}
 
 Current Code:
 {codes}
+"""
 
-Please review the code for:
+CODE_REVIEW_PROMPT = """Review the code above for:
 1. Code quality and readability
 2. Potential bugs or issues
 3. Best practices adherence
@@ -64,10 +65,20 @@ If the code is satisfactory, respond with: <INFO>Finished</INFO>
 Otherwise, provide specific feedback on what needs to be improved.
 """
 
-TESTING_PROMPT = """Analyze the test results and identify any issues:
+CODE_REVIEW_SHARD_PROMPT = """Review only these files of the code above: {files}
+The other files are shown as outlines so you can check how they are used; do not review them.
 
-Task: {task_prompt}
-Language: {language}
+Review for:
+1. Code quality and readability
+2. Potential bugs or issues (including mismatches with the other files' interfaces)
+3. Best practices adherence
+4. Completeness
+
+If these files are satisfactory, respond with: <INFO>Finished</INFO>
+Otherwise, provide specific feedback on what needs to be improved, naming the file of each issue.
+"""
+
+TESTING_PROMPT = """Analyze the test results for the code above and identify any issues:
 
 Test Results:
 {test_reports}
@@ -75,26 +86,23 @@ Test Results:
 Errors:
 {error_summary}
 
-Current Code:
-{codes}
-
 Please analyze the test output and errors. Identify the root causes and suggest fixes.
 If no errors are found, respond with: <INFO>No errors</INFO>
 Otherwise, provide a detailed analysis of the issues.
 """
 
-FIX_CODE_PROMPT = """Fix the code based on the following feedback:
+SYNTAX_FIX_FEEDBACK = """The code does not pass the syntax check. Fix these errors without changing anything else:
 
-Task: {task_prompt}
-Language: {language}
+{diagnostics}
+"""
+
+FIX_CODE_PROMPT = """Fix the code above based on the following feedback:
 
 Feedback:
 {feedback}
 
-Current Code:
-{codes}
-
 Please fix the issues and provide the corrected code for ALL files. Even if you only modified one file, provide the FULL corrected code for that file. 
+Files marked "(outline)" or listed as not shown are incomplete in this context: do not output them, their full code is kept as it is.
 
 Format:
 filename.extension
@@ -105,7 +113,82 @@ CODE_CONTENT
 Follow the same critical instructions: no file trees, no snippets, full file content only.
 """
 
+FIX_CODE_PATCH_PROMPT = """Fix the code above based on the following feedback:
+
+Feedback:
+{feedback}
+
+Only output the edits needed. For each change, give the filename on its own line followed by one or more SEARCH/REPLACE blocks:
+
+filename.extension
+```
+<<<<<<< SEARCH
+exact lines copied from the current file
+=======
+replacement lines
+>>>>>>> REPLACE
+```
+
+Rules:
+1. The SEARCH part must match the current file exactly, including indentation, and include enough lines to be unique.
+2. Keep each block small: only the lines that change plus a little surrounding context.
+3. Unified diffs (```diff with --- / +++ / @@ headers) are also accepted.
+4. To create a new file, use an empty SEARCH part and put the full file content in the REPLACE part.
+5. Do not repeat unchanged files.
+6. Do not edit files marked "(outline)" or listed as not shown: their full code is not in this context.
+"""
+
+PATCH_CONFLICT_PROMPT = """Your edits for the following files could not be applied because the SEARCH text did not match the current code:
+{files}
+
+Provide the FULL corrected code for these files only, applying this feedback:
+
+Feedback:
+{feedback}
+
+Format:
+filename.extension
+```language
+CODE_CONTENT
+```
+"""
+
+FIX_FILE_PROMPT = """Fix {filename} in the code above based on the following feedback:
 
+Feedback:
+{feedback}
 
+The other files are read-only context: they are being fixed separately, so do not output them. Only change {filename}; if the fix needs a new file, you may also create it.
 
+Provide the FULL corrected code for {filename}.
 
+Format:
+{filename}
+```language
+CODE_CONTENT
+```
+"""
+
+FIX_FILE_PATCH_PROMPT = """Fix {filename} in the code above based on the following feedback:
+
+Feedback:
+{feedback}
+
+The other files are read-only context: they are being fixed separately, so do not edit them.
+
+Only output the edits needed for {filename}, as one or more SEARCH/REPLACE blocks:
+
+{filename}
+```
+<<<<<<< SEARCH
+exact lines copied from the current file
+=======
+replacement lines
+>>>>>>> REPLACE
+```
+
+Rules:
+1. The SEARCH part must match the current file exactly, including indentation, and include enough lines to be unique.
+2. Keep each block small: only the lines that change plus a little surrounding context.
+3. Unified diffs (```diff with --- / +++ / @@ headers) are also accepted.
+"""
@@ -1,6 +1,7 @@
 """Base agent utilities and factory functions."""
 
 import os
+from typing import Optional
 from config.agent_configs import DEFAULT_MODEL, DEFAULT_TEMPERATURE
 from src.agents.openrouter_agent import OpenRouterAgent
 
@@ -28,6 +29,20 @@ def get_model(model_name: str = None, role: str = None) -> str:
     return os.getenv("OPENROUTER_MODEL", "google/gemini-2.5-flash")
 
 
+def get_fallback_model(role: str = None) -> Optional[str]:
+    """Get the backup model used to hedge slow requests for a role.
+    
+    Args:
+        role: Optional role name (e.g., 'PROGRAMMER')
+        
+    Returns:
+        Model name from MODEL_<ROLE>_FALLBACK, or None if hedging is off for the role
+    """
+    if not role:
+        return None
+    return os.getenv(f"MODEL_{role.upper()}_FALLBACK") or None
+
+
 def create_base_agent(system_prompt: str, model_name: str = None, agent_name: str = "agent"):
     """Create an OpenRouter-based agent with the given system prompt.
     
@@ -49,7 +64,8 @@ def create_base_agent(system_prompt: str, model_name: str = None, agent_name: st
     agent = OpenRouterAgent(
         name=agent_name,
         model=model,
-        instruction=system_prompt
+        instruction=system_prompt,
+        hedge_model=get_fallback_model(agent_name)
     )
     
     return agent
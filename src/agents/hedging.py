@@ -0,0 +1,82 @@
+"""Latency statistics used to decide when to hedge a slow request."""
+
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, Tuple
+
+from config.agent_configs import (
+    HEDGE_LATENCY_PERCENTILE,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_DEFAULT_DELAY_SECONDS,
+    HEDGE_MIN_DELAY_SECONDS,
+)
+
+
+class LatencyTracker:
+    """Sliding window of recent request latencies for one model."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """Add a latency sample.
+
+        Args:
+            seconds: Observed latency (or time to first token when streaming)
+        """
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, percentile: float) -> float:
+        """Return the given percentile of the recorded samples (0 if none)."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return 0.0
+        index = min(len(samples) - 1, max(0, math.ceil(percentile / 100 * len(samples)) - 1))
+        return samples[index]
+
+    def hedge_delay(self, percentile: float = HEDGE_LATENCY_PERCENTILE) -> float:
+        """How long to wait for the primary model before sending a hedge.
+
+        Falls back to a fixed delay until enough samples have been seen.
+
+        Args:
+            percentile: Latency percentile that triggers the hedge
+
+        Returns:
+            Delay in seconds
+        """
+        with self._lock:
+            count = len(self._samples)
+        if count < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY_SECONDS
+        return max(HEDGE_MIN_DELAY_SECONDS, self.percentile(percentile))
+
+
+_trackers: Dict[Tuple[str, bool], LatencyTracker] = {}
+_trackers_lock = threading.Lock()
+
+
+def get_latency_tracker(model: str, streaming: bool = False) -> LatencyTracker:
+    """Get the process-wide latency tracker for a model.
+
+    Streaming calls are tracked separately because they hedge on time to
+    first token rather than on total latency.
+
+    Args:
+        model: Model ID
+        streaming: Whether the samples are times to first token
+
+    Returns:
+        Shared LatencyTracker instance
+    """
+    key = (model, streaming)
+    with _trackers_lock:
+        tracker = _trackers.get(key)
+        if tracker is None:
+            tracker = LatencyTracker()
+            _trackers[key] = tracker
+        return tracker
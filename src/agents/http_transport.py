@@ -0,0 +1,165 @@
+"""Process-wide HTTP transport shared by all OpenRouter agents."""
+
+import asyncio
+import atexit
+import threading
+from concurrent.futures import Future
+from typing import Optional
+
+import httpx
+import openai
+
+from config.agent_configs import (
+    OPENROUTER_BASE_URL,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    HTTP_TIMEOUT_SECONDS,
+    HTTP2_ENABLED,
+)
+
+
+def _http2_available() -> bool:
+    """Check whether the optional ``h2`` package needed for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class SharedTransport:
+    """One pooled ``httpx.AsyncClient`` plus the event loop that owns it.
+
+    httpx connection pools are bound to the event loop that opened them, so
+    the client lives on a dedicated background loop and every request is
+    submitted there, whether it comes from synchronous code or from another
+    event loop. All agents and all concurrent runs therefore reuse the same
+    keep-alive connections instead of opening their own.
+    """
+
+    def __init__(self, api_key: str,
+                 max_connections: int = HTTP_MAX_CONNECTIONS,
+                 max_keepalive_connections: int = HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                 keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY_SECONDS,
+                 timeout: float = HTTP_TIMEOUT_SECONDS,
+                 http2: bool = HTTP2_ENABLED):
+        """Start the transport loop and create the pooled clients.
+
+        Args:
+            api_key: OpenRouter API key
+            max_connections: Maximum number of open connections in the pool
+            max_keepalive_connections: Maximum number of idle connections kept alive
+            keepalive_expiry: Seconds an idle connection is kept before closing
+            timeout: Request timeout in seconds
+            http2: Use HTTP/2 when the ``h2`` package is available
+        """
+        self.http2 = http2 and _http2_available()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run_loop, name="openrouter-transport", daemon=True
+        )
+        self._thread.start()
+
+        self.http_client = httpx.AsyncClient(
+            http2=self.http2,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+        self.client = openai.AsyncOpenAI(
+            base_url=OPENROUTER_BASE_URL,
+            api_key=api_key,
+            default_headers={
+                "HTTP-Referer": "https://github.com/google-adk-multiagent", # Optional
+                "X-Title": "Google ADK Multi-Agent System", # Optional
+            },
+            http_client=self.http_client,
+            max_retries=0,  # Retries are handled by the agent
+        )
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop that owns the connection pool."""
+        return self._loop
+
+    def submit(self, coro) -> Future:
+        """Schedule a coroutine on the transport loop.
+
+        Args:
+            coro: Coroutine to run
+
+        Returns:
+            concurrent.futures.Future resolving to the coroutine result
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro):
+        """Run a coroutine on the transport loop and block until it finishes.
+
+        Args:
+            coro: Coroutine to run
+
+        Returns:
+            Coroutine result
+        """
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("SharedTransport.run() cannot be called from the transport loop")
+        return self.submit(coro).result()
+
+    async def call(self, coro):
+        """Await a coroutine on the transport loop from any event loop.
+
+        Args:
+            coro: Coroutine to run
+
+        Returns:
+            Coroutine result
+        """
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def close(self):
+        """Close pooled connections and stop the transport loop."""
+        if not self._loop.is_running():
+            return
+        try:
+            self.submit(self.http_client.aclose()).result(timeout=5)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+_transport: Optional[SharedTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_shared_transport(api_key: str) -> SharedTransport:
+    """Get the process-wide transport, creating it on first use.
+
+    Args:
+        api_key: OpenRouter API key
+
+    Returns:
+        Shared SharedTransport instance
+    """
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = SharedTransport(api_key)
+            atexit.register(_transport.close)
+        return _transport
@@ -2,83 +2,510 @@
 
 import os
 import time
-import json
-import httpx
+import queue
+import asyncio
 import openai
-from typing import List, Dict, Optional
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
 
-class OpenRouterAgent:
-    """Agent that communicates with OpenRouter AI models."""
-    
-    def __init__(self, name: str, model: str, instruction: str):
+from config.agent_configs import (
+    DEFAULT_TEMPERATURE,
+    DEFAULT_MAX_TOKENS,
+    RATE_LIMIT_MAX_RETRIES,
+    PROMPT_CACHE_CONTROL_MODEL_PREFIXES,
+)
+from src.agents.http_transport import get_shared_transport
+from src.agents.rate_limiter import get_rate_limiter
+from src.agents.hedging import get_latency_tracker
+from src.agents.response_cache import get_response_cache, make_cache_key
+from src.agents.single_flight import SingleFlight
+from src.tools.code_manager import CodeBlockExtractor
+from src.tools.usage_tracker import TokenUsage
+
+# Identical requests in flight at the same time share one call, process-wide
+request_flights = SingleFlight()
+
+
+class LLMResponse(str):
+    """Model response text carrying metadata about the call.
+
+    Subclasses ``str`` so callers can keep treating responses as plain text,
+    while ``usage``, ``finish_reason``, ``latency`` and ``model`` (the model
+    that actually served the request) are available for accounting.
+    """
+
+    def __new__(cls, text: str, model: str = "", latency: float = 0.0,
+                time_to_first_token: float = 0.0, cached: Optional[bool] = None,
+                deduplicated: bool = False, hedged: Optional[bool] = None,
+                hedge_won: bool = False, usage: Optional[TokenUsage] = None,
+                finish_reason: str = ""):
+        obj = super().__new__(cls, text or "")
+        obj.model = model
+        obj.latency = latency
+        obj.time_to_first_token = time_to_first_token
+        # Provider-reported token counts (None if the provider sent none)
+        obj.usage = usage
+        obj.finish_reason = finish_reason
+        # None when the response cache was not consulted
+        obj.cached = cached
+        # True when the result was shared from an identical in-flight request
+        obj.deduplicated = deduplicated
+        # None when hedging is not configured; hedge_won means the backup answered first
+        obj.hedged = hedged
+        obj.hedge_won = hedge_won
+        return obj
+
+    @property
+    def cached_tokens(self) -> int:
+        """Prompt tokens the provider served from its prompt cache."""
+        return self.usage.cached_tokens if self.usage else 0
+
+    def replace(self, **changes) -> "LLMResponse":
+        """Return a copy of this response with some metadata changed."""
+        return LLMResponse(str(self), **{**self.__dict__, **changes})
+
+
+class AsyncOpenRouterAgent:
+    """Agent that communicates with OpenRouter AI models asynchronously.
+
+    All instances share one pooled HTTP transport, so creating an agent per
+    role no longer opens a separate connection pool.
+    """
+
+    def __init__(self, name: str, model: str, instruction: str, use_cache: bool = True,
+                 hedge_model: Optional[str] = None):
         """Initialize the OpenRouter agent.
-        
+
         Args:
             name: Name of the agent
             model: OpenRouter model ID (e.g., 'google/gemini-2.0-flash-001')
             instruction: System prompt/instruction for the agent
+            use_cache: Serve identical requests from the persistent response cache
+            hedge_model: Backup model raced against the primary when it is slow
         """
         self.name = name
         self.model = model
+        self.hedge_model = hedge_model if hedge_model != model else None
         self.instruction = instruction
+        self.use_cache = use_cache
+        self.temperature = DEFAULT_TEMPERATURE
+        self.max_tokens = DEFAULT_MAX_TOKENS
         self.api_key = os.getenv("OPENROUTER_API_KEY")
-        
+
         if not self.api_key:
             raise ValueError("OPENROUTER_API_KEY environment variable not set")
-            
-        self.client = openai.OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=self.api_key,
-            default_headers={
-                "HTTP-Referer": "https://github.com/google-adk-multiagent", # Optional
-                "X-Title": "Google ADK Multi-Agent System", # Optional
-            },
-            http_client=httpx.Client()
-        )
-        
-    def query(self, text: str) -> str:
+
+        self.transport = get_shared_transport(self.api_key)
+        self.client = self.transport.client
+
+    async def aquery(self, text: str, stream: bool = False,
+                     on_file: Optional[Callable[[str, str], None]] = None,
+                     use_cache: Optional[bool] = None, context: Optional[str] = None) -> str:
         """Send a query to the model via OpenRouter.
-        
+
+        Can be awaited from any event loop; the request itself always runs
+        on the shared transport loop.
+
         Args:
             text: User input text
-            
+            stream: Stream the completion and extract files as they arrive
+            on_file: Called with (filename, code) as soon as each file's
+                closing fence is received (streaming only)
+            use_cache: Override the agent's response cache setting for this call
+            context: Stable prompt prefix (task, code snapshot) sent ahead of
+                ``text`` and marked for provider prompt caching
+
         Returns:
             Model response text
         """
-        messages = [
+        if not stream:
+            return await self.transport.call(self._complete(text, context=context, use_cache=use_cache))
+
+        extractor = CodeBlockExtractor()
+        response = ""
+        async for kind, value in self._aiter_stream(text, context, use_cache):
+            if kind == "delta":
+                _emit_files(extractor.feed(value), on_file)
+            else:
+                response = value
+        _emit_files(extractor.close(), on_file)
+        return response
+
+    async def astream(self, text: str, context: Optional[str] = None) -> AsyncIterator[str]:
+        """Stream the model response as text deltas.
+
+        Args:
+            text: User input text
+            context: Optional stable prompt prefix
+
+        Yields:
+            Pieces of the response text as they are generated
+        """
+        async for kind, value in self._aiter_stream(text, context):
+            if kind == "delta":
+                yield value
+
+    async def _aiter_stream(self, text: str, context: Optional[str] = None,
+                            use_cache: Optional[bool] = None) -> AsyncIterator[Tuple[str, str]]:
+        """Bridge a streaming completion from the transport loop to the caller's loop."""
+        loop = asyncio.get_running_loop()
+        items: asyncio.Queue = asyncio.Queue()
+        future = self._start_stream(
+            text, lambda item: loop.call_soon_threadsafe(items.put_nowait, item), context, use_cache
+        )
+        try:
+            while True:
+                kind, value = await items.get()
+                yield kind, value
+                if kind == "done":
+                    return
+        finally:
+            if not future.done():
+                future.cancel()
+
+    def _start_stream(self, text: str, push: Callable[[Tuple[str, str]], None],
+                      context: Optional[str] = None, use_cache: Optional[bool] = None):
+        """Start a streaming completion on the transport loop.
+
+        ``push`` receives ("delta", text) items followed by one ("done", response).
+        Cache hits and errors arrive as a single delta so consumers always see the text.
+        """
+        streamed = False
+
+        def on_delta(delta: str):
+            nonlocal streamed
+            streamed = True
+            push(("delta", delta))
+
+        async def produce():
+            response = ""
+            try:
+                response = await self._complete(text, context=context, on_delta=on_delta,
+                                                use_cache=use_cache)
+                if not streamed and response:
+                    push(("delta", response))
+            except Exception as e:
+                response = f"Error contacting OpenRouter: {str(e)}"
+                push(("delta", response))
+            finally:
+                push(("done", response))
+
+        return self.transport.submit(produce())
+
+    async def _complete(self, text: str, context: Optional[str] = None,
+                        on_delta: Optional[Callable[[str], None]] = None,
+                        use_cache: Optional[bool] = None) -> str:
+        """Answer from the response cache, an identical in-flight request or the model.
+
+        Runs on the transport loop.
+        """
+        messages = self._build_messages(text, context)
+        key = make_cache_key(self.model, self.instruction, messages,
+                             self.temperature, self.max_tokens)
+
+        if use_cache is None:
+            use_cache = self.use_cache
+        cache = get_response_cache() if use_cache else None
+        if cache is not None:
+            # SQLite I/O runs off the transport loop so other requests keep flowing
+            hit = await asyncio.to_thread(cache.get, key)
+            if hit is not None:
+                return LLMResponse(hit["text"], model=hit["model"], cached=True)
+
+        async def call_model():
+            response = await self._complete_uncached(messages, on_delta)
+            if cache is not None and isinstance(response, LLMResponse):
+                response.cached = False
+                await asyncio.to_thread(cache.put, key, {"text": str(response), "model": response.model})
+            return response
+
+        response, shared = await request_flights.ado(key, call_model)
+        if shared and isinstance(response, LLMResponse):
+            response = response.replace(deduplicated=True)
+        return response
+
+    def _build_messages(self, text: str, context: Optional[str] = None) -> List[Dict]:
+        """Lay out messages with the stable prefix first.
+
+        The system instruction and ``context`` (task and code snapshot) come
+        before the per-call text, so repeated calls share a byte-identical
+        prefix. Models that need explicit breakpoints get a cache_control
+        marker at the end of that prefix; the others cache it automatically.
+        """
+        if not context:
+            return [
+                {"role": "system", "content": self.instruction},
+                {"role": "user", "content": text}
+            ]
+
+        if supports_cache_control(self.model):
+            content = [
+                {"type": "text", "text": context, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": text},
+            ]
+        else:
+            content = f"{context}\n{text}"
+        return [
             {"role": "system", "content": self.instruction},
-            {"role": "user", "content": text}
+            {"role": "user", "content": content}
         ]
-        
-        max_retries = 3
-        retry_delay = 5
-        
+
+    async def _complete_uncached(self, messages: List[Dict],
+                                 on_delta: Optional[Callable[[str], None]] = None) -> str:
+        """Query the primary model, hedging with the backup model if it is slow."""
+        if not self.hedge_model:
+            return await self._complete_model(self.model, messages, on_delta)
+
+        streaming = on_delta is not None
+        delay = get_latency_tracker(self.model, streaming).hedge_delay()
+        started = time.monotonic()
+        # While streaming, the first model to produce a token owns the output
+        owner = None
+        tasks: Dict[str, asyncio.Task] = {}
+
+        def forward_from(model: str):
+            def forward(delta: str):
+                nonlocal owner
+                if owner is None:
+                    owner = model
+                    for other, task in tasks.items():
+                        if other != model:
+                            task.cancel()
+                if owner == model:
+                    on_delta(delta)
+            return forward if streaming else None
+
+        tasks[self.model] = asyncio.ensure_future(
+            self._complete_model(self.model, messages, forward_from(self.model))
+        )
+        try:
+            done, _ = await asyncio.wait(set(tasks.values()), timeout=delay)
+            if not done and owner is not None:
+                # The primary is already streaming; let it finish
+                return _with_hedge_outcome(await tasks[self.model], hedged=False)
+            if done:
+                response = tasks[self.model].result()
+                if isinstance(response, LLMResponse):
+                    return _with_hedge_outcome(response, hedged=False)
+                print(f"⚠️ {self.name}: {self.model} failed, failing over to {self.hedge_model}...")
+            else:
+                print(f"⏱️ {self.name}: {self.model} slower than {delay:.1f}s, hedging with {self.hedge_model}...")
+            tasks[self.hedge_model] = asyncio.ensure_future(
+                self._complete_model(self.hedge_model, messages, forward_from(self.hedge_model))
+            )
+            model_of = {task: model for model, task in tasks.items()}
+            pending = set(tasks.values())
+            response = "Error: Hedged requests were cancelled."
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    response = task.result()
+                    if isinstance(response, LLMResponse):
+                        winner = model_of[task]
+                        if winner != self.model and not tasks[self.model].done():
+                            # Keep the primary's percentile honest: it took at least this long
+                            get_latency_tracker(self.model, streaming).record(time.monotonic() - started)
+                        return _with_hedge_outcome(response, hedged=True,
+                                                   hedge_won=winner == self.hedge_model)
+            return response
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+    async def _complete_model(self, model: str, messages: List[Dict],
+                              on_delta: Optional[Callable[[str], None]] = None) -> str:
+        """Perform the completion request, retrying through the model's shared rate limiter."""
+        limiter = get_rate_limiter(model)
+        max_retries = RATE_LIMIT_MAX_RETRIES
+
         for attempt in range(max_retries):
             try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    # Optional: adjust parameters as needed
-                    temperature=0.7,
-                    max_tokens=4096,
-                )
-                
-                if not response.choices:
-                    return "Error: No response choices returned from OpenRouter."
-                    
-                return response.choices[0].message.content
-                
+                async with limiter:
+                    response, headers = await self._request(model, messages, on_delta)
+                limiter.on_success(headers)
+                if isinstance(response, LLMResponse):
+                    get_latency_tracker(model, on_delta is not None).record(
+                        response.time_to_first_token if on_delta is not None else response.latency
+                    )
+                return response
+
             except openai.RateLimitError as e:
+                # Pauses every caller of this model, not just this one
+                retry_delay = limiter.on_rate_limited(getattr(e.response, "headers", None), attempt)
                 if attempt < max_retries - 1:
-                    print(f"⚠️ OpenRouter Rate Limit hit (429). Waiting {retry_delay}s before retry {attempt + 1}/{max_retries}...")
-                    time.sleep(retry_delay)
-                    retry_delay *= 2
+                    print(f"⚠️ OpenRouter Rate Limit hit (429) for {model}. Waiting {retry_delay:.1f}s before retry {attempt + 1}/{max_retries}...")
                 else:
                     return f"Error: Rate limit exceeded after {max_retries} attempts. {str(e)}"
             except Exception as e:
                 return f"Error contacting OpenRouter: {str(e)}"
-        
+
         return "Error: Failed to get response after multiple attempts."
 
+    async def _request(self, model: str, messages: List[Dict],
+                       on_delta: Optional[Callable[[str], None]]) -> Tuple[str, Mapping[str, str]]:
+        """Issue one chat completion, streaming deltas to ``on_delta`` when given.
+
+        Returns:
+            Tuple of (response, HTTP response headers)
+        """
+        started = time.monotonic()
+        params = dict(
+            model=model,
+            messages=messages,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+        )
+
+        if on_delta is None:
+            raw = await self.client.chat.completions.with_raw_response.create(**params)
+            response = raw.parse()
+            if not response.choices:
+                return "Error: No response choices returned from OpenRouter.", raw.headers
+            return LLMResponse(
+                response.choices[0].message.content,
+                model=response.model or model,
+                latency=time.monotonic() - started,
+                usage=_token_usage(response.usage),
+                finish_reason=response.choices[0].finish_reason or "",
+            ), raw.headers
+
+        raw = await self.client.chat.completions.with_raw_response.create(
+            **params, stream=True, stream_options={"include_usage": True}
+        )
+        stream = raw.parse()
+        parts = []
+        served_model = model
+        time_to_first_token = 0.0
+        usage = None
+        finish_reason = ""
+        async for chunk in stream:
+            if chunk.model:
+                served_model = chunk.model
+            if chunk.usage:
+                usage = _token_usage(chunk.usage)
+            if not chunk.choices:
+                continue
+            finish_reason = chunk.choices[0].finish_reason or finish_reason
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if not parts:
+                    time_to_first_token = time.monotonic() - started
+                parts.append(delta)
+                on_delta(delta)
+
+        if not parts:
+            return "Error: No response choices returned from OpenRouter.", raw.headers
+        return LLMResponse(
+            "".join(parts),
+            model=served_model,
+            latency=time.monotonic() - started,
+            time_to_first_token=time_to_first_token,
+            usage=usage,
+            finish_reason=finish_reason,
+        ), raw.headers
+
     def __repr__(self):
-        return f"OpenRouterAgent(name='{self.name}', model='{self.model}')"
+        return f"{type(self).__name__}(name='{self.name}', model='{self.model}')"
+
+
+class OpenRouterAgent(AsyncOpenRouterAgent):
+    """Agent with a synchronous ``query`` wrapper around ``aquery``."""
+
+    def query(self, text: str, stream: bool = False,
+              on_file: Optional[Callable[[str, str], None]] = None,
+              use_cache: Optional[bool] = None, context: Optional[str] = None) -> str:
+        """Send a query to the model via OpenRouter, blocking until it answers.
+
+        Args:
+            text: User input text
+            stream: Stream the completion and extract files as they arrive
+            on_file: Called with (filename, code) as soon as each file's
+                closing fence is received (streaming only)
+            use_cache: Override the agent's response cache setting for this call
+            context: Stable prompt prefix (task, code snapshot) sent ahead of
+                ``text`` and marked for provider prompt caching
+
+        Returns:
+            Model response text
+        """
+        if not stream:
+            return self.transport.run(self._complete(text, context=context, use_cache=use_cache))
+
+        extractor = CodeBlockExtractor()
+        response = ""
+        for kind, value in self._iter_stream(text, context, use_cache):
+            if kind == "delta":
+                _emit_files(extractor.feed(value), on_file)
+            else:
+                response = value
+        _emit_files(extractor.close(), on_file)
+        return response
+
+    def stream(self, text: str, context: Optional[str] = None) -> Iterator[str]:
+        """Stream the model response as text deltas, blocking between pieces.
+
+        Args:
+            text: User input text
+            context: Optional stable prompt prefix
+
+        Yields:
+            Pieces of the response text as they are generated
+        """
+        for kind, value in self._iter_stream(text, context):
+            if kind == "delta":
+                yield value
+
+    def _iter_stream(self, text: str, context: Optional[str] = None,
+                     use_cache: Optional[bool] = None) -> Iterator[Tuple[str, str]]:
+        """Bridge a streaming completion from the transport loop to this thread."""
+        items: queue.Queue = queue.Queue()
+        future = self._start_stream(text, items.put, context, use_cache)
+        try:
+            while True:
+                kind, value = items.get()
+                yield kind, value
+                if kind == "done":
+                    return
+        finally:
+            if not future.done():
+                future.cancel()
+
+
+def supports_cache_control(model: str) -> bool:
+    """Check whether a model needs explicit cache_control breakpoints for prompt caching.
+
+    Args:
+        model: OpenRouter model ID
+
+    Returns:
+        True for providers that only cache marked prefixes (Anthropic, Gemini)
+    """
+    return model.lower().startswith(PROMPT_CACHE_CONTROL_MODEL_PREFIXES)
+
+
+def _token_usage(usage) -> Optional[TokenUsage]:
+    """Convert the provider's usage object into TokenUsage."""
+    if not usage:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    return TokenUsage(
+        prompt_tokens=usage.prompt_tokens or 0,
+        completion_tokens=usage.completion_tokens or 0,
+        cached_tokens=getattr(details, "cached_tokens", 0) or 0,
+    )
+
+
+def _with_hedge_outcome(response: str, hedged: bool, hedge_won: bool = False) -> str:
+    """Tag a response with whether it was hedged and which model won."""
+    if isinstance(response, LLMResponse):
+        response.hedged = hedged
+        response.hedge_won = hedge_won
+    return response
+
+
+def _emit_files(files: List[Tuple[str, str]], on_file: Optional[Callable[[str, str], None]]):
+    """Hand completed files to the caller's callback."""
+    if on_file:
+        for filename, code in files:
+            on_file(filename, code)
@@ -0,0 +1,245 @@
+"""Header-aware adaptive rate limiting for OpenRouter models."""
+
+import time
+import random
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional
+
+from config.agent_configs import (
+    RATE_LIMIT_REQUESTS_PER_SECOND,
+    RATE_LIMIT_MAX_CONCURRENCY,
+    RATE_LIMIT_BACKOFF_BASE_SECONDS,
+    RATE_LIMIT_BACKOFF_MAX_SECONDS,
+)
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parse durations such as '2', '1.5s', '20ms' or '6m0s' into seconds."""
+    value = value.strip().lower()
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    total = 0.0
+    number = ""
+    i = 0
+    while i < len(value):
+        char = value[i]
+        if char.isdigit() or char == ".":
+            number += char
+            i += 1
+            continue
+        if not number:
+            return None
+        if value.startswith("ms", i):
+            total += float(number) / 1000
+            i += 2
+        elif char == "h":
+            total += float(number) * 3600
+            i += 1
+        elif char == "m":
+            total += float(number) * 60
+            i += 1
+        elif char == "s":
+            total += float(number)
+            i += 1
+        else:
+            return None
+        number = ""
+    return total if not number else None
+
+
+def _parse_reset(value: str, now: float) -> Optional[float]:
+    """Parse a reset header (epoch seconds/milliseconds or a duration) into seconds from now."""
+    seconds = _parse_duration(value)
+    if seconds is None:
+        return None
+    if seconds > 1e12:   # Epoch milliseconds (OpenRouter's X-RateLimit-Reset)
+        return max(0.0, seconds / 1000 - now)
+    if seconds > 1e9:    # Epoch seconds
+        return max(0.0, seconds - now)
+    return seconds
+
+
+def retry_delay_from_headers(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Extract how long the server asked us to wait.
+
+    Understands ``Retry-After`` (seconds or HTTP date), ``retry-after-ms``
+    and the ``X-RateLimit-Reset*`` family.
+
+    Args:
+        headers: Response headers (case-insensitive mapping)
+
+    Returns:
+        Seconds to wait, or None if the server gave no hint
+    """
+    if not headers:
+        return None
+    now = time.time()
+
+    value = headers.get("retry-after-ms")
+    if value:
+        seconds = _parse_duration(value)
+        if seconds is not None:
+            return seconds / 1000
+
+    value = headers.get("retry-after")
+    if value:
+        seconds = _parse_duration(value)
+        if seconds is not None:
+            return seconds
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+        except (TypeError, ValueError):
+            pass
+
+    for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset"):
+        value = headers.get(name)
+        if value:
+            seconds = _parse_reset(value, now)
+            if seconds is not None:
+                return seconds
+    return None
+
+
+def _requests_exhausted(headers: Optional[Mapping[str, str]]) -> bool:
+    """Check whether the rate-limit headers report no remaining requests."""
+    if not headers:
+        return False
+    for name in ("x-ratelimit-remaining-requests", "x-ratelimit-remaining"):
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return float(value) <= 0
+            except ValueError:
+                return False
+    return False
+
+
+class ModelRateLimiter:
+    """Token bucket and concurrency cap for one model.
+
+    The request rate adapts to the server: it is halved on every 429 and
+    recovers gradually on success. When the server says when to come back
+    (``Retry-After`` or exhausted rate-limit headers) every caller of the
+    model waits until then, instead of each one retrying on its own.
+    """
+
+    def __init__(self, model: str,
+                 requests_per_second: float = RATE_LIMIT_REQUESTS_PER_SECOND,
+                 max_concurrency: int = RATE_LIMIT_MAX_CONCURRENCY):
+        """Initialize the limiter.
+
+        Args:
+            model: Model ID the limiter applies to
+            requests_per_second: Upper bound on the request rate
+            max_concurrency: Maximum concurrent requests to the model
+        """
+        self.model = model
+        self.max_rate = requests_per_second
+        self.min_rate = min(requests_per_second, 0.1)
+        self.rate = requests_per_second
+        self.capacity = max(1.0, requests_per_second)
+        self.tokens = self.capacity
+        self.blocked_until = 0.0
+        self.throttled = 0
+        self._updated = time.monotonic()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Wait for a concurrency slot, any server-imposed pause and a rate token."""
+        await self._semaphore.acquire()
+        try:
+            while True:
+                now = time.monotonic()
+                if self.blocked_until > now:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    def release(self):
+        """Give back the concurrency slot."""
+        self._semaphore.release()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+    def on_success(self, headers: Optional[Mapping[str, str]] = None):
+        """Recover the request rate and honour exhausted-quota headers.
+
+        Args:
+            headers: Response headers of the successful call
+        """
+        self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+        if _requests_exhausted(headers):
+            delay = retry_delay_from_headers(headers)
+            if delay:
+                self._block(delay)
+
+    def on_rate_limited(self, headers: Optional[Mapping[str, str]], attempt: int) -> float:
+        """Back off after a 429 response.
+
+        Args:
+            headers: Headers of the 429 response
+            attempt: Zero-based retry attempt
+
+        Returns:
+            Seconds the model is paused for
+        """
+        self.throttled += 1
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = 0.0
+
+        delay = retry_delay_from_headers(headers)
+        if delay is not None:
+            # Small jitter so waiting callers don't all fire at the reset instant
+            delay += random.uniform(0, min(1.0, delay * 0.1 + 0.1))
+        else:
+            cap = min(RATE_LIMIT_BACKOFF_MAX_SECONDS, RATE_LIMIT_BACKOFF_BASE_SECONDS * 2 ** attempt)
+            delay = cap / 2 + random.uniform(0, cap / 2)
+        self._block(delay)
+        return delay
+
+    def _block(self, delay: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+
+
+_limiters: Dict[str, ModelRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model: str) -> ModelRateLimiter:
+    """Get the process-wide limiter for a model.
+
+    Args:
+        model: Model ID
+
+    Returns:
+        Shared ModelRateLimiter instance
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limiter = ModelRateLimiter(model)
+            _limiters[model] = limiter
+        return limiter
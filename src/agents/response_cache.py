@@ -0,0 +1,78 @@
+"""Persistent, content-addressed cache for LLM responses."""
+
+import json
+import hashlib
+import threading
+from typing import Dict, List, Optional
+
+from config.agent_configs import (
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_PATH,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_MAX_MB,
+    LLM_CACHE_MAX_AGE_DAYS,
+)
+from src.tools.disk_cache import DiskCache
+
+
+def make_cache_key(model: str, instruction: str, messages: List[Dict],
+                   temperature: float, max_tokens: int) -> str:
+    """Build a content hash identifying a completion request.
+
+    Args:
+        model: Model ID
+        instruction: System prompt of the agent
+        messages: Chat messages sent to the model
+        temperature: Sampling temperature
+        max_tokens: Completion token limit
+
+    Returns:
+        Hex SHA-256 digest of the request
+    """
+    payload = json.dumps(
+        {
+            "model": model,
+            "instruction": instruction,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+_cache: Optional[DiskCache] = None
+_cache_lock = threading.Lock()
+_enabled = LLM_CACHE_ENABLED
+
+
+def set_response_cache_enabled(enabled: bool) -> None:
+    """Turn the response cache on or off for the whole process.
+
+    Args:
+        enabled: False to bypass the cache for every agent
+    """
+    global _enabled
+    _enabled = enabled
+
+
+def get_response_cache() -> Optional[DiskCache]:
+    """Get the process-wide response cache.
+
+    Returns:
+        Shared DiskCache, or None when caching is disabled
+    """
+    global _cache
+    if not _enabled:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache(
+                LLM_CACHE_PATH,
+                max_entries=LLM_CACHE_MAX_ENTRIES,
+                max_bytes=int(LLM_CACHE_MAX_MB * 1024 * 1024),
+                max_age_seconds=LLM_CACHE_MAX_AGE_DAYS * 24 * 3600,
+            )
+        return _cache
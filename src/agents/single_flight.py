@@ -0,0 +1,124 @@
+"""Single-flight de-duplication of identical in-flight calls."""
+
+import asyncio
+import threading
+from concurrent.futures import Future, CancelledError
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """Let concurrent callers with the same key share one outstanding call.
+
+    The first caller for a key (the leader) performs the call; callers that
+    arrive while it is in flight wait for and share its result instead of
+    issuing their own. In-flight calls are tracked with thread-safe futures,
+    so threads and asyncio tasks on any event loop can be merged together.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        # Callers that got the outcome of another caller's call
+        self.merged = 0
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """Return the in-flight future for ``key`` and whether this caller leads."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            return future, True
+
+    def _count_merged(self) -> None:
+        with self._lock:
+            self.merged += 1
+
+    def _finish(self, key: str, future: Future) -> None:
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    @staticmethod
+    def _leader_cancelled(future: Future) -> bool:
+        """Whether the leader of a finished call gave up instead of producing a result."""
+        if not future.done():
+            return False
+        return future.cancelled() or isinstance(future.exception(), CancelledError)
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run ``fn`` unless an identical call is already in flight.
+
+        Args:
+            key: Request key identifying identical calls
+            fn: Function performing the call
+
+        Returns:
+            Tuple of (result, shared) where shared is True if the result came
+            from another caller's call
+        """
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                try:
+                    result = future.result()
+                except CancelledError:
+                    continue  # The leader gave up; try again ourselves
+                except BaseException:
+                    self._count_merged()
+                    raise
+                self._count_merged()
+                return result, True
+            try:
+                result = fn()
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            else:
+                future.set_result(result)
+                return result, False
+            finally:
+                self._finish(key, future)
+
+    async def ado(self, key: str, coro_fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Await ``coro_fn()`` unless an identical call is already in flight.
+
+        Args:
+            key: Request key identifying identical calls
+            coro_fn: Function returning the coroutine performing the call
+
+        Returns:
+            Tuple of (result, shared) where shared is True if the result came
+            from another caller's call
+        """
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                try:
+                    # Shielded so that cancelling this caller leaves the shared call running
+                    result = await asyncio.shield(asyncio.wrap_future(future))
+                except (asyncio.CancelledError, CancelledError):
+                    # wrap_future turns the leader's cancellation into asyncio.CancelledError,
+                    # the same error this caller gets when it is cancelled itself
+                    if self._leader_cancelled(future):
+                        continue  # The leader was cancelled; try again ourselves
+                    raise
+                except BaseException:
+                    self._count_merged()
+                    raise
+                self._count_merged()
+                return result, True
+            try:
+                result = await coro_fn()
+            except asyncio.CancelledError:
+                future.set_exception(CancelledError())
+                raise
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            else:
+                future.set_result(result)
+                return result, False
+            finally:
+                self._finish(key, future)
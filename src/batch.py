@@ -0,0 +1,284 @@
+"""Batch entry point: build many projects concurrently.
+
+Usage:
+    python -m src.batch tasks.jsonl --concurrency 8 --output-dir ./output
+
+The input is a JSONL file of {"task": ..., "name": ...} objects or a CSV
+file with ``task`` and ``name`` columns. All projects share the process-wide
+connection pool, rate limiters and response cache; each one has its own
+DevelopmentState and UsageTracker.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import math
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+from src.state import DevelopmentState
+from src.chain.development_chain import create_development_chain
+from src.agents.response_cache import set_response_cache_enabled
+from src.tools.checkpoint import has_checkpoint, resume_from_checkpoint
+from config.agent_configs import (
+    CHECKPOINT_ENABLED,
+    DEFAULT_MODEL,
+    FIX_MODE,
+    FIX_MODES,
+    REVIEW_MODE,
+    REVIEW_MODES,
+    TESTER_MODE,
+    TESTER_MODES,
+)
+
+
+def load_tasks(path: str) -> List[Dict[str, str]]:
+    """Read project definitions from a JSONL or CSV file.
+
+    Args:
+        path: Path to a .jsonl or .csv file
+
+    Returns:
+        List of dictionaries with at least "task" and "name"
+
+    Raises:
+        ValueError: If a row is missing fields or names are not unique
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.lower().endswith('.csv'):
+            rows = [dict(row) for row in csv.DictReader(f)]
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    names = set()
+    for index, row in enumerate(rows, 1):
+        if not row.get("task") or not row.get("name"):
+            raise ValueError(f"Row {index} of {path} needs both 'task' and 'name'")
+        if row["name"] in names:
+            raise ValueError(f"Duplicate project name '{row['name']}' in {path}")
+        names.add(row["name"])
+    return rows
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    """Nearest-rank percentile of a list of values (0 if empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(percentile / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_project(row: Dict[str, str], output_root: str, chain_factory: Callable,
+                base_model: str, cancelled: Optional[threading.Event] = None) -> Dict:
+    """Build one project with its own state and usage tracker.
+
+    With checkpoints enabled, the run is checkpointed in the project
+    directory, and a checkpoint left there by an interrupted run of the same
+    task is resumed instead of starting over.
+
+    Args:
+        row: Project definition with "task" and "name"
+        output_root: Directory under which the project directory is created
+            (a row may override it with "output_dir")
+        chain_factory: Function returning a fresh development chain
+        base_model: Model used to price calls to unknown models
+        cancelled: Event that, once set, stops the run between phases and
+            iterations and stops it writing to the project
+
+    Returns:
+        Per-project result for the batch summary
+    """
+    # The coding phase creates the project directory under this root
+    root = os.path.abspath(row.get("output_dir") or output_root)
+    project_directory = os.path.join(root, row["name"])
+    state = None
+    if CHECKPOINT_ENABLED and has_checkpoint(project_directory):
+        # A requeued job or a re-run batch continues where the interrupted run stopped
+        try:
+            state = resume_from_checkpoint(project_directory)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring the checkpoint of {row['name']}: {e}")
+        if state is not None and state.task_prompt != row["task"]:
+            print(f"Ignoring the checkpoint of {row['name']}: it is for another task")
+            state = None
+        if state is not None:
+            print(f"Resuming {row['name']} after: {', '.join(state.completed_phases) or 'no completed phases'}")
+    if state is None:
+        state = DevelopmentState()
+        state.task_prompt = row["task"]
+        state.project_name = row["name"]
+        state.output_directory = root
+        if CHECKPOINT_ENABLED:
+            state.checkpoint_directory = project_directory
+
+    if cancelled is not None:
+        state.cancelled = cancelled
+
+    start_time = time.time()
+    error = None
+    try:
+        result = chain_factory().run(row["task"], state=state)
+        if isinstance(result, str) and result.startswith("Error in development chain"):
+            error = result.split("\n", 1)[0]
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    duration = time.time() - start_time
+
+    state.usage_tracker.finish(model=base_model)
+    usage = state.usage_tracker.get_summary()
+    return {
+        "name": row["name"],
+        "status": "error" if error else "ok",
+        "error": error,
+        "duration_seconds": round(duration, 2),
+        "output_directory": state.output_directory,
+        "files": list(state.codes.keys()),
+        "api_calls": usage["total_api_calls"],
+        "total_tokens": usage["total_tokens"],
+        "cost_usd": round(state.usage_tracker.summary.estimated_cost, 6),
+    }
+
+
+async def run_batch(rows: List[Dict[str, str]], concurrency: int = 4, output_root: str = "./output",
+                    chain_factory: Optional[Callable] = None,
+                    base_model: str = DEFAULT_MODEL) -> Dict:
+    """Run many development chains concurrently.
+
+    Each chain runs in a worker thread; its LLM calls go through the shared
+    transport, so the number of projects in flight is bounded here while
+    the per-model rate limiters pace the requests of all of them together.
+
+    Args:
+        rows: Project definitions
+        concurrency: Maximum number of projects built at the same time
+        output_root: Directory under which project directories are created
+        chain_factory: Function returning a fresh development chain
+        base_model: Model used to price calls to unknown models
+
+    Returns:
+        Aggregate summary with per-project results
+    """
+    chain_factory = chain_factory or create_development_chain
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    start_time = time.time()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch") as executor:
+        async def run_one(row):
+            async with semaphore:
+                result = await loop.run_in_executor(
+                    executor, run_project, row, output_root, chain_factory, base_model
+                )
+            print(f"[{result['status']}] {result['name']} in {result['duration_seconds']}s")
+            return result
+
+        results = await asyncio.gather(*(run_one(row) for row in rows))
+
+    wall_time = time.time() - start_time
+    durations = [result["duration_seconds"] for result in results]
+    return {
+        "projects": len(results),
+        "succeeded": sum(1 for result in results if result["status"] == "ok"),
+        "failed": sum(1 for result in results if result["status"] != "ok"),
+        "concurrency": concurrency,
+        "wall_time_seconds": round(wall_time, 2),
+        "throughput_projects_per_hour": round(len(results) / wall_time * 3600, 2) if wall_time > 0 else 0.0,
+        "run_time_p50_seconds": round(_percentile(durations, 50), 2),
+        "run_time_p95_seconds": round(_percentile(durations, 95), 2),
+        "total_api_calls": sum(result["api_calls"] for result in results),
+        "total_tokens": sum(result["total_tokens"] for result in results),
+        "total_cost_usd": round(sum(result["cost_usd"] for result in results), 4),
+        "results": list(results),
+    }
+
+
+def positive_int(value: str) -> int:
+    """Argparse type for counts that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def parse_arguments(argv: Optional[List[str]] = None):
+    """Parse command-line arguments.
+
+    Args:
+        argv: Arguments to parse (defaults to sys.argv[1:])
+
+    Returns:
+        Parsed arguments namespace
+    """
+    parser = argparse.ArgumentParser(description="Build many projects concurrently")
+    parser.add_argument("tasks", type=str, help="JSONL or CSV file of {task, name} rows")
+    parser.add_argument("--concurrency", type=positive_int, default=4, help="Projects built at the same time (default: 4)")
+    parser.add_argument("--output-dir", type=str, default="./output", help="Root output directory (default: ./output)")
+    parser.add_argument("--summary", type=str, default=None,
+                        help="Summary JSON path (default: <output-dir>/batch_summary.json)")
+    parser.add_argument("--model", type=str, default=None, help="OpenRouter model override for every role")
+    parser.add_argument("--max-review-iterations", type=int, default=3, help="Maximum code review iterations")
+    parser.add_argument("--max-test-iterations", type=int, default=3, help="Maximum test iterations")
+    parser.add_argument("--fix-mode", choices=FIX_MODES, default=FIX_MODE, help="Full-file or patch fixes")
+    parser.add_argument("--review-mode", choices=REVIEW_MODES, default=REVIEW_MODE,
+                        help="Single or sharded parallel code review")
+    parser.add_argument("--tester-mode", choices=TESTER_MODES, default=TESTER_MODE,
+                        help="Call the Tester only on failing test runs, or always")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the persistent LLM response cache")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Batch entry point."""
+    load_dotenv()
+    if not os.getenv("OPENROUTER_API_KEY"):
+        print("Error: OPENROUTER_API_KEY environment variable not set")
+        sys.exit(1)
+
+    args = parse_arguments()
+    if args.no_cache:
+        set_response_cache_enabled(False)
+    rows = load_tasks(args.tasks)
+
+    def chain_factory():
+        return create_development_chain(
+            model_name=args.model,
+            max_review_iterations=args.max_review_iterations,
+            max_test_iterations=args.max_test_iterations,
+            fix_mode=args.fix_mode,
+            review_mode=args.review_mode,
+            tester_mode=args.tester_mode
+        )
+
+    print(f"Building {len(rows)} projects, {args.concurrency} at a time")
+    summary = asyncio.run(run_batch(rows, args.concurrency, args.output_dir, chain_factory,
+                                    base_model=args.model or os.getenv("OPENROUTER_MODEL", DEFAULT_MODEL)))
+
+    summary_path = args.summary or os.path.join(args.output_dir, "batch_summary.json")
+    os.makedirs(os.path.dirname(summary_path) or ".", exist_ok=True)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    print("=" * 60)
+    print(f"Projects: {summary['succeeded']} succeeded, {summary['failed']} failed")
+    print(f"Wall time: {summary['wall_time_seconds']}s "
+          f"({summary['throughput_projects_per_hour']} projects/hour)")
+    print(f"Run time p50/p95: {summary['run_time_p50_seconds']}s / {summary['run_time_p95_seconds']}s")
+    print(f"Total cost: ${summary['total_cost_usd']:.4f} USD")
+    print(f"Summary written to {summary_path}")
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
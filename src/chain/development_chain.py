@@ -6,19 +6,26 @@ except ImportError:
     SequentialAgent = None
 
 from src.state import DevelopmentState
+from src.tools.checkpoint import save_checkpoint
+from config.agent_configs import FIX_MODE, REVIEW_MODE, TESTER_MODE
 from src.phases.demand_analysis import create_demand_analysis_phase
 from src.phases.coding import create_coding_phase
 from src.phases.code_review import create_code_review_phase
 from src.phases.testing import create_testing_phase
 
 
-def create_development_chain(model_name: str = None, max_review_iterations: int = 3, max_test_iterations: int = 3):
+def create_development_chain(model_name: str = None, max_review_iterations: int = 3, max_test_iterations: int = 3,
+                             fix_mode: str = FIX_MODE, review_mode: str = REVIEW_MODE,
+                             tester_mode: str = TESTER_MODE):
     """Create the main development chain.
     
     Args:
         model_name: Optional model name override
         max_review_iterations: Maximum review loop iterations
         max_test_iterations: Maximum test loop iterations
+        fix_mode: "full" to re-emit whole files on fixes, "patch" for edits only
+        review_mode: "single" for one Reviewer call, "sharded" for concurrent per-file-group reviews
+        tester_mode: "on_failure" to skip the Tester when the tests pass, "always" to analyse every run
         
     Returns:
         SequentialAgent representing the full development chain
@@ -26,8 +33,8 @@ def create_development_chain(model_name: str = None, max_review_iterations: int
     # Create all phases
     demand_analysis = create_demand_analysis_phase(model_name)
     coding = create_coding_phase(model_name)
-    code_review = create_code_review_phase(model_name, max_review_iterations)
-    testing = create_testing_phase(model_name, max_test_iterations)
+    code_review = create_code_review_phase(model_name, max_review_iterations, fix_mode, review_mode)
+    testing = create_testing_phase(model_name, max_test_iterations, fix_mode, tester_mode)
     
     # Create a wrapper that handles state properly
     class DevelopmentChain:
@@ -48,33 +55,31 @@ def create_development_chain(model_name: str = None, max_review_iterations: int
                 state = DevelopmentState()
                 state.task_prompt = input_text
             
-            # Run each phase sequentially
+            # Run each phase sequentially, skipping those a resumed checkpoint has finished
             current_input = input_text
             results = []
             
             try:
-                # Phase 1: Demand Analysis
-                print("Phase 1: Demand Analysis...")
-                result1 = demand_analysis.run(current_input, state)
-                results.append(("Demand Analysis", result1))
-                print(f"Modality: {state.modality}")
-                
-                # Phase 2: Coding
-                print("Phase 2: Coding...")
-                result2 = coding.run(current_input, state)
-                results.append(("Coding", result2))
-                print(f"Language: {state.language}")
-                print(f"Files generated: {list(state.codes.keys())}")
-                
-                # Phase 3: Code Review
-                print("Phase 3: Code Review...")
-                result3 = code_review.run(current_input, state)
-                results.append(("Code Review", result3))
-                
-                # Phase 4: Testing
-                print("Phase 4: Testing...")
-                result4 = testing.run(current_input, state)
-                results.append(("Testing", result4))
+                for number, (phase_name, phase) in enumerate(self.phases, 1):
+                    if phase_name in state.completed_phases:
+                        print(f"Phase {number}: {phase_name} (completed, resumed from checkpoint)")
+                        results.append((phase_name, state.phase_results.get(phase_name, "")))
+                        continue
+                    
+                    state.check_cancelled()
+                    print(f"Phase {number}: {phase_name}...")
+                    result = phase.run(current_input, state)
+                    results.append((phase_name, result))
+                    if phase_name == "Demand Analysis":
+                        print(f"Modality: {state.modality}")
+                    elif phase_name == "Coding":
+                        print(f"Language: {state.language}")
+                        print(f"Files generated: {list(state.codes.keys())}")
+                    
+                    state.phase_results[phase_name] = result
+                    if phase_name not in state.completed_phases:
+                        state.completed_phases.append(phase_name)
+                    save_checkpoint(state)
                 
                 # Final summary
                 summary = "\n\n".join([f"{phase}:\n{result}" for phase, result in results])
@@ -85,5 +90,10 @@ def create_development_chain(model_name: str = None, max_review_iterations: int
                 print(error_msg)
                 return f"{error_msg}\n\nPartial results:\n" + "\n\n".join([f"{phase}:\n{result}" for phase, result in results])
     
-    return DevelopmentChain([demand_analysis, coding, code_review, testing])
+    return DevelopmentChain([
+        ("Demand Analysis", demand_analysis),
+        ("Coding", coding),
+        ("Code Review", code_review),
+        ("Testing", testing),
+    ])
 
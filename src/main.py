@@ -12,6 +12,17 @@ sys.path.insert(0, str(project_root))
 from dotenv import load_dotenv
 from src.state import DevelopmentState
 from src.chain.development_chain import create_development_chain
+from src.agents.response_cache import set_response_cache_enabled
+from src.tools.checkpoint import resume_from_checkpoint
+from config.agent_configs import (
+    CHECKPOINT_ENABLED,
+    FIX_MODE,
+    FIX_MODES,
+    REVIEW_MODE,
+    REVIEW_MODES,
+    TESTER_MODE,
+    TESTER_MODES,
+)
 
 
 def parse_arguments():
@@ -26,14 +37,14 @@ def parse_arguments():
     parser.add_argument(
         "--task",
         type=str,
-        required=True,
-        help="Task description (what software to build)"
+        default=None,
+        help="Task description (what software to build; required unless resuming)"
     )
     parser.add_argument(
         "--name",
         type=str,
-        required=True,
-        help="Project name"
+        default=None,
+        help="Project name (required unless resuming)"
     )
     parser.add_argument(
         "--model",
@@ -59,8 +70,41 @@ def parse_arguments():
         default=3,
         help="Maximum test iterations (default: 3)"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the persistent LLM response cache"
+    )
+    parser.add_argument(
+        "--fix-mode",
+        choices=FIX_MODES,
+        default=FIX_MODE,
+        help="How the Programmer returns fixes: full files or patches (default: full, or FIX_MODE)"
+    )
+    parser.add_argument(
+        "--review-mode",
+        choices=REVIEW_MODES,
+        default=REVIEW_MODE,
+        help="Review all files in one call or in parallel shards of related files (default: single, or REVIEW_MODE)"
+    )
+    parser.add_argument(
+        "--tester-mode",
+        choices=TESTER_MODES,
+        default=TESTER_MODE,
+        help="Call the Tester only when local tests fail, or on every run (default: on_failure, or TESTER_MODE)"
+    )
+    parser.add_argument(
+        "--resume",
+        type=str,
+        default=None,
+        metavar="PROJECT_DIR",
+        help="Continue an interrupted run from the checkpoint in its project directory"
+    )
     
-    return parser.parse_args()
+    args = parser.parse_args()
+    if not args.resume and not (args.task and args.name):
+        parser.error("--task and --name are required unless --resume is given")
+    return args
 
 
 def main():
@@ -77,36 +121,54 @@ def main():
     # Parse arguments
     args = parse_arguments()
     
-    # Initialize state
-    state = DevelopmentState()
-    state.task_prompt = args.task
-    state.project_name = args.name
-    state.output_directory = args.output_dir
+    # Initialize state, or restore it from the checkpoint of an interrupted run
+    if args.resume:
+        try:
+            state = resume_from_checkpoint(args.resume)
+        except (OSError, ValueError) as e:
+            print(f"Error: cannot resume from {args.resume}: {e}")
+            sys.exit(1)
+    else:
+        state = DevelopmentState()
+        state.task_prompt = args.task
+        state.project_name = args.name
+        # Absolute, so that a resumed run writes to the same place from any working directory
+        state.output_directory = os.path.abspath(args.output_dir)
+        if CHECKPOINT_ENABLED:
+            state.checkpoint_directory = os.path.join(state.output_directory, args.name)
     
     print("=" * 60)
     print("OpenRouter Multi-Agent Development System")
     print("=" * 60)
-    print(f"Task: {args.task}")
-    print(f"Project: {args.name}")
+    print(f"Task: {state.task_prompt}")
+    print(f"Project: {state.project_name}")
     base_model = args.model or os.getenv("OPENROUTER_MODEL", "google/gemini-2.5-flash")
     print(f"Base Model: {base_model}")
     print(f"Role Models: Enabled (Check .env for MODEL_<ROLE> overrides)")
-    print(f"Output: {args.output_dir}")
+    print(f"Output: {state.output_directory}")
+    if args.resume:
+        print(f"Resuming after: {', '.join(state.completed_phases) or 'no completed phases'}")
     print("=" * 60)
     print()
     
+    if args.no_cache:
+        set_response_cache_enabled(False)
+    
     # Create development chain
     chain = create_development_chain(
         model_name=args.model,
         max_review_iterations=args.max_review_iterations,
-        max_test_iterations=args.max_test_iterations
+        max_test_iterations=args.max_test_iterations,
+        fix_mode=args.fix_mode,
+        review_mode=args.review_mode,
+        tester_mode=args.tester_mode
     )
     
     # Execute chain
     try:
         import time
         start_time = time.time()
-        result = chain.run(args.task, state=state)
+        result = chain.run(state.task_prompt, state=state)
         end_time = time.time()
         
         # Finish usage tracking
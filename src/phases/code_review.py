@@ -3,8 +3,20 @@
 from src.agents.reviewer_agent import create_reviewer_agent
 from src.agents.programmer_agent import create_programmer_agent
 from src.state import DevelopmentState
-from src.tools.agent_runner import run_agent
-from config.prompts import CODE_REVIEW_PROMPT, FIX_CODE_PROMPT
+from src.tools.agent_runner import is_agent_error, run_agent, run_agents_parallel
+from src.tools.context_builder import make_review_shards, build_focus_context
+from src.tools.checkpoint import save_checkpoint
+from src.tools.convergence import ConvergenceTracker, hash_codes
+from config.agent_configs import (
+    FIX_MODE,
+    CONTEXT_TOKEN_BUDGETS,
+    REVIEW_MODE,
+    REVIEW_SHARD_MAX_TOKENS,
+    SYNTAX_GATE_ENABLED,
+)
+from config.prompts import CODE_CONTEXT_PROMPT, CODE_REVIEW_PROMPT, CODE_REVIEW_SHARD_PROMPT
+from src.phases.fixing import run_fix
+from src.phases.syntax_gate import run_syntax_gate
 
 
 def review_condition(result: str, state: DevelopmentState) -> bool:
@@ -20,12 +32,71 @@ def review_condition(result: str, state: DevelopmentState) -> bool:
     return "<INFO>Finished</INFO>" not in result and "<INFO> Finished</INFO>" not in result
 
 
-def create_code_review_phase(model_name: str = None, max_iterations: int = 3):
+def run_sharded_review(reviewer_agent, state: DevelopmentState,
+                       max_tokens: int = REVIEW_SHARD_MAX_TOKENS) -> str:
+    """Review groups of related files in concurrent Reviewer calls.
+    
+    Each shard sees its own files in full and the rest of the project as
+    outlines. The feedback is merged into one report with a section per
+    shard; the report is finished only when every shard passes.
+    
+    A shard whose call fails is retried once. If it fails again, the error
+    is returned instead of a report (and kept in ``state.iteration_error``),
+    so that no fix is made against an error message or an incomplete review.
+    
+    Args:
+        reviewer_agent: Reviewer agent
+        state: Development state
+        max_tokens: Maximum code tokens per shard
+        
+    Returns:
+        Merged review report, or the error of a shard that failed
+    """
+    shards = make_review_shards(state.codes, max_tokens)
+    calls = []
+    for files in shards:
+        context = CODE_CONTEXT_PROMPT.format(
+            task_prompt=state.task_prompt,
+            language=state.language,
+            codes=build_focus_context(state.codes, files)
+        )
+        prompt = CODE_REVIEW_SHARD_PROMPT.format(files=", ".join(files))
+        calls.append((reviewer_agent, prompt, {"context": context}))
+    print(f"Reviewing {len(state.codes)} files in {len(shards)} parallel shards")
+    responses = run_agents_parallel(calls, state=state, phase="Code Review")
+    failed = [index for index, response in enumerate(responses) if is_agent_error(response)]
+    if failed:
+        print(f"Retrying {len(failed)} failed review shards")
+        retries = run_agents_parallel([calls[index] for index in failed], state=state, phase="Code Review")
+        for index, response in zip(failed, retries):
+            responses[index] = response
+    errors = [response for response in responses if is_agent_error(response)]
+    if errors:
+        state.iteration_error = str(errors[0])
+        return errors[0]
+    
+    sections = []
+    passed = True
+    for files, response in zip(shards, responses):
+        if review_condition(response, state):
+            passed = False
+            sections.append(f"### {', '.join(files)}\n{str(response).strip()}")
+        else:
+            sections.append(f"### {', '.join(files)}\nNo issues found.")
+    report = "\n\n".join(sections)
+    return f"<INFO>Finished</INFO>\n\n{report}" if passed else report
+
+
+def create_code_review_phase(model_name: str = None, max_iterations: int = 3, fix_mode: str = FIX_MODE,
+                             review_mode: str = REVIEW_MODE, syntax_gate: bool = SYNTAX_GATE_ENABLED):
     """Create the code review phase with loop.
     
     Args:
         model_name: Optional model name override
         max_iterations: Maximum number of review iterations
+        fix_mode: "full" to re-emit whole files, "patch" for edits only
+        review_mode: "single" for one Reviewer call, "sharded" for concurrent per-file-group calls
+        syntax_gate: Check the code locally and fix syntax errors before each review
         
     Returns:
         CodeReviewPhase instance
@@ -35,44 +106,40 @@ def create_code_review_phase(model_name: str = None, max_iterations: int = 3):
     
     def review_handler(input_text: str, state: DevelopmentState):
         """Handler for review iteration."""
+        state.iteration_error = ""
+        if syntax_gate:
+            run_syntax_gate(programmer_agent, state, fix_mode)
+        
         # Reviewer analyzes code
-        review_prompt = CODE_REVIEW_PROMPT.format(
-            task_prompt=state.task_prompt,
-            language=state.language,
-            codes=state.get_codes_formatted()
-        )
-        review_response = run_agent(reviewer_agent, review_prompt, state=state)
-        # Track API usage
-        state.usage_tracker.record_api_call_with_text(
-            "Reviewer", "Code Review", reviewer_agent.model,
-            input_text=review_prompt, output_text=str(review_response)
-        )
+        if review_mode == "sharded" and len(state.codes) > 1:
+            review_response = run_sharded_review(reviewer_agent, state)
+        else:
+            # Code snapshot within the Reviewer's token budget, shared with the fix call when nothing is trimmed.
+            # It is sent as a stable prompt prefix so providers can cache it.
+            context = CODE_CONTEXT_PROMPT.format(
+                task_prompt=state.task_prompt,
+                language=state.language,
+                codes=state.get_codes_formatted(CONTEXT_TOKEN_BUDGETS.get("Reviewer"))
+            )
+            review_prompt = CODE_REVIEW_PROMPT
+            review_response = run_agent(reviewer_agent, review_prompt, state=state, phase="Code Review",
+                                        context=context)
         
         # Check if finished
         if "<INFO>Finished</INFO>" in review_response or "<INFO> Finished</INFO>" in review_response:
             state.review_comments = "Code review passed"
             return review_response
         
+        if is_agent_error(review_response):
+            # No feedback to fix; the loop tries again
+            state.iteration_error = str(review_response)
+            return review_response
+        
         # Update review comments
         state.review_comments = review_response
         
         # Programmer fixes code
-        fix_prompt = FIX_CODE_PROMPT.format(
-            task_prompt=state.task_prompt,
-            language=state.language,
-            feedback=review_response,
-            codes=state.get_codes_formatted()
-        )
-        fix_response = run_agent(programmer_agent, fix_prompt, state=state)
-        # Track API usage
-        state.usage_tracker.record_api_call_with_text(
-            "Programmer", "Code Review", programmer_agent.model,
-            input_text=fix_prompt, output_text=str(fix_response)
-        )
-        
-        # Update codes
-        state.update_codes(fix_response)
-        state.save_to_directory()
+        fix_response = run_fix(programmer_agent, review_response, state, "Code Review", fix_mode=fix_mode)
         
         return f"Review: {review_response}\n\nFixes applied: {fix_response}"
     
@@ -86,11 +153,33 @@ def create_code_review_phase(model_name: str = None, max_iterations: int = 3):
             self.max_iterations = max_iterations
         
         def run(self, input_text: str, state: DevelopmentState):
-            # Manual loop with condition check
+            # Manual loop with condition check, continuing after the iterations
+            # a resumed checkpoint has already done
             result = None
-            for i in range(self.max_iterations):
+            tracker = ConvergenceTracker()
+            for i in range(state.loop_iterations.get("Code Review", 0), self.max_iterations):
+                state.check_cancelled()
+                code_before = hash_codes(state.codes)
                 result = self.handler(input_text, state)
-                if not self.condition_func(result, state):
+                finished = not self.condition_func(result, state)
+                if state.iteration_error:
+                    # Code left unchanged by a failed call is not a fixed point
+                    print(f"Code review iteration {i + 1} had a failed call: {state.iteration_error}")
+                elif not finished:
+                    # Stop when another iteration would not change anything
+                    reason = tracker.record(code_before, state.codes, state.review_comments)
+                    if reason:
+                        print(f"Stopping code review after iteration {i + 1}: {reason}")
+                        finished = True
+                state.phase_results["Code Review"] = result
+                if finished or i + 1 == self.max_iterations:
+                    state.loop_iterations.pop("Code Review", None)
+                    if "Code Review" not in state.completed_phases:
+                        state.completed_phases.append("Code Review")
+                else:
+                    state.loop_iterations["Code Review"] = i + 1
+                save_checkpoint(state)
+                if finished:
                     break
             return result or "Code review completed"
     
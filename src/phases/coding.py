@@ -7,7 +7,7 @@ from src.agents.programmer_agent import create_programmer_agent
 from src.state import DevelopmentState
 from src.tools.agent_runner import run_agent
 from config.prompts import LANGUAGE_SELECTION_PROMPT, CODING_PROMPT
-from src.tools.file_manager import create_project_directory
+from src.tools.file_manager import create_project_directory, write_files
 
 
 def extract_language(response: str) -> str:
@@ -40,11 +40,13 @@ def extract_language(response: str) -> str:
         return "Python"  # Default
 
 
-def create_coding_phase(model_name: str = None):
+def create_coding_phase(model_name: str = None, stream: bool = True):
     """Create the coding phase.
     
     Args:
         model_name: Optional model name override
+        stream: Stream the Programmer response and write each file as soon
+            as it is complete
         
     Returns:
         SequentialAgent for coding
@@ -59,38 +61,42 @@ def create_coding_phase(model_name: str = None):
             task_prompt=state.task_prompt,
             modality=state.modality
         )
-        cto_response = run_agent(cto_agent, lang_prompt, state=state)
-        # Track API usage
-        state.usage_tracker.record_api_call_with_text(
-            "CTO", "Coding", cto_agent.model,
-            input_text=lang_prompt, output_text=str(cto_response)
-        )
+        cto_response = run_agent(cto_agent, lang_prompt, state=state, phase="Coding")
         language = extract_language(cto_response)
         state.language = language
         
+        # Create output directory up front so streamed files can be flushed
+        if state.project_name:
+            output_dir = create_project_directory(
+                state.project_name,
+                state.output_directory or "./output"
+            )
+            state.output_directory = output_dir
+        
+        def on_file(filename: str, code: str):
+            """Write each file as soon as its code block is complete."""
+            state.codes[filename] = code
+            if state.project_name and not state.cancelled.is_set():
+                write_files(state.output_directory, {filename: code})
+            print(f"  File ready: {filename}")
+        
         # Step 2: Code generation
         coding_prompt = CODING_PROMPT.format(
             task_prompt=state.task_prompt,
             modality=state.modality,
             language=language
         )
-        programmer_response = run_agent(programmer_agent, coding_prompt, state=state)
-        # Track API usage
-        state.usage_tracker.record_api_call_with_text(
-            "Programmer", "Coding", programmer_agent.model,
-            input_text=coding_prompt, output_text=str(programmer_response)
-        )
+        if stream:
+            programmer_response = run_agent(programmer_agent, coding_prompt, state=state, phase="Coding",
+                                            stream=True, on_file=on_file)
+        else:
+            programmer_response = run_agent(programmer_agent, coding_prompt, state=state, phase="Coding")
         
         # Extract and update codes
         state.update_codes(programmer_response)
         
-        # Create output directory and save files
+        # Save files
         if state.project_name:
-            output_dir = create_project_directory(
-                state.project_name,
-                state.output_directory or "./output"
-            )
-            state.output_directory = output_dir
             state.save_to_directory()
         
         return f"Language selected: {language}\n\nCode generated:\n{programmer_response}"
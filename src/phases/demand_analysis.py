@@ -56,21 +56,11 @@ def create_demand_analysis_phase(model_name: str = None):
         prompt = DEMAND_ANALYSIS_PROMPT.format(task_prompt=state.task_prompt)
         
         # Run CEO agent
-        ceo_response = run_agent(ceo_agent, prompt, state=state)
-        # Track API usage
-        state.usage_tracker.record_api_call_with_text(
-            "CEO", "Demand Analysis", ceo_agent.model,
-            input_text=prompt, output_text=str(ceo_response)
-        )
+        ceo_response = run_agent(ceo_agent, prompt, state=state, phase="Demand Analysis")
         
         # Run CPO agent with CEO's analysis
         cpo_prompt = f"{prompt}\n\nCEO Analysis:\n{ceo_response}"
-        cpo_response = run_agent(cpo_agent, cpo_prompt, state=state)
-        # Track API usage
-        state.usage_tracker.record_api_call_with_text(
-            "CPO", "Demand Analysis", cpo_agent.model,
-            input_text=cpo_prompt, output_text=str(cpo_response)
-        )
+        cpo_response = run_agent(cpo_agent, cpo_prompt, state=state, phase="Demand Analysis")
         
         # Extract modality
         modality = extract_modality(cpo_response)
@@ -0,0 +1,180 @@
+"""Programmer fix step shared by the code review and testing loops."""
+
+import os
+from typing import Dict, List
+
+from src.state import DevelopmentState
+from src.tools.agent_runner import is_agent_error, run_agent, run_agents_parallel
+from src.tools.code_manager import extract_code_blocks, apply_patches
+from src.tools.context_builder import build_code_context
+from src.tools.feedback_parser import FileFeedback, split_feedback
+from config.agent_configs import FIX_MODE, CONTEXT_TOKEN_BUDGETS, PARALLEL_FIXES
+from config.prompts import (
+    CODE_CONTEXT_PROMPT,
+    FIX_CODE_PROMPT,
+    FIX_CODE_PATCH_PROMPT,
+    PATCH_CONFLICT_PROMPT,
+    FIX_FILE_PROMPT,
+    FIX_FILE_PATCH_PROMPT,
+)
+
+
+def _file_updates(extracted: Dict[str, str], filename: str, codes: Dict[str, str]) -> Dict[str, str]:
+    """Keep the target file and new files from one per-file fix response.
+
+    Edits to other existing files are dropped: they are read-only context
+    for this call and may be fixed concurrently by another one.
+    """
+    updates = {}
+    for name, code in extracted.items():
+        if name == filename or (name not in codes and os.path.basename(name) == os.path.basename(filename)):
+            updates[filename] = code
+        elif name not in codes and not any(known.endswith('/' + name) or name.endswith('/' + known)
+                                           for known in codes):
+            updates[name] = code
+    return updates
+
+
+def _without_elided(updates: Dict[str, str], elided: List[str]) -> Dict[str, str]:
+    """Drop files the Programmer only saw as an outline (or not at all).
+
+    What it returns for such a file is at best a rewrite from signatures and
+    would replace the real code with a stub.
+    """
+    dropped = sorted(name for name in updates if name in elided)
+    if dropped:
+        print(f"Ignoring output for files shown only in outline: {', '.join(dropped)}")
+    return {name: code for name, code in updates.items() if name not in elided}
+
+
+def _record_errors(state: DevelopmentState, responses: List[str]) -> None:
+    """Keep the first failed Programmer call of the iteration on the state."""
+    for response in responses:
+        if is_agent_error(response) and not state.iteration_error:
+            state.iteration_error = str(response)
+
+
+def run_parallel_fix(programmer_agent, file_feedback: FileFeedback, state: DevelopmentState, phase: str,
+                     context: str, fix_mode: str = FIX_MODE) -> str:
+    """Fix every file named in the feedback in its own concurrent Programmer call.
+    
+    Each call sees the whole project as read-only context (the same prompt
+    prefix for all of them) and returns only its own file. The results are
+    merged into the state in one step after every call has finished, so
+    the calls never see each other's partial changes.
+    
+    Args:
+        programmer_agent: Programmer agent
+        file_feedback: Feedback split per file
+        state: Development state whose codes are updated
+        phase: Phase name for usage tracking
+        context: Code context shared by all calls
+        fix_mode: "full" or "patch"
+        
+    Returns:
+        Programmer responses, one section per file
+    """
+    snapshot = dict(state.codes)
+    targets = list(file_feedback.files)
+    prompt_template = FIX_FILE_PATCH_PROMPT if fix_mode == "patch" else FIX_FILE_PROMPT
+    calls = [(programmer_agent,
+              prompt_template.format(filename=filename, feedback=file_feedback.for_file(filename)),
+              {"context": context})
+             for filename in targets]
+    print(f"Fixing {len(targets)} files in parallel: {', '.join(targets)}")
+    responses = run_agents_parallel(calls, state=state, phase=phase)
+    _record_errors(state, responses)
+    
+    merged: Dict[str, str] = {}
+    conflicts: List[str] = []
+    for filename, response in zip(targets, responses):
+        if fix_mode == "patch":
+            result = apply_patches(snapshot, response)
+            if filename in result.failed:
+                conflicts.append(filename)
+            merged.update(_file_updates(result.codes, filename, snapshot))
+        else:
+            merged.update(_file_updates(extract_code_blocks(response), filename, snapshot))
+    
+    sections = [f"### {filename}\n{response}" for filename, response in zip(targets, responses)]
+    if conflicts:
+        # The conflicting files were left unchanged, so the context still matches them
+        print(f"Patches did not apply to {', '.join(conflicts)}; requesting full files")
+        calls = [(programmer_agent,
+                  PATCH_CONFLICT_PROMPT.format(files=filename, feedback=file_feedback.for_file(filename)),
+                  {"context": context})
+                 for filename in conflicts]
+        retries = run_agents_parallel(calls, state=state, phase=phase)
+        _record_errors(state, retries)
+        for filename, response in zip(conflicts, retries):
+            merged.update(_file_updates(extract_code_blocks(response), filename, snapshot))
+            sections.append(f"### {filename} (full file)\n{response}")
+    
+    state.codes.update(merged)
+    state.save_to_directory()
+    return "\n\n".join(sections)
+
+
+def run_fix(programmer_agent, feedback: str, state: DevelopmentState, phase: str,
+            hint: str = None, fix_mode: str = FIX_MODE, parallel: bool = PARALLEL_FIXES) -> str:
+    """Have the Programmer fix the code and apply the result to the state.
+    
+    In "full" mode the Programmer re-emits every changed file. In "patch"
+    mode it only returns edits, which costs far fewer output tokens; files
+    whose edits do not apply cleanly are requested again in full.
+    
+    When the feedback concerns several files and ``parallel`` is set, each
+    file is fixed in its own concurrent call (see ``run_parallel_fix``).
+    
+    Args:
+        programmer_agent: Programmer agent
+        feedback: Review or test feedback to address
+        state: Development state whose codes are updated
+        phase: Phase name for usage tracking
+        hint: Text naming the files to fix in full when the code has to be
+            trimmed to the Programmer's context budget (defaults to the feedback)
+        fix_mode: "full" or "patch"
+        parallel: Fix the files named in the feedback in concurrent per-file calls
+        
+    Returns:
+        Programmer response(s)
+    """
+    # Identical to the caller's code snapshot whenever all files fit the budget,
+    # so the provider's cached prompt prefix is reused
+    code_context = build_code_context(state.codes, CONTEXT_TOKEN_BUDGETS.get("Programmer"), hint or feedback)
+    context = CODE_CONTEXT_PROMPT.format(
+        task_prompt=state.task_prompt,
+        language=state.language,
+        codes=code_context.text
+    )
+    elided = code_context.outlined + code_context.omitted
+    
+    if parallel:
+        file_feedback = split_feedback(state.codes, feedback)
+        if len(file_feedback.files) >= 2:
+            return run_parallel_fix(programmer_agent, file_feedback, state, phase, context, fix_mode)
+    
+    if fix_mode != "patch":
+        fix_prompt = FIX_CODE_PROMPT.format(feedback=feedback)
+        fix_response = run_agent(programmer_agent, fix_prompt, state=state, phase=phase, context=context)
+        _record_errors(state, [fix_response])
+        state.codes.update(_without_elided(extract_code_blocks(fix_response), elided))
+        state.save_to_directory()
+        return fix_response
+    
+    fix_prompt = FIX_CODE_PATCH_PROMPT.format(feedback=feedback)
+    fix_response = run_agent(programmer_agent, fix_prompt, state=state, phase=phase, context=context)
+    _record_errors(state, [fix_response])
+    failed = state.apply_patches(fix_response)
+    
+    if failed:
+        # The conflicting files were left unchanged, so the context still matches them
+        print(f"Patches did not apply to {', '.join(failed)}; requesting full files")
+        retry_prompt = PATCH_CONFLICT_PROMPT.format(files="\n".join(failed), feedback=feedback)
+        retry_response = run_agent(programmer_agent, retry_prompt, state=state, phase=phase, context=context)
+        _record_errors(state, [retry_response])
+        state.codes.update(_without_elided(extract_code_blocks(retry_response), elided))
+        fix_response = f"{fix_response}\n\n{retry_response}"
+    
+    state.save_to_directory()
+    return fix_response
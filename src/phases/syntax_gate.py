@@ -0,0 +1,41 @@
+"""Local syntax check run before each review and test iteration."""
+
+from typing import List
+
+from src.state import DevelopmentState
+from src.phases.fixing import run_fix
+from src.tools.syntax_check import check_syntax
+from src.tools.test_reports import TestFailure, format_failures
+from config.agent_configs import FIX_MODE, SYNTAX_GATE_MAX_FIXES
+from config.prompts import SYNTAX_FIX_FEEDBACK
+
+
+def run_syntax_gate(programmer_agent, state: DevelopmentState, fix_mode: str = FIX_MODE,
+                    max_fixes: int = SYNTAX_GATE_MAX_FIXES) -> List[TestFailure]:
+    """Check the code locally and have syntax errors fixed before an LLM looks at it.
+    
+    A Reviewer or Tester round trip spent pointing out a syntax error is
+    wasted: the compiler diagnostics go straight to a fix call instead,
+    with the files they name in full.
+    
+    Args:
+        programmer_agent: Programmer agent
+        state: Development state whose codes are checked and fixed
+        fix_mode: "full" or "patch"
+        max_fixes: Maximum number of fix calls
+        
+    Returns:
+        Errors that remain (empty if the code passes the check)
+    """
+    failures = check_syntax(state.codes)
+    for _ in range(max_fixes):
+        if not failures:
+            break
+        files = sorted({failure.file for failure in failures if failure.file})
+        print(f"Syntax check failed in {', '.join(files) or 'the code'}; fixing before the next LLM review")
+        feedback = SYNTAX_FIX_FEEDBACK.format(diagnostics=format_failures(failures, details=True))
+        run_fix(programmer_agent, feedback, state, "Syntax Check", hint="\n".join(files), fix_mode=fix_mode)
+        failures = check_syntax(state.codes)
+    if failures:
+        print(f"Syntax errors remain after {max_fixes} fix attempts")
+    return failures
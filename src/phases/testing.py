@@ -3,9 +3,18 @@
 from src.agents.tester_agent import create_tester_agent
 from src.agents.programmer_agent import create_programmer_agent
 from src.state import DevelopmentState
-from src.tools.agent_runner import run_agent
-from config.prompts import TESTING_PROMPT, FIX_CODE_PROMPT
-from src.tools.test_runner import run_tests, parse_test_errors
+from src.tools.agent_runner import is_agent_error, run_agent
+from config.agent_configs import FIX_MODE, CONTEXT_TOKEN_BUDGETS, TESTER_MODE, SYNTAX_GATE_ENABLED
+from config.prompts import CODE_CONTEXT_PROMPT, TESTING_PROMPT
+from src.phases.fixing import run_fix
+from src.phases.syntax_gate import run_syntax_gate
+from src.tools.test_runner import parse_test_errors, failure_report
+from src.tools.traceback_compressor import compress_failures
+from src.tools.context_builder import relevant_files, build_focus_context
+from src.tools.test_cache import run_tests_cached
+from src.tools.sandbox_pool import get_sandbox_pool
+from src.tools.checkpoint import save_checkpoint
+from src.tools.convergence import ConvergenceTracker, hash_codes
 
 
 def test_condition(result: str, state: DevelopmentState) -> bool:
@@ -22,22 +31,29 @@ def test_condition(result: str, state: DevelopmentState) -> bool:
     if "<INFO>No errors</INFO>" in result or "<INFO> No errors</INFO>" in result:
         return False
     
-    # Check state for error summary
-    if state.error_summary and "error" in state.error_summary.lower():
+    # With local results the decision does not depend on wording: the handler
+    # only returns without the marker after applying fixes (for the failing
+    # tests or for what the Tester reported), which the next iteration re-tests
+    if state.tests_passed is not None:
         return True
     
-    # Check if result indicates errors
+    # Tests were not run: check if result indicates errors
     result_lower = result.lower()
     error_keywords = ["error", "fail", "bug", "issue", "problem"]
     return any(keyword in result_lower for keyword in error_keywords)
 
 
-def create_testing_phase(model_name: str = None, max_iterations: int = 3):
+def create_testing_phase(model_name: str = None, max_iterations: int = 3, fix_mode: str = FIX_MODE,
+                         tester_mode: str = TESTER_MODE, syntax_gate: bool = SYNTAX_GATE_ENABLED):
     """Create the testing phase with loop.
     
     Args:
         model_name: Optional model name override
         max_iterations: Maximum number of test iterations
+        fix_mode: "full" to re-emit whole files, "patch" for edits only
+        tester_mode: "on_failure" to skip the Tester when the tests pass and send it
+            only the failures otherwise, "always" to analyse every test run
+        syntax_gate: Check the code locally and fix syntax errors before each test run
         
     Returns:
         TestingPhase instance
@@ -47,57 +63,79 @@ def create_testing_phase(model_name: str = None, max_iterations: int = 3):
     
     def test_handler(input_text: str, state: DevelopmentState):
         """Handler for test iteration."""
+        state.iteration_error = ""
+        if syntax_gate:
+            run_syntax_gate(programmer_agent, state, fix_mode)
+        
         # Run tests
+        success = False
         if state.output_directory and state.language:
-            success, test_output = run_tests(state.output_directory, state.language)
-            state.test_reports = test_output
+            run = run_tests_cached(
+                state.output_directory, state.language,
+                on_result=lambda line: print(f"  {line.splitlines()[0]}"),
+                usage_tracker=state.usage_tracker
+            )
+            success = run.success
+            state.test_reports = run.output
+            state.tests_passed = run.success
+            state.test_failures = run.failures
             
             # Parse errors
             if not success:
-                state.error_summary = parse_test_errors(test_output)
+                state.error_summary = parse_test_errors(run.output, run.failures)
             else:
                 state.error_summary = ""
         else:
-            test_output = "Tests not run (missing directory or language)"
-            state.test_reports = test_output
+            state.test_reports = "Tests not run (missing directory or language)"
+            state.tests_passed = None
+            state.test_failures = []
             state.error_summary = ""
         
-        # Tester analyzes results
-        test_prompt = TESTING_PROMPT.format(
+        if tester_mode == "on_failure":
+            if success and not state.error_summary:
+                # Nothing to analyse: no Tester round trip on the happy path
+                print("All local tests passed; skipping the Tester")
+                return "<INFO>No errors</INFO>\nAll local tests passed."
+            # Only the failures (grouped and compressed when the run reported them), with
+            # the files they involve in full and the rest as outlines
+            if state.test_failures:
+                test_reports = compress_failures(state.test_failures)
+            else:
+                test_reports = failure_report(state.test_reports)
+            focus = relevant_files(state.codes, f"{test_reports}\n{state.error_summary}")
+            codes = (build_focus_context(state.codes, focus) if focus else
+                     state.get_codes_formatted(CONTEXT_TOKEN_BUDGETS.get("Tester"), hint=test_reports))
+        else:
+            # Code snapshot within the Tester's token budget, shared with the fix call when nothing is trimmed
+            test_reports = compress_failures(state.test_failures) if state.test_failures else state.test_reports
+            codes = state.get_codes_formatted(CONTEXT_TOKEN_BUDGETS.get("Tester"),
+                                              hint=f"{state.test_reports}\n{state.error_summary}")
+        # Sent as a stable prompt prefix so providers can cache it
+        context = CODE_CONTEXT_PROMPT.format(
             task_prompt=state.task_prompt,
             language=state.language,
-            test_reports=state.test_reports,
-            error_summary=state.error_summary,
-            codes=state.get_codes_formatted()
+            codes=codes
         )
-        tester_response = run_agent(tester_agent, test_prompt, state=state)
-        # Track API usage
-        state.usage_tracker.record_api_call_with_text(
-            "Tester", "Testing", tester_agent.model,
-            input_text=test_prompt, output_text=str(tester_response)
+        
+        # Tester analyzes results
+        test_prompt = TESTING_PROMPT.format(
+            test_reports=test_reports,
+            error_summary=state.error_summary
         )
+        tester_response = run_agent(tester_agent, test_prompt, state=state, phase="Testing", context=context)
         
         # Check if no errors
         if "<INFO>No errors</INFO>" in tester_response or "<INFO> No errors</INFO>" in tester_response:
             return tester_response
         
-        # Programmer fixes code
-        fix_prompt = FIX_CODE_PROMPT.format(
-            task_prompt=state.task_prompt,
-            language=state.language,
-            feedback=tester_response,
-            codes=state.get_codes_formatted()
-        )
-        fix_response = run_agent(programmer_agent, fix_prompt, state=state)
-        # Track API usage
-        state.usage_tracker.record_api_call_with_text(
-            "Programmer", "Testing", programmer_agent.model,
-            input_text=fix_prompt, output_text=str(fix_response)
-        )
+        if is_agent_error(tester_response):
+            # No analysis to fix; the loop tries again
+            state.iteration_error = str(tester_response)
+            return tester_response
         
-        # Update codes
-        state.update_codes(fix_response)
-        state.save_to_directory()
+        # Programmer fixes code
+        fix_response = run_fix(programmer_agent, tester_response, state, "Testing",
+                               hint=f"{tester_response}\n{state.error_summary}", fix_mode=fix_mode)
         
         return f"Test Analysis: {tester_response}\n\nFixes applied: {fix_response}"
     
@@ -111,11 +149,37 @@ def create_testing_phase(model_name: str = None, max_iterations: int = 3):
             self.max_iterations = max_iterations
         
         def run(self, input_text: str, state: DevelopmentState):
-            # Manual loop with condition check
+            # Start the interpreters only once testing actually starts (not when the chain is
+            # built), so that they warm up while the syntax check runs
+            get_sandbox_pool()
+            
+            # Manual loop with condition check, continuing after the iterations
+            # a resumed checkpoint has already done
             result = None
-            for i in range(self.max_iterations):
+            tracker = ConvergenceTracker()
+            for i in range(state.loop_iterations.get("Testing", 0), self.max_iterations):
+                state.check_cancelled()
+                code_before = hash_codes(state.codes)
                 result = self.handler(input_text, state)
-                if not self.condition_func(result, state):
+                finished = not self.condition_func(result, state)
+                if state.iteration_error:
+                    # Code left unchanged by a failed call is not a fixed point
+                    print(f"Testing iteration {i + 1} had a failed call: {state.iteration_error}")
+                elif not finished:
+                    # Stop when another iteration would not change anything
+                    reason = tracker.record(code_before, state.codes, state.error_summary, state.tests_passed)
+                    if reason:
+                        print(f"Stopping testing after iteration {i + 1}: {reason}")
+                        finished = True
+                state.phase_results["Testing"] = result
+                if finished or i + 1 == self.max_iterations:
+                    state.loop_iterations.pop("Testing", None)
+                    if "Testing" not in state.completed_phases:
+                        state.completed_phases.append("Testing")
+                else:
+                    state.loop_iterations["Testing"] = i + 1
+                save_checkpoint(state)
+                if finished:
                     break
             return result or "Testing completed"
     
@@ -1,6 +1,13 @@
 """Development state management for the multi-agent system."""
 
-from typing import Dict, Optional
+import threading
+from typing import Any, Dict, List, Optional
+
+from src.tools.test_reports import TestFailure
+
+
+class RunCancelled(Exception):
+    """The run was cancelled (e.g. its job lease was lost) and must stop."""
 
 
 class DevelopmentState:
@@ -15,12 +22,82 @@ class DevelopmentState:
         self.review_comments: str = ""
         self.test_reports: str = ""
         self.error_summary: str = ""
+        # Outcome of the last local test run (None until tests were run)
+        self.tests_passed: Optional[bool] = None
+        self.test_failures: List[TestFailure] = []
         self.project_name: str = ""
         self.output_directory: str = ""
+        # Progress recorded in checkpoints: finished phases, their results and
+        # the iterations done so far by a review or test loop that has not finished
+        self.completed_phases: List[str] = []
+        self.phase_results: Dict[str, str] = {}
+        self.loop_iterations: Dict[str, int] = {}
+        # Error of an LLM call that failed during the current review or test iteration (empty if none)
+        self.iteration_error: str = ""
+        # Project directory whose checkpoint is updated as the run progresses (none if empty)
+        self.checkpoint_directory: str = ""
+        # Set when the run must stop; nothing is written to the project once it is set
+        self.cancelled: threading.Event = threading.Event()
         # Initialize usage tracker
         from src.tools.usage_tracker import UsageTracker
         self.usage_tracker: UsageTracker = UsageTracker()
     
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialise the state to JSON-compatible values.
+        
+        Returns:
+            Dictionary with the task, code, review and test artifacts,
+            progress and usage records
+        """
+        return {
+            "task_prompt": self.task_prompt,
+            "modality": self.modality,
+            "language": self.language,
+            "codes": dict(self.codes),
+            "review_comments": self.review_comments,
+            "test_reports": self.test_reports,
+            "error_summary": self.error_summary,
+            "tests_passed": self.tests_passed,
+            "test_failures": [failure.to_dict() for failure in self.test_failures],
+            "project_name": self.project_name,
+            "output_directory": self.output_directory,
+            "completed_phases": list(self.completed_phases),
+            "phase_results": dict(self.phase_results),
+            "loop_iterations": dict(self.loop_iterations),
+            "usage": self.usage_tracker.to_dict(),
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DevelopmentState":
+        """Rebuild a state serialised with to_dict.
+        
+        Args:
+            data: Dictionary returned by to_dict
+            
+        Returns:
+            DevelopmentState with the same contents
+        """
+        from src.tools.usage_tracker import UsageTracker
+        state = cls()
+        for name in ("task_prompt", "modality", "language", "codes", "review_comments", "test_reports",
+                     "error_summary", "tests_passed", "project_name", "output_directory",
+                     "completed_phases", "phase_results", "loop_iterations"):
+            if name in data:
+                setattr(state, name, data[name])
+        state.test_failures = [TestFailure.from_dict(failure) for failure in data.get("test_failures", [])]
+        if "usage" in data:
+            state.usage_tracker = UsageTracker.from_dict(data["usage"])
+        return state
+    
+    def check_cancelled(self) -> None:
+        """Stop the run between phases and iterations once it has been cancelled.
+        
+        Raises:
+            RunCancelled: If the run was cancelled
+        """
+        if self.cancelled.is_set():
+            raise RunCancelled("Run cancelled")
+    
     def update_codes(self, content: str) -> None:
         """Parse and update code files from LLM response.
         
@@ -31,14 +108,33 @@ class DevelopmentState:
         extracted_codes = extract_code_blocks(content)
         self.codes.update(extracted_codes)
     
-    def get_codes_formatted(self) -> str:
+    def apply_patches(self, content: str) -> List[str]:
+        """Apply a patch-mode LLM response (SEARCH/REPLACE blocks or unified diffs).
+        
+        Args:
+            content: LLM response containing edits to the code files
+            
+        Returns:
+            Filenames whose edits did not apply; these files are left unchanged
+        """
+        from src.tools.code_manager import apply_patches
+        result = apply_patches(self.codes, content)
+        self.codes.update(result.codes)
+        return result.failed
+    
+    def get_codes_formatted(self, budget: Optional[int] = None, hint: Optional[str] = None) -> str:
         """Format codes for inclusion in prompts.
         
+        Args:
+            budget: Maximum tokens for the code (None includes every file in full)
+            hint: Feedback or test output; files it mentions are kept in full
+                when the budget forces other files down to an outline
+        
         Returns:
-            Formatted string representation of all code files
+            Formatted string representation of the code files
         """
-        from src.tools.code_manager import format_code_for_prompt
-        return format_code_for_prompt(self.codes)
+        from src.tools.context_builder import build_code_context
+        return build_code_context(self.codes, budget=budget, hint=hint).text
     
     def save_to_directory(self, path: Optional[str] = None) -> None:
         """Write all code files to disk.
@@ -48,6 +144,6 @@ class DevelopmentState:
         """
         from src.tools.file_manager import write_files
         directory = path or self.output_directory
-        if directory:
+        if directory and not self.cancelled.is_set():
             write_files(directory, self.codes)
 
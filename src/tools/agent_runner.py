@@ -2,23 +2,83 @@
 
 import os
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
 
-def run_agent(agent, input_text: str, state=None):
+from config.agent_configs import PARALLEL_AGENT_CALLS
+
+
+# Prefixes of the error messages returned in place of a response when a call fails
+AGENT_ERROR_PREFIXES = ("Error running agent ", "Error contacting OpenRouter", "Error: ")
+
+
+def is_agent_error(response) -> bool:
+    """Whether an agent call returned an error message instead of a response.
+    
+    Args:
+        response: Value returned by ``run_agent``
+        
+    Returns:
+        True if the call failed
+    """
+    return str(response).startswith(AGENT_ERROR_PREFIXES)
+
+
+def run_agent(agent, input_text: str, state=None, phase: str = "", **query_kwargs):
     """Run an agent with the given input.
     
+    When a state is given, the call is recorded in its usage tracker with the
+    token usage, model, latency and finish reason reported for the response.
+    
     Args:
         agent: Agent instance to run (expected to be OpenRouterAgent)
         input_text: Input text for the agent
         state: Optional state object
+        phase: Phase name used for usage tracking
+        **query_kwargs: Extra options passed to ``agent.query`` (e.g. stream, on_file, context)
         
     Returns:
-        Agent response as string
+        Agent response as string (an LLMResponse carrying call metadata on success)
     """
     # Check if agent has query method (OpenRouterAgent)
     if hasattr(agent, 'query'):
+        agent_name = getattr(agent, 'name', 'unknown')
         try:
-            return agent.query(input_text)
+            response = agent.query(input_text, **query_kwargs)
         except Exception as e:
-            return f"Error running agent {getattr(agent, 'name', 'unknown')}: {str(e)}"
+            response = f"Error running agent {agent_name}: {str(e)}"
+        
+        if state is not None and hasattr(state, 'usage_tracker'):
+            prompt_text = (query_kwargs.get('context') or "") + input_text
+            state.usage_tracker.record_response(
+                agent_name, phase, response, input_text=prompt_text,
+                agent_model=getattr(agent, 'model', "")
+            )
+        return response
     
     return "Error: Unsupported agent type. This system now requires OpenRouterAgent."
+
+
+def run_agents_parallel(calls: List[Tuple[Any, str, Dict[str, Any]]], state=None, phase: str = "",
+                        max_concurrency: int = PARALLEL_AGENT_CALLS) -> List[str]:
+    """Run several independent agent calls concurrently.
+    
+    Each call goes through ``run_agent``, so errors become error strings and
+    usage is recorded as usual. The requests share the pooled transport and
+    per-model rate limiters.
+    
+    Args:
+        calls: List of (agent, input_text, query_kwargs) tuples
+        state: Optional state object
+        phase: Phase name used for usage tracking
+        max_concurrency: Maximum number of calls in flight
+        
+    Returns:
+        Responses in the order of ``calls``
+    """
+    if len(calls) <= 1 or max_concurrency <= 1:
+        return [run_agent(agent, text, state=state, phase=phase, **kwargs) for agent, text, kwargs in calls]
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(calls)), thread_name_prefix="agent") as executor:
+        futures = [executor.submit(run_agent, agent, text, state, phase, **kwargs)
+                   for agent, text, kwargs in calls]
+        return [future.result() for future in futures]
@@ -0,0 +1,120 @@
+"""Checkpoints of the development state, to resume an interrupted run.
+
+The state is written to ``<project>/.checkpoint/state.json`` after every
+phase and every review or test iteration. Each write goes to a temporary
+file in the same directory that then replaces the checkpoint, so a run
+killed mid-write leaves the previous checkpoint intact. The directory is
+hidden, so it is neither tested nor part of the test cache key.
+"""
+
+import os
+import json
+import tempfile
+from typing import Optional
+
+from src.state import DevelopmentState
+
+
+CHECKPOINT_DIRNAME = ".checkpoint"
+CHECKPOINT_FILENAME = "state.json"
+
+# Bump when the serialised state changes incompatibly
+CHECKPOINT_VERSION = 1
+
+
+def checkpoint_path(project_directory: str) -> str:
+    """Path of the checkpoint file of a project directory."""
+    return os.path.join(project_directory, CHECKPOINT_DIRNAME, CHECKPOINT_FILENAME)
+
+
+def save_checkpoint(state: DevelopmentState, project_directory: Optional[str] = None) -> Optional[str]:
+    """Atomically write the state to its project's checkpoint.
+    
+    Args:
+        state: Development state
+        project_directory: Project directory (uses state.checkpoint_directory if not provided)
+        
+    Returns:
+        Path written, or None if the state has no checkpoint directory or
+        the run was cancelled
+    """
+    directory = project_directory or state.checkpoint_directory
+    if not directory or state.cancelled.is_set():
+        return None
+    path = checkpoint_path(directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = {"version": CHECKPOINT_VERSION, "state": state.to_dict()}
+    fd, temp_path = tempfile.mkstemp(prefix=".state-", suffix=".tmp", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+def has_checkpoint(project_directory: str) -> bool:
+    """Whether a project directory holds a checkpoint to resume from."""
+    return os.path.isfile(checkpoint_path(project_directory))
+
+
+def load_checkpoint(project_directory: str) -> DevelopmentState:
+    """Load the state saved in a project's checkpoint.
+    
+    The output directory is resolved from where the checkpoint was found,
+    as an absolute path, so that a run resumed from another working
+    directory (or after the project was moved) writes to the project.
+    
+    Args:
+        project_directory: Project directory of the interrupted run
+        
+    Returns:
+        Restored state, which keeps updating the same checkpoint
+        
+    Raises:
+        FileNotFoundError: If the directory has no checkpoint
+        ValueError: If the checkpoint was written by an incompatible version
+    """
+    path = checkpoint_path(project_directory)
+    with open(path, encoding="utf-8") as f:
+        payload = json.load(f)
+    if payload.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version in {path}: {payload.get('version')}")
+    state = DevelopmentState.from_dict(payload["state"])
+    project_directory = os.path.abspath(project_directory)
+    if "Coding" in state.completed_phases:
+        state.output_directory = project_directory
+    else:
+        # The coding phase creates the project directory under this root
+        state.output_directory = os.path.dirname(project_directory)
+    state.checkpoint_directory = project_directory
+    return state
+
+
+def resume_from_checkpoint(project_directory: str) -> DevelopmentState:
+    """Load a project's checkpoint and restore its files to the checkpointed code.
+    
+    Files on disk may come from a fix that was cut short, so they are
+    rewritten from the state.
+    
+    Args:
+        project_directory: Project directory of the interrupted run
+        
+    Returns:
+        Restored state
+        
+    Raises:
+        FileNotFoundError: If the directory has no checkpoint
+        ValueError: If the checkpoint was written by an incompatible version
+    """
+    state = load_checkpoint(project_directory)
+    if "Coding" in state.completed_phases:
+        state.save_to_directory()
+    return state
@@ -1,7 +1,66 @@
 """Code extraction and formatting utilities."""
 
 import re
-from typing import Dict
+import difflib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from config.agent_configs import PATCH_FUZZY_MATCH_THRESHOLD
+
+
+VALID_EXTENSIONS = ('.py', '.js', '.ts', '.java', '.cpp', '.c', '.h', '.html', '.css', '.json', '.yaml', '.yml', '.md', '.sh', '.bat', '.ps1', '.txt')
+
+# Labels that may precede a filename line, e.g. "File: index.html" or "## index.html"
+FILENAME_PREFIXES = ("FILENAME:", "FILE:", "##", "**")
+
+# Markers of a SEARCH/REPLACE edit block in patch-mode fix responses
+PATCH_SEARCH_MARKER = "<<<<<<< SEARCH"
+PATCH_DIVIDER = "======="
+PATCH_REPLACE_MARKER = ">>>>>>> REPLACE"
+
+
+def _filename_from_line(line: str) -> Optional[str]:
+    """Return the filename announced by a line, or None if it is not a filename line.
+    
+    Args:
+        line: A single line of model output
+        
+    Returns:
+        Cleaned filename, or None
+    """
+    line = line.strip()
+    
+    # Cheap rejection of code and prose lines: a filename line is short and has an extension
+    if '.' not in line or len(line) > 120:
+        return None
+    
+    # Check if line looks like a filename indicator
+    # Support matches like: "index.html", "FILENAME: index.html", "File: index.html", "## index.html"
+    clean_line = line
+    for prefix in FILENAME_PREFIXES:
+        if clean_line.upper().startswith(prefix):
+            clean_line = clean_line[len(prefix):].strip()
+    
+    clean_line = clean_line.strip("*#: ")
+    
+    # Stricter filename validation
+    # 1. Must contain a dot and a valid extension
+    # 2. Must be relatively short (< 100 chars)
+    # 3. Must NOT contain spaces
+    # 4. Must NOT start with common sentence words
+    is_potential_filename = (
+        clean_line and 
+        not clean_line.startswith('```') and
+        any(clean_line.lower().endswith(ext) for ext in VALID_EXTENSIONS) and
+        ' ' not in clean_line and
+        len(clean_line) < 100
+    )
+    
+    if not is_potential_filename:
+        return None
+    
+    # Remove any characters invalid for filenames (especially :)
+    return re.sub(r'[:*?"<>|]', '', clean_line)
 
 
 def extract_code_blocks(text: str) -> Dict[str, str]:
@@ -13,90 +72,512 @@ def extract_code_blocks(text: str) -> Dict[str, str]:
     CODE
     ```
     
+    Code blocks without a filename line are only used if no named file is
+    found; they are then named file_1.py, file_2.py, ...
+    
     Args:
         text: Text containing markdown code blocks
         
     Returns:
         Dictionary mapping filename to code content
     """
-    codes = {}
+    extractor = CodeBlockExtractor()
+    extractor.feed(text)
+    extractor.close()
+    return extractor.codes
+
+
+def _match_fence(line: str) -> Optional[Tuple[str, int, str]]:
+    """Parse a fence line such as ```python or ~~~~.
+    
+    Args:
+        line: Stripped line
+        
+    Returns:
+        Tuple of (fence character, fence length, info string), or None
+    """
+    char = line[:1]
+    if char not in ('`', '~') or not line.startswith(char * 3):
+        return None
+    length = len(line) - len(line.lstrip(char))
+    return char, length, line[length:].strip()
+
+
+class CodeBlockExtractor:
+    """Single-pass parser for code blocks in LLM responses.
     
-    # Pattern to match: filename (optional) followed by code block
-    # Matches: FILENAME\n```LANGUAGE\nCODE\n```
-    pattern = r'(?:^|\n)([A-Za-z0-9_\-\.\/]+\.(?:py|js|ts|java|cpp|c|html|css|json|yaml|yml|md|txt|sh|bat|ps1))(?:\n|$)(?:```(?:python|javascript|typescript|java|cpp|c|html|css|json|yaml|bash|shell|powershell|plaintext)?\n(.*?)```|```\n(.*?)```)'
+    Text can be fed in arbitrary chunks (e.g. from a streamed response); each
+    file is returned as soon as its closing fence arrives, so it can be
+    written to disk before the rest of the response has been generated.
+    Work is linear in the size of the input.
+    
+    Fences follow markdown rules: a block opened with N backticks (or
+    tildes) is closed only by a bare fence of at least N of the same
+    character, so longer fences can wrap content that itself contains
+    fences. Inside markdown files, fenced examples opened with the same
+    fence are tracked as nested blocks rather than ending the file.
+    """
     
-    # Try more flexible line-by-line parsing
-    lines = text.split('\n')
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
+    def __init__(self):
+        self.codes: Dict[str, str] = {}
+        self._pending: List[str] = []
+        self._filename: Optional[str] = None
+        self._fence: Optional[Tuple[str, int]] = None
+        self._fence_marker = ""
+        self._block_name: Optional[str] = None
+        self._nestable = False
+        self._depth = 0
+        self._code_lines: List[str] = []
+        self._unnamed: List[str] = []
+    
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """Consume a chunk of response text.
         
-        # Check if line looks like a filename indicator
-        # Support matches like: "index.html", "FILENAME: index.html", "File: index.html", "## index.html"
-        clean_line = line
-        prefixes_to_strip = ["FILENAME:", "File:", "Filename:", "##", "**"]
-        for prefix in prefixes_to_strip:
-            if clean_line.upper().startswith(prefix.upper()):
-                clean_line = clean_line[len(prefix):].strip()
+        Args:
+            chunk: Next piece of the response
+            
+        Returns:
+            List of (filename, code) pairs completed by this chunk
+        """
+        if '\n' not in chunk:
+            self._pending.append(chunk)
+            return []
+        lines = chunk.split('\n')
+        if self._pending:
+            self._pending.append(lines[0])
+            lines[0] = ''.join(self._pending)
+        self._pending = [lines.pop()]
+        completed = []
+        for line in lines:
+            # Fast path for code lines: only a line containing the fence can end the block
+            if self._fence is not None and self._fence_marker not in line:
+                self._code_lines.append(line)
+                continue
+            finished = self._process_line(line)
+            if finished:
+                completed.append(finished)
+        return completed
+    
+    def close(self) -> List[Tuple[str, str]]:
+        """Finish parsing once the input has ended.
         
-        clean_line = clean_line.strip("*#: ")
+        Flushes the last partial line and an unterminated code block, and
+        names the unnamed blocks when no named file was found.
         
-        # Stricter filename validation
-        # 1. Must contain a dot and a valid extension
-        # 2. Must be relatively short (< 100 chars)
-        # 3. Must NOT contain spaces
-        # 4. Must NOT start with common sentence words
-        valid_extensions = ('.py', '.js', '.ts', '.java', '.cpp', '.c', '.h', '.html', '.css', '.json', '.yaml', '.yml', '.md', '.sh', '.bat', '.ps1', '.txt')
+        Returns:
+            List of (filename, code) pairs completed at end of input
+        """
+        completed = []
+        finished = self._process_line(''.join(self._pending))
+        self._pending = []
+        if finished:
+            completed.append(finished)
+        if self._fence is not None:
+            finished = self._finish_block()
+            if finished:
+                completed.append(finished)
+        self._filename = None
         
-        is_potential_filename = (
-            clean_line and 
-            not clean_line.startswith('```') and
-            any(clean_line.lower().endswith(ext) for ext in valid_extensions) and
-            ' ' not in clean_line and
-            len(clean_line) < 100
-        )
+        if not self.codes:
+            for idx, code in enumerate(self._unnamed):
+                code = code.strip()
+                if code:
+                    filename = f"file_{idx + 1}.py"  # Default to Python
+                    self.codes[filename] = code
+                    completed.append((filename, code))
+        self._unnamed = []
+        return completed
+    
+    def _process_line(self, line: str) -> Optional[Tuple[str, str]]:
+        if self._fence is not None:
+            fence = _match_fence(line.strip())
+            if fence and fence[0] == self._fence[0] and fence[1] >= self._fence[1]:
+                if not fence[2]:
+                    if not self._depth:
+                        return self._finish_block()
+                    self._depth -= 1
+                elif self._nestable:
+                    self._depth += 1
+            self._code_lines.append(line)
+            return None
         
-        if is_potential_filename:
-            # Potential filename
-            filename = clean_line
-            # Remove any characters invalid for filenames (especially :)
-            filename = re.sub(r'[:*?"<>|]', '', filename)
-            
-            # Look for code block starting on next non-empty line
-            j = i + 1
-            while j < len(lines) and not lines[j].strip():
-                j += 1
-            
-            if j < len(lines) and lines[j].strip().startswith('```'):
-                # Found code block
-                code_lines = []
-                j += 1
-                
-                # Collect code until closing ```
-                while j < len(lines):
-                    if lines[j].strip() == '```':
-                        break
-                    code_lines.append(lines[j])
-                    j += 1
-                
-                if code_lines:
-                    codes[filename] = '\n'.join(code_lines)
-                    i = j
-        i += 1
-    
-    # Fallback: extract any code blocks with language hints
-    if not codes:
-        # Pattern: ```language\ncode\n```
-        code_block_pattern = r'```(?:python|javascript|typescript|java|cpp|c|html|css|json|yaml|bash|shell|plaintext)?\n(.*?)```'
-        matches = re.finditer(code_block_pattern, text, re.DOTALL)
-        for idx, match in enumerate(matches):
-            code = match.group(1).strip()
-            if code:
-                # Try to infer filename from context or use default
-                filename = f"file_{idx + 1}.py"  # Default to Python
-                codes[filename] = code
-    
-    return codes
+        fence = _match_fence(line.strip())
+        if fence:
+            # A fence right after a filename line (blank lines allowed) belongs to that file
+            self._open_block(self._filename, fence)
+            self._filename = None
+            return None
+        if self._filename is not None and not line.strip():
+            return None
+        
+        self._filename = _filename_from_line(line)
+        return None
+    
+    def _open_block(self, filename: Optional[str], fence: Tuple[str, int, str]):
+        char, length, info = fence
+        self._fence = (char, length)
+        self._fence_marker = char * 3
+        self._block_name = filename
+        self._nestable = info.lower() in ('markdown', 'md') or bool(filename and filename.lower().endswith('.md'))
+        self._depth = 0
+        self._code_lines = []
+    
+    def _finish_block(self) -> Optional[Tuple[str, str]]:
+        filename, code_lines = self._block_name, self._code_lines
+        self._fence = None
+        self._block_name = None
+        self._code_lines = []
+        if filename is None:
+            self._unnamed.append('\n'.join(code_lines))
+            return None
+        if not code_lines:
+            return None
+        code = '\n'.join(code_lines)
+        self.codes[filename] = code
+        return filename, code
+
+
+@dataclass
+class PatchResult:
+    """Outcome of applying a patch-mode response to a set of files."""
+    # Files updated by the response (patched, created or fully replaced)
+    codes: Dict[str, str] = field(default_factory=dict)
+    # Files whose edits did not apply; they are left unchanged
+    failed: List[str] = field(default_factory=list)
+
+
+def _split_lines(text: str) -> List[str]:
+    """Split text into lines, ignoring one trailing newline."""
+    if text.endswith('\n'):
+        text = text[:-1]
+    return text.split('\n') if text else []
+
+
+def _parse_search_replace(body: str) -> List[Tuple[str, str]]:
+    """Parse SEARCH/REPLACE blocks into (search, replace) pairs."""
+    edits = []
+    search: Optional[List[str]] = None
+    replace: Optional[List[str]] = None
+    for line in body.split('\n'):
+        marker = line.strip()
+        if search is None:
+            if marker.startswith(PATCH_SEARCH_MARKER):
+                search = []
+        elif replace is None:
+            if marker == PATCH_DIVIDER:
+                replace = []
+            else:
+                search.append(line)
+        elif marker.startswith(PATCH_REPLACE_MARKER):
+            edits.append(('\n'.join(search), '\n'.join(replace)))
+            search = replace = None
+        else:
+            replace.append(line)
+    return edits
+
+
+def _diff_filename(header: str) -> Optional[str]:
+    """Extract the path from a ``---``/``+++`` header line (None for /dev/null)."""
+    path = header[4:].split('\t')[0].strip()
+    if path == '/dev/null':
+        return None
+    if path.startswith(('a/', 'b/')):
+        path = path[2:]
+    return path
+
+
+def _parse_unified_diff(body: str) -> List[Tuple[Optional[str], bool, List[Tuple[str, str, int]]]]:
+    """Parse a unified diff.
+    
+    Each hunk becomes a (search, replace, line hint) edit: the search text is
+    its context and removed lines, the replacement its context and added lines.
+    
+    Args:
+        body: Diff text
+        
+    Returns:
+        List of (filename, is_new_file, edits); filename is None when the diff
+        has no file headers
+    """
+    files = []
+    current = None
+    hunk = None
+    
+    lines = body.split('\n')
+    for index, line in enumerate(lines):
+        next_line = lines[index + 1] if index + 1 < len(lines) else ""
+        if line.startswith('--- ') and next_line.startswith('+++ '):
+            current = [_diff_filename(line), line[4:].strip().split('\t')[0] == '/dev/null', []]
+            files.append(current)
+            hunk = None
+            continue
+        if line.startswith('+++ ') and hunk is None and current is not None:
+            current[0] = _diff_filename(line) or current[0]
+            continue
+        header = re.match(r'@@ -(\d+)(?:,\d+)? \+\d+(?:,\d+)? @@', line)
+        if header:
+            if current is None:
+                current = [None, False, []]
+                files.append(current)
+            hunk = ([], [])
+            current[2].append((hunk, int(header.group(1))))
+            continue
+        if hunk is None:
+            continue
+        if line.startswith('\\'):
+            continue  # "\ No newline at end of file"
+        tag, text = (line[0], line[1:]) if line else (' ', '')
+        if tag in ' -':
+            hunk[0].append(text)
+        if tag in ' +':
+            hunk[1].append(text)
+    
+    parsed = []
+    for filename, is_new, hunks in files:
+        edits = []
+        for (search, replace), start in hunks:
+            # Blank lines at the end of a hunk are usually padding, not context
+            while search and replace and search[-1] == '' and replace[-1] == '':
+                search.pop()
+                replace.pop()
+            edits.append(('\n'.join(search), '\n'.join(replace), start))
+        if edits:
+            parsed.append((filename, is_new, edits))
+    return parsed
+
+
+def _find_block(lines: List[str], search: List[str], hint: Optional[int],
+                threshold: float) -> Optional[int]:
+    """Locate ``search`` in ``lines``, tolerating whitespace and small drift.
+    
+    Matching is tried exactly, then ignoring trailing whitespace, then
+    ignoring indentation, and finally by difflib similarity. Among equally
+    good matches the one closest to the line hint (or the first) wins.
+    
+    Args:
+        lines: File content lines
+        search: Lines to find
+        hint: Expected zero-based start line, if known
+        threshold: Minimum similarity for a fuzzy match
+        
+    Returns:
+        Start index of the match, or None
+    """
+    size = len(search)
+    if size == 0 or size > len(lines):
+        return None
+    starts = range(len(lines) - size + 1)
+    
+    def closest(candidates):
+        if hint is None:
+            return candidates[0]
+        return min(candidates, key=lambda start: abs(start - hint))
+    
+    for normalize in (lambda line: line, str.rstrip, str.strip):
+        wanted = [normalize(line) for line in search]
+        matches = [start for start in starts
+                   if [normalize(line) for line in lines[start:start + size]] == wanted]
+        if matches:
+            return closest(matches)
+    
+    wanted = '\n'.join(line.strip() for line in search)
+    best, best_ratio = [], threshold
+    for start in starts:
+        window = '\n'.join(line.strip() for line in lines[start:start + size])
+        matcher = difflib.SequenceMatcher(None, window, wanted, autojunk=False)
+        if matcher.real_quick_ratio() < best_ratio or matcher.quick_ratio() < best_ratio:
+            continue
+        ratio = matcher.ratio()
+        if ratio > best_ratio:
+            best, best_ratio = [start], ratio
+        elif ratio == best_ratio:
+            best.append(start)
+    return closest(best) if best else None
+
+
+def _indent(line: str) -> str:
+    return line[:len(line) - len(line.lstrip())]
+
+
+def _reindent(replace: List[str], search: List[str], matched: List[str]) -> List[str]:
+    """Carry indentation differences between the search text and the matched code over to the replacement."""
+    mapping = {}
+    for wanted, actual in zip(search, matched):
+        if wanted.strip() and actual.strip():
+            mapping.setdefault(_indent(wanted), _indent(actual))
+    if all(wanted == actual for wanted, actual in mapping.items()):
+        return replace
+    
+    reindented = []
+    for line in replace:
+        indent = _indent(line)
+        known = [wanted for wanted in mapping if indent.startswith(wanted)]
+        if line.strip() and known:
+            wanted = max(known, key=len)
+            line = mapping[wanted] + line[len(wanted):]
+        reindented.append(line)
+    return reindented
+
+
+def _apply_edit(content: str, search: str, replace: str, hint: Optional[int] = None,
+                threshold: float = PATCH_FUZZY_MATCH_THRESHOLD) -> Optional[str]:
+    """Apply one search/replace edit to file content.
+    
+    Args:
+        content: Current file content
+        search: Text to replace (empty to append to the file)
+        replace: Replacement text
+        hint: Expected zero-based start line of the search text
+        threshold: Minimum similarity for a fuzzy match
+        
+    Returns:
+        New content, or None if the search text could not be found
+    """
+    if not search.strip():
+        if not content.strip():
+            return replace
+        return content.rstrip('\n') + '\n' + replace
+    
+    lines = content.split('\n')
+    search_lines = _split_lines(search)
+    replace_lines = _split_lines(replace)
+    start = _find_block(lines, search_lines, hint, threshold)
+    if start is None:
+        return None
+    
+    # Re-indent the replacement when the model got the indentation wrong
+    end = start + len(search_lines)
+    replace_lines = _reindent(replace_lines, search_lines, lines[start:end])
+    return '\n'.join(lines[:start] + replace_lines + lines[end:])
+
+
+def _resolve_filename(name: Optional[str], codes: Dict[str, str]) -> Optional[str]:
+    """Map a filename from a patch to an existing file, allowing path prefixes."""
+    if not name or name in codes:
+        return name
+    candidates = [known for known in codes
+                  if name.endswith('/' + known) or known.endswith('/' + name)]
+    return candidates[0] if len(candidates) == 1 else name
+
+
+def _iter_patch_blocks(text: str) -> List[Tuple[Optional[str], str]]:
+    """Split a patch response into (filename, body) blocks.
+    
+    Bodies are the contents of fenced code blocks, plus SEARCH/REPLACE blocks
+    written without a fence. The filename is the last filename line seen
+    before the block (None if there was none).
+    
+    As in ``CodeBlockExtractor``, a fenced block is closed only by a bare
+    fence of at least its own length and character. Fences inside the
+    edits themselves (the search and replace text of a SEARCH/REPLACE block,
+    or the lines of a diff hunk) are content, so patches to markdown files
+    and other files containing fences are not cut short.
+    """
+    blocks = []
+    filename = None
+    body: Optional[List[str]] = None
+    fence: Optional[Tuple[str, int]] = None
+    in_edit = False
+    in_hunk = False
+    for line in text.split('\n'):
+        marker = line.strip()
+        if body is not None and fence is not None:
+            if marker.startswith(PATCH_SEARCH_MARKER):
+                in_edit = True
+            elif marker.startswith(PATCH_REPLACE_MARKER):
+                in_edit = False
+            elif marker.startswith('@@'):
+                in_hunk = True
+            elif not in_edit and not (in_hunk and line[:1] in (' ', '+', '-')):
+                closing = _match_fence(marker)
+                if closing and not closing[2] and closing[0] == fence[0] and closing[1] >= fence[1]:
+                    blocks.append((filename, '\n'.join(body)))
+                    body = None
+                    continue
+            body.append(line)
+        elif body is not None:
+            body.append(line)
+            if marker.startswith(PATCH_REPLACE_MARKER):
+                blocks.append((filename, '\n'.join(body)))
+                body = None
+        elif _match_fence(marker):
+            char, length, _ = _match_fence(marker)
+            body, fence, in_edit, in_hunk = [], (char, length), False, False
+        elif marker.startswith(PATCH_SEARCH_MARKER):
+            body, fence = [line], None
+        elif marker:
+            filename = _filename_from_line(line) or filename
+    if body is not None:
+        blocks.append((filename, '\n'.join(body)))
+    return blocks
+
+
+def apply_patches(codes: Dict[str, str], text: str,
+                  threshold: float = PATCH_FUZZY_MATCH_THRESHOLD) -> PatchResult:
+    """Apply SEARCH/REPLACE blocks or unified diffs from an LLM response.
+    
+    Edits are matched against the current code with increasing tolerance
+    (exact, whitespace-insensitive, then fuzzy). Edits to one file are all
+    or nothing: if any of them does not apply the file is reported as failed
+    and left unchanged, so the caller can ask for the full file instead.
+    Code blocks that are not patches are taken as full-file replacements.
+    
+    Args:
+        codes: Current files, mapping filename to content (not modified)
+        text: LLM response in patch format
+        threshold: Minimum similarity (0-1) for a fuzzy match
+        
+    Returns:
+        PatchResult with the updated files and the files that failed
+    """
+    result = PatchResult()
+    failed = set()
+    
+    def current(filename):
+        return result.codes.get(filename, codes.get(filename))
+    
+    def apply_file(filename, edits, is_new=False):
+        filename = _resolve_filename(filename, codes)
+        if filename is None and len(codes) == 1:
+            filename = next(iter(codes))
+        if filename is None or filename in failed:
+            if filename:
+                failed.add(filename)
+            return
+        content = "" if is_new else current(filename)
+        if content is None:
+            if not all(not search.strip() for search, _, _ in edits):
+                failed.add(filename)
+                return
+            content = ""
+        for search, replace, hint in edits:
+            content = _apply_edit(content, search, replace, hint, threshold)
+            if content is None:
+                failed.add(filename)
+                return
+        result.codes[filename] = content
+    
+    for filename, body in _iter_patch_blocks(text):
+        edits = _parse_search_replace(body)
+        if edits:
+            apply_file(filename, [(search, replace, None) for search, replace in edits])
+            continue
+        if re.search(r'^@@ -\d', body, re.MULTILINE):
+            for diff_filename, is_new, hunks in _parse_unified_diff(body):
+                apply_file(diff_filename or filename, [(search, replace, start - 1)
+                                                       for search, replace, start in hunks], is_new)
+            continue
+        if filename and body.strip():
+            result.codes[_resolve_filename(filename, codes)] = body
+    
+    if not result.codes and not failed:
+        # The model ignored the patch format and re-emitted whole files
+        result.codes = extract_code_blocks(text)
+    
+    for filename in failed:
+        result.codes.pop(filename, None)
+    result.failed = sorted(failed)
+    return result
 
 
 def format_code_for_prompt(codes: Dict[str, str]) -> str:
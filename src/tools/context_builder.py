@@ -0,0 +1,274 @@
+"""Token-budgeted code context for prompts."""
+
+import re
+import ast
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from src.tools.code_manager import format_code_for_prompt
+
+
+# Same approximation as UsageTracker.estimate_tokens_from_text
+CHARS_PER_TOKEN = 4
+
+# Declaration lines kept in the outline of non-Python files
+OUTLINE_PATTERN = re.compile(
+    r'^\s*(?:export\s+)?(?:default\s+)?(?:public|private|protected|static|async|abstract|final|\s)*'
+    r'(?:function\b|class\b|interface\b|struct\b|enum\b|def\b|const\s+\w+\s*=\s*(?:async\s*)?\(|'
+    r'(?:let|var|const)\s+\w+\s*=\s*function\b|[\w<>\[\],\s]+\s+\w+\s*\([^;]*\)\s*\{|#include\b|import\b|'
+    r'<(?:script|style|body|form|section|main|header|footer)\b|@media\b|[#.]?[\w-]+\s*\{)'
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the number of tokens in a text.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count
+    """
+    return len(text) // CHARS_PER_TOKEN
+
+
+@dataclass
+class CodeContext:
+    """Code formatted for a prompt, with a record of what was left out."""
+    text: str
+    full: List[str] = field(default_factory=list)
+    outlined: List[str] = field(default_factory=list)
+    omitted: List[str] = field(default_factory=list)
+
+    @property
+    def elided(self) -> bool:
+        """Whether any file is not included in full."""
+        return bool(self.outlined or self.omitted)
+
+
+def relevant_files(codes: Dict[str, str], hint: Optional[str]) -> List[str]:
+    """Find the files mentioned in feedback, test output or a traceback.
+
+    Args:
+        codes: Dictionary mapping filename to code content
+        hint: Text that may name files (e.g. review feedback or a traceback)
+
+    Returns:
+        Filenames mentioned in the hint
+    """
+    if not hint:
+        return []
+    mentioned = []
+    for filename in codes:
+        for name in {filename, os.path.basename(filename)}:
+            if re.search(r'(?<![\w.-])' + re.escape(name) + r'(?![\w-])', hint):
+                mentioned.append(filename)
+                break
+    return mentioned
+
+
+def _python_outline(code: str) -> Optional[str]:
+    """Imports, signatures and first docstring lines of a Python module."""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+    lines = code.split('\n')
+    outline = []
+
+    def visit(nodes, depth):
+        for node in nodes:
+            if isinstance(node, (ast.Import, ast.ImportFrom, ast.Assign, ast.AnnAssign)) and depth == 0:
+                outline.append(lines[node.lineno - 1].rstrip())
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                for decorator in node.decorator_list:
+                    outline.append(lines[decorator.lineno - 1].rstrip())
+                # Header lines up to the start of the body (multi-line signatures)
+                end = max(node.lineno, node.body[0].lineno - 1)
+                header = [line.rstrip() for line in lines[node.lineno - 1:end]]
+                outline.extend(line for line in header if line.strip())
+                docstring = ast.get_docstring(node)
+                indent = "    " * (depth + 1)
+                if docstring:
+                    outline.append(f'{indent}"""{docstring.strip().splitlines()[0]}"""')
+                if isinstance(node, ast.ClassDef):
+                    visit(node.body, depth + 1)
+                else:
+                    outline.append(f"{indent}...")
+
+    visit(tree.body, 0)
+    return '\n'.join(outline)
+
+
+def outline_code(filename: str, code: str) -> str:
+    """Reduce a file to its structure: imports, declarations and signatures.
+
+    Args:
+        filename: Name of the file (selects the outline strategy)
+        code: File content
+
+    Returns:
+        Outline of the file
+    """
+    if filename.endswith('.py'):
+        outline = _python_outline(code)
+        if outline is not None:
+            return outline
+    return '\n'.join(line.rstrip() for line in code.split('\n') if OUTLINE_PATTERN.match(line))
+
+
+def build_code_context(codes: Dict[str, str], budget: Optional[int] = None,
+                       hint: Optional[str] = None) -> CodeContext:
+    """Format code files for a prompt within a token budget.
+
+    Files mentioned in the hint are always included in full. The other files
+    are included in full while the budget allows (smallest first) and
+    otherwise reduced to an outline, or just listed if even the outlines do
+    not fit. A note at the end tells the model what was elided.
+
+    Args:
+        codes: Dictionary mapping filename to code content
+        budget: Maximum tokens for the code context (None for no limit)
+        hint: Feedback, test output or traceback used to pick relevant files
+
+    Returns:
+        CodeContext with the formatted text and the elided files
+    """
+    full_text = format_code_for_prompt(codes)
+    if budget is None or estimate_tokens(full_text) <= budget:
+        return CodeContext(full_text, full=list(codes))
+
+    relevant = set(relevant_files(codes, hint))
+    outlines = {filename: outline_code(filename, code) for filename, code in codes.items()
+                if filename not in relevant}
+    # Overhead of the filename line and fences around each file
+    cost = {filename: estimate_tokens(f"{filename}\n```\n{code}\n```\n") for filename, code in codes.items()}
+    outline_cost = {filename: estimate_tokens(f"{filename} (outline)\n```\n{outline}\n```\n")
+                    for filename, outline in outlines.items()}
+
+    used = sum(cost[filename] for filename in relevant) + sum(outline_cost.values())
+    full = set(relevant)
+    for filename in sorted(outlines, key=lambda name: cost[name]):
+        extra = cost[filename] - outline_cost[filename]
+        if used + extra <= budget:
+            full.add(filename)
+            used += extra
+
+    omitted = []
+    for filename in sorted(set(outlines) - full, key=lambda name: -outline_cost[name]):
+        if used <= budget:
+            break
+        omitted.append(filename)
+        used -= outline_cost[filename]
+
+    sections = {}
+    outlined = []
+    for filename, code in codes.items():
+        if filename in full:
+            sections[filename] = code
+        elif filename not in omitted:
+            sections[f"{filename} (outline)"] = outlines[filename]
+            outlined.append(filename)
+
+    text = format_code_for_prompt(sections)
+    notes = []
+    if outlined:
+        notes.append("Outline only (signatures; bodies elided to fit the context budget): " + ", ".join(outlined))
+    if omitted:
+        notes.append("Not shown (context budget exceeded): " + ", ".join(omitted))
+    text += "\n" + "\n".join(notes) + "\n"
+    return CodeContext(text, full=[name for name in codes if name in full],
+                       outlined=outlined, omitted=omitted)
+
+
+def _references(code: str, filename: str) -> bool:
+    """Whether code refers to a file by name, module import or relative path."""
+    basename = os.path.basename(filename)
+    if basename in code:
+        return True
+    stem = re.escape(os.path.splitext(basename)[0])
+    return bool(
+        re.search(rf'^\s*(?:from\s+[\w.]*\b{stem}\b\s+import|import\s+[\w.]*\b{stem}\b)', code, re.MULTILINE)
+        or re.search(rf'''(?:require\(|from\s+|import\s+)['"](?:\.{{1,2}}/)+(?:[\w-]+/)*{stem}(?:\.\w+)?['"]''', code)
+    )
+
+
+def group_related_files(codes: Dict[str, str]) -> List[List[str]]:
+    """Group files that reference each other (imports, includes, links).
+
+    Args:
+        codes: Dictionary mapping filename to code content
+
+    Returns:
+        Groups of filenames, in the order of their first file
+    """
+    filenames = list(codes)
+    parent = {filename: filename for filename in filenames}
+
+    def find(filename):
+        while parent[filename] != filename:
+            parent[filename] = parent[parent[filename]]
+            filename = parent[filename]
+        return filename
+
+    for filename in filenames:
+        for other in filenames:
+            if other != filename and _references(codes[filename], other):
+                parent[find(other)] = find(filename)
+
+    groups: Dict[str, List[str]] = {}
+    for filename in filenames:
+        groups.setdefault(find(filename), []).append(filename)
+    return list(groups.values())
+
+
+def make_review_shards(codes: Dict[str, str], max_tokens: int) -> List[List[str]]:
+    """Split files into shards for concurrent review.
+
+    Related files stay together; groups are then packed into shards of at
+    most ``max_tokens`` of code (a group larger than that forms a shard on
+    its own, split per file).
+
+    Args:
+        codes: Dictionary mapping filename to code content
+        max_tokens: Maximum code tokens per shard
+
+    Returns:
+        List of shards, each a list of filenames
+    """
+    shards: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for group in group_related_files(codes):
+        tokens = sum(estimate_tokens(codes[filename]) for filename in group)
+        pieces = [group] if tokens <= max_tokens else [[filename] for filename in group]
+        for piece in pieces:
+            piece_tokens = sum(estimate_tokens(codes[filename]) for filename in piece)
+            if current and current_tokens + piece_tokens > max_tokens:
+                shards.append(current)
+                current, current_tokens = [], 0
+            current.extend(piece)
+            current_tokens += piece_tokens
+    if current:
+        shards.append(current)
+    return shards
+
+
+def build_focus_context(codes: Dict[str, str], focus: List[str]) -> str:
+    """Format the focus files in full and every other file as an outline.
+
+    Args:
+        codes: Dictionary mapping filename to code content
+        focus: Files to include in full
+
+    Returns:
+        Formatted code for a prompt
+    """
+    sections = {}
+    for filename, code in codes.items():
+        if filename in focus:
+            sections[filename] = code
+        else:
+            sections[f"{filename} (outline)"] = outline_code(filename, code)
+    return format_code_for_prompt(sections)
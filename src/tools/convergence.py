@@ -0,0 +1,82 @@
+"""Detect review and test loops that have stopped making progress.
+
+Each loop iteration is recorded as the hash of the code it started from,
+the feedback it produced, its test outcome and the hash of the code the
+fix left behind. An iteration whose fix left the code unchanged is a
+fixed point: the next one would see the same code again. A fix that
+brings the code back to a version an earlier iteration started from
+(A -> B -> A) is an oscillation: the loop would repeat itself.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+def hash_codes(codes: Dict[str, str]) -> str:
+    """Hash the files of a project, independently of their order.
+
+    Args:
+        codes: Dictionary mapping filename to code content
+
+    Returns:
+        Hex SHA-256 digest of the filenames and contents
+    """
+    digest = hashlib.sha256()
+    for filename in sorted(codes):
+        content = codes[filename].encode("utf-8")
+        digest.update(filename.encode("utf-8") + b"\0" + str(len(content)).encode("ascii") + b"\0" + content)
+    return digest.hexdigest()
+
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class Iteration:
+    """One recorded loop iteration."""
+    number: int
+    code_before: str
+    code_after: str
+    feedback: str
+    outcome: Optional[bool] = None
+
+
+class ConvergenceTracker:
+    """Records the iterations of a loop and tells when to stop it early."""
+
+    def __init__(self):
+        self.iterations: List[Iteration] = []
+
+    def record(self, code_before: str, codes: Dict[str, str], feedback: str = "",
+               outcome: Optional[bool] = None) -> Optional[str]:
+        """Record an iteration and check whether the loop has converged.
+
+        Args:
+            code_before: ``hash_codes`` of the code at the start of the iteration
+            codes: Code at the end of the iteration, after the fix
+            feedback: Review or test feedback the iteration produced
+            outcome: Whether the tests passed (None when not applicable)
+
+        Returns:
+            Reason to stop the loop, or None to continue
+        """
+        iteration = Iteration(number=len(self.iterations) + 1, code_before=code_before,
+                              code_after=hash_codes(codes), feedback=_hash_text(feedback), outcome=outcome)
+        self.iterations.append(iteration)
+
+        if iteration.code_after == iteration.code_before:
+            repeated = len(self.iterations) > 1 and self._same_result(self.iterations[-2], iteration)
+            return ("fixed point: the fix left the code unchanged"
+                    + (", with the same feedback as the previous iteration" if repeated else ""))
+        for earlier in self.iterations[:-1]:
+            if earlier.code_before == iteration.code_after:
+                return (f"oscillation: the fix brought the code back to the version iteration "
+                        f"{earlier.number} started from")
+        return None
+
+    @staticmethod
+    def _same_result(first: Iteration, second: Iteration) -> bool:
+        return (first.code_before, first.feedback, first.outcome) == \
+            (second.code_before, second.feedback, second.outcome)
@@ -0,0 +1,126 @@
+"""SQLite-backed key/value cache with size- and age-based LRU eviction."""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Any, Optional
+
+
+class DiskCache:
+    """Persistent JSON value cache shared by threads and processes.
+
+    Entries are evicted when they are older than ``max_age_seconds`` and,
+    least recently used first, whenever the cache holds more than
+    ``max_entries`` entries or ``max_bytes`` of data.
+    """
+
+    def __init__(self, path: str, max_entries: int = 5000, max_bytes: int = 200 * 1024 * 1024,
+                 max_age_seconds: float = 30 * 24 * 3600):
+        """Open (or create) the cache database.
+
+        Args:
+            path: SQLite database file
+            max_entries: Maximum number of entries kept
+            max_bytes: Maximum total size of stored values in bytes
+            max_age_seconds: Entries older than this are discarded
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS entries (
+                       key TEXT PRIMARY KEY,
+                       value TEXT NOT NULL,
+                       size INTEGER NOT NULL,
+                       created_at REAL NOT NULL,
+                       accessed_at REAL NOT NULL
+                   )"""
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed_at)"
+            )
+
+    def get(self, key: str) -> Optional[Any]:
+        """Look up a value, refreshing its LRU position on a hit.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Stored value, or None on a miss
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] > self.max_age_seconds:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a value and evict entries beyond the configured limits.
+
+        Args:
+            key: Cache key
+            value: JSON-serialisable value
+        """
+        data = json.dumps(value)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data.encode("utf-8")), now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones over the limits."""
+        self._conn.execute(
+            "DELETE FROM entries WHERE created_at < ?", (now - self.max_age_seconds,)
+        )
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at ASC"
+        ).fetchall()
+        stale = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            stale.append((key,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
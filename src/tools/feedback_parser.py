@@ -0,0 +1,123 @@
+"""Split review and test feedback into per-file issue lists."""
+
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from src.tools.context_builder import relevant_files
+
+
+# Lines that start a new feedback item: bullets, numbered items and headings
+ITEM_START_PATTERN = re.compile(r'^\s*(?:[-*+]\s+|\d+[.)]\s+|#{1,6}\s+)')
+
+HEADING_PATTERN = re.compile(r'^\s*#{1,6}\s+')
+
+# Feedback items that carry no issue
+NO_ISSUE_PATTERN = re.compile(r'^\W*(?:<INFO>\s*Finished</INFO>|No issues found\.?)\W*$', re.IGNORECASE)
+
+# Labels that may precede the filename of a heading, e.g. "File: app.py"
+HEADING_LABEL_PATTERN = re.compile(r'^(?:file|filename|in)\s*:?\s*', re.IGNORECASE)
+
+
+@dataclass
+class FileFeedback:
+    """Feedback items grouped by the file they concern."""
+    files: Dict[str, List[str]] = field(default_factory=dict)
+    general: List[str] = field(default_factory=list)
+
+    def for_file(self, filename: str) -> str:
+        """Feedback text for one file, followed by the general items.
+
+        Args:
+            filename: File to fix
+
+        Returns:
+            Feedback text for the file's fix prompt
+        """
+        text = "\n".join(self.files.get(filename, []))
+        if self.general:
+            text += f"\n\nGeneral feedback (apply only where it concerns {filename}):\n" + "\n".join(self.general)
+        return text
+
+
+def _split_items(feedback: str) -> List[str]:
+    """Split feedback into items at bullets, numbers, headings and blank lines.
+
+    Fenced code blocks stay with the item they follow.
+    """
+    items = []
+    current: List[str] = []
+    fenced = False
+    for line in feedback.split('\n'):
+        if line.lstrip().startswith('```'):
+            fenced = not fenced
+            current.append(line)
+            continue
+        if not fenced and (not line.strip() or ITEM_START_PATTERN.match(line)):
+            if current:
+                items.append('\n'.join(current).strip())
+            current = [line] if line.strip() else []
+            if HEADING_PATTERN.match(line):
+                # Headings are items of their own
+                items.append(line.strip())
+                current = []
+            continue
+        current.append(line)
+    if current:
+        items.append('\n'.join(current).strip())
+    return [item for item in items if item]
+
+
+def _heading_files(codes: Dict[str, str], item: str) -> Optional[List[str]]:
+    """Files named by a heading item such as "### app.py" or "**utils.py:**".
+
+    Returns:
+        The files, or None if the item is not a heading of filenames only
+    """
+    if '\n' in item:
+        return None
+    files = relevant_files(codes, item)
+    if not files:
+        return None
+    rest = HEADING_LABEL_PATTERN.sub('', item.strip().lstrip('#*-+ ').strip())
+    for filename in sorted(files, key=len, reverse=True):
+        rest = rest.replace(filename, '').replace(os.path.basename(filename), '')
+    if re.sub(r'(?:\band\b|[\s,:*`_()\-])', '', rest, flags=re.IGNORECASE):
+        return None
+    return files
+
+
+def split_feedback(codes: Dict[str, str], feedback: str) -> FileFeedback:
+    """Assign each feedback item to the files it mentions.
+
+    Items under a filename heading (as in the sharded review report) belong
+    to the heading's files unless they name files themselves. Items that
+    name no file at all are kept as general feedback.
+
+    Args:
+        codes: Dictionary mapping filename to code content
+        feedback: Review feedback or test analysis
+
+    Returns:
+        FileFeedback with per-file and general items
+    """
+    result = FileFeedback()
+    current: List[str] = []
+    for item in _split_items(feedback):
+        heading = _heading_files(codes, item)
+        if heading is not None:
+            current = heading
+            continue
+        if HEADING_PATTERN.match(item):
+            # A heading that names no file ends the previous file's section
+            current = []
+            continue
+        if NO_ISSUE_PATTERN.match(item):
+            continue
+        targets = relevant_files(codes, item) or current
+        if not targets:
+            result.general.append(item)
+        for filename in targets:
+            result.files.setdefault(filename, []).append(item)
+    return result
@@ -0,0 +1,290 @@
+"""SQLite-backed durable job queue with leases for worker processes."""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_COLUMNS = ("id, name, task, params, status, attempts, max_attempts, worker, lease_expires, "
+            "created_at, started_at, finished_at, result, error")
+
+
+@dataclass
+class Job:
+    """A project build request and its progress."""
+    id: int
+    name: str
+    task: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    status: str = QUEUED
+    attempts: int = 0
+    max_attempts: int = 3
+    worker: Optional[str] = None
+    lease_expires: Optional[float] = None
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, row) -> "Job":
+        values = dict(zip([column.strip() for column in _COLUMNS.split(",")], row))
+        values["params"] = json.loads(values["params"] or "{}")
+        values["result"] = json.loads(values["result"]) if values["result"] else None
+        return cls(**values)
+
+
+class JobQueue:
+    """Durable FIFO job queue shared by processes on one machine.
+
+    A worker leases a job for a limited time and keeps the lease alive with
+    heartbeats while it runs. If the worker dies the lease expires and the
+    job is queued again (up to ``max_attempts`` times), so no job is lost
+    and none needs an external broker.
+    """
+
+    def __init__(self, path: str):
+        """Open (or create) the queue database.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Transactions are managed explicitly so that leasing can take the write lock up front
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._write():
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                       id INTEGER PRIMARY KEY AUTOINCREMENT,
+                       name TEXT NOT NULL,
+                       task TEXT NOT NULL,
+                       params TEXT NOT NULL,
+                       status TEXT NOT NULL,
+                       attempts INTEGER NOT NULL DEFAULT 0,
+                       max_attempts INTEGER NOT NULL,
+                       worker TEXT,
+                       lease_expires REAL,
+                       created_at REAL NOT NULL,
+                       started_at REAL,
+                       finished_at REAL,
+                       result TEXT,
+                       error TEXT
+                   )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, id)")
+
+    @contextmanager
+    def _write(self):
+        """Run statements in one transaction holding the database write lock."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def enqueue(self, task: str, name: str, params: Optional[Dict[str, Any]] = None,
+                max_attempts: int = 3) -> int:
+        """Add a job to the end of the queue.
+
+        Args:
+            task: Task description
+            name: Project name
+            params: Chain options (model, iterations, output directory, ...)
+            max_attempts: How many times the job may be leased before it fails
+
+        Returns:
+            Job ID
+        """
+        with self._write():
+            cursor = self._conn.execute(
+                "INSERT INTO jobs (name, task, params, status, max_attempts, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (name, task, json.dumps(params or {}), QUEUED, max_attempts, time.time()),
+            )
+            return cursor.lastrowid
+
+    def lease(self, worker: str, lease_seconds: float) -> Optional[Job]:
+        """Take the oldest queued job, first requeueing jobs with expired leases.
+
+        Args:
+            worker: ID of the leasing worker
+            lease_seconds: Lease duration; extend it with heartbeat()
+
+        Returns:
+            The leased job, or None if the queue is empty
+        """
+        now = time.time()
+        with self._write():
+            self._requeue_expired(now)
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY id LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1, lease_expires = ?, "
+                "started_at = ?, error = NULL WHERE id = ?",
+                (RUNNING, worker, now + lease_seconds, now, row[0]),
+            )
+        return self.get(row[0])
+
+    def _requeue_expired(self, now: float) -> None:
+        """Return jobs of workers that stopped heartbeating to the queue."""
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, worker = NULL, "
+            "error = 'Lease expired after ' || attempts || ' attempt(s); worker presumed dead' "
+            "WHERE status = ? AND lease_expires < ? AND attempts >= max_attempts",
+            (FAILED, now, RUNNING, now),
+        )
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, worker = NULL, lease_expires = NULL, "
+            "error = 'Lease expired; requeued' "
+            "WHERE status = ? AND lease_expires < ?",
+            (QUEUED, RUNNING, now),
+        )
+
+    def heartbeat(self, job_id: int, worker: str, lease_seconds: float) -> bool:
+        """Extend the lease of a running job.
+
+        Args:
+            job_id: Job ID
+            worker: ID of the worker holding the lease
+            lease_seconds: New lease duration from now
+
+        Returns:
+            False if the worker no longer holds the lease
+        """
+        with self._write():
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND worker = ? AND status = ?",
+                (time.time() + lease_seconds, job_id, worker, RUNNING),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker: str, result: Dict[str, Any]) -> bool:
+        """Mark a job as done and store its result.
+
+        Args:
+            job_id: Job ID
+            worker: ID of the worker holding the lease
+            result: JSON-serialisable result
+
+        Returns:
+            False if the lease was lost (the job was requeued meanwhile)
+        """
+        return self._finish(job_id, worker, DONE, result=result)
+
+    def fail(self, job_id: int, worker: str, error: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        """Mark a job as failed.
+
+        Args:
+            job_id: Job ID
+            worker: ID of the worker holding the lease
+            error: Error message
+            result: Optional partial result
+
+        Returns:
+            False if the lease was lost (the job was requeued meanwhile)
+        """
+        return self._finish(job_id, worker, FAILED, result=result, error=error)
+
+    def _finish(self, job_id: int, worker: str, status: str, result: Optional[Dict[str, Any]] = None,
+                error: Optional[str] = None) -> bool:
+        with self._write():
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, lease_expires = NULL, result = ?, error = ? "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (status, time.time(), json.dumps(result) if result is not None else None, error,
+                 job_id, worker, RUNNING),
+            )
+            return cursor.rowcount == 1
+
+    def retry(self, job_id: int) -> bool:
+        """Put a finished or failed job back in the queue with fresh attempts.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            False if the job does not exist or is still running
+        """
+        with self._write():
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = 0, worker = NULL, lease_expires = NULL, "
+                "finished_at = NULL, result = NULL, error = NULL WHERE id = ? AND status != ?",
+                (QUEUED, job_id, RUNNING),
+            )
+            return cursor.rowcount == 1
+
+    def get(self, job_id: int) -> Optional[Job]:
+        """Look up a job.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            The job, or None if it does not exist
+        """
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(row) if row else None
+
+    def jobs(self, status: Optional[str] = None, limit: Optional[int] = None) -> List[Job]:
+        """List jobs in queue order.
+
+        Args:
+            status: Only jobs with this status
+            limit: Maximum number of jobs
+
+        Returns:
+            List of jobs
+        """
+        query = f"SELECT {_COLUMNS} FROM jobs"
+        args: List[Any] = []
+        if status:
+            query += " WHERE status = ?"
+            args.append(status)
+        query += " ORDER BY id"
+        if limit:
+            query += " LIMIT ?"
+            args.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, args).fetchall()
+        return [Job.from_row(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Count jobs by status.
+
+        Returns:
+            Dictionary mapping status to number of jobs
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED)}
+        counts.update(dict(rows))
+        return counts
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
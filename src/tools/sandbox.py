@@ -0,0 +1,218 @@
+"""Resource limits, process-group cleanup and bounded output for test runs."""
+
+import os
+import sys
+import json
+import time
+import errno
+import shutil
+import signal
+import tempfile
+import threading
+import subprocess
+from typing import Dict, List, Optional
+
+from config.agent_configs import (
+    SANDBOX_CPU_SECONDS,
+    SANDBOX_MEMORY_MB,
+    SANDBOX_MAX_OPEN_FILES,
+    SANDBOX_MAX_PROCESSES,
+    SANDBOX_MAX_FILE_MB,
+    SANDBOX_OUTPUT_HEAD_BYTES,
+    SANDBOX_OUTPUT_TAIL_BYTES,
+)
+
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Applies the limits given as JSON, then execs the command, in a child of
+# its own: a preexec_fn would run between fork and exec, which can deadlock
+# when the parent has other threads. Isolated mode (-I) keeps the project
+# directory off sys.path.
+_LIMITS_WRAPPER = (
+    "import os, sys, json\n"
+    "sys.path.insert(0, sys.argv[1])  # the directory of sandbox_server.py\n"
+    "from sandbox_server import apply_limits\n"
+    "apply_limits(json.loads(sys.argv[2]))\n"
+    "try:\n"
+    "    os.execvp(sys.argv[3], sys.argv[3:])\n"
+    "except OSError as e:\n"
+    "    sys.stderr.write(f'{sys.argv[3]}: {e.strerror}\\n')\n"
+    "    os._exit(127)\n"
+)
+
+# Seconds for which the count of the user's processes is reused
+PROCESS_COUNT_TTL_SECONDS = 5.0
+
+_process_count = (0.0, None)
+_process_count_lock = threading.Lock()
+
+
+def _user_process_count() -> Optional[int]:
+    """Number of tasks (processes and threads) of the current user, on Linux."""
+    global _process_count
+    with _process_count_lock:
+        checked_at, count = _process_count
+        if time.monotonic() - checked_at < PROCESS_COUNT_TTL_SECONDS:
+            return count
+        count = None
+        if os.path.isdir("/proc/self/task"):
+            uid = str(os.getuid())
+            count = 0
+            for pid in os.listdir("/proc"):
+                if not pid.isdigit():
+                    continue
+                try:
+                    with open(f"/proc/{pid}/status") as f:
+                        status = dict(line.split(":", 1) for line in f if ":" in line)
+                except OSError:
+                    continue
+                if status.get("Uid", "").split()[:1] == [uid]:
+                    count += int(status.get("Threads", "1"))
+        _process_count = (time.monotonic(), count)
+        return count
+
+
+def resource_limits(python: bool = True) -> Dict[str, int]:
+    """Resource limits for one test run.
+
+    Args:
+        python: Whether the run executes Python code. Other runtimes (node)
+            reserve large virtual address ranges up front, so they get no
+            address-space limit.
+
+    Returns:
+        Mapping of ``resource`` limit names to values
+    """
+    limits = {
+        "RLIMIT_CPU": SANDBOX_CPU_SECONDS,
+        "RLIMIT_NOFILE": SANDBOX_MAX_OPEN_FILES,
+        "RLIMIT_FSIZE": SANDBOX_MAX_FILE_MB * 1024 * 1024,
+        "RLIMIT_CORE": 0,
+    }
+    if python:
+        limits["RLIMIT_AS"] = SANDBOX_MEMORY_MB * 1024 * 1024
+    # The kernel counts processes per user, so the allowance is added to what already runs
+    # (root is exempt; elsewhere the count is unknown and no limit is set)
+    processes = _user_process_count() if hasattr(os, "getuid") and os.getuid() != 0 else None
+    if processes is not None:
+        limits["RLIMIT_NPROC"] = processes + SANDBOX_MAX_PROCESSES
+    return limits
+
+
+def kill_process_group(pid: int) -> None:
+    """Kill a process that leads its own session and everything it started.
+
+    Args:
+        pid: Process ID (and process group ID) of the session leader
+    """
+    if not hasattr(os, "killpg"):
+        return
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        # The group is already gone (the leader may have been reaped, so its
+        # pid is not killed on its own)
+        pass
+
+
+def read_bounded(path: str, head: int = SANDBOX_OUTPUT_HEAD_BYTES,
+                 tail: int = SANDBOX_OUTPUT_TAIL_BYTES) -> str:
+    """Read captured output, keeping only its beginning and end.
+
+    Memory use stays bounded however much a run printed; the elided middle
+    is replaced with a marker giving its size.
+
+    Args:
+        path: Output file
+        head: Bytes kept from the start
+        tail: Bytes kept from the end
+
+    Returns:
+        Decoded output, possibly truncated
+    """
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size <= head + tail:
+                data = f.read()
+                return data.decode("utf-8", errors="replace")
+            start = f.read(head)
+            f.seek(size - tail)
+            end = f.read(tail)
+    except OSError:
+        return ""
+    marker = f"\n... [{size - head - tail} bytes of output truncated] ...\n"
+    return start.decode("utf-8", errors="replace") + marker + end.decode("utf-8", errors="replace")
+
+
+def _check_executable(program: str, cwd: str, env: Optional[Dict[str, str]]) -> None:
+    """Raise FileNotFoundError, like Popen would, if ``program`` cannot be run."""
+    if os.sep in program:
+        found = os.path.isfile(os.path.join(cwd, program))
+    else:
+        path = (env if env is not None else os.environ).get("PATH", os.defpath)
+        found = shutil.which(program, path=path) is not None
+    if not found:
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), program)
+
+
+def run_limited(command: List[str], cwd: str, timeout: float, limits: Optional[Dict[str, int]] = None,
+                env: Optional[Dict[str, str]] = None) -> subprocess.CompletedProcess:
+    """Run a command with resource limits and bounded output capture.
+
+    The command leads its own process group, which is killed on timeout and
+    after it exits, so background processes it started do not outlive it.
+    Output goes to temporary files and is read back with ``read_bounded``.
+
+    Args:
+        command: Command line
+        cwd: Working directory
+        timeout: Seconds before the process group is killed
+        limits: Resource limits (defaults to ``resource_limits()`` for the command)
+        env: Environment of the command (defaults to this process's)
+
+    Returns:
+        CompletedProcess with the exit code and captured output
+
+    Raises:
+        subprocess.TimeoutExpired: If the command did not finish in time
+        FileNotFoundError: If the executable does not exist
+    """
+    if limits is None:
+        limits = resource_limits(python=os.path.basename(command[0]).startswith(("python", "pytest")))
+    posix = sys.platform != "win32"
+    if posix:
+        _check_executable(command[0], cwd, env)
+        command = [sys.executable, "-I", "-c", _LIMITS_WRAPPER,
+                   TOOLS_DIR, json.dumps(limits), *command]
+    output_dir = tempfile.mkdtemp(prefix="sandbox-")
+    stdout_path = os.path.join(output_dir, "stdout")
+    stderr_path = os.path.join(output_dir, "stderr")
+    try:
+        with open(stdout_path, "wb") as stdout, open(stderr_path, "wb") as stderr:
+            process = subprocess.Popen(
+                command,
+                cwd=cwd,
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=stdout,
+                stderr=stderr,
+                start_new_session=posix,
+            )
+        try:
+            process.wait(timeout=timeout)
+            timed_out = False
+        except subprocess.TimeoutExpired:
+            timed_out = True
+        if posix:
+            kill_process_group(process.pid)
+        else:
+            process.kill()
+        process.wait()
+        stdout_text, stderr_text = read_bounded(stdout_path), read_bounded(stderr_path)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    if timed_out:
+        raise subprocess.TimeoutExpired(command, timeout, stdout_text, stderr_text)
+    return subprocess.CompletedProcess(command, process.returncode, stdout_text, stderr_text)
@@ -0,0 +1,207 @@
+"""Pool of pre-warmed fork servers for running generated Python code.
+
+Starting ``python`` (and importing pytest) for every script and every test
+iteration costs more than running most generated projects. Each server in
+the pool is an interpreter that has already imported the common modules
+(see ``sandbox_server.py``); a run forks an isolated child from it, so
+the child starts with everything loaded and its changes never leak into
+the next run.
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import select
+import shutil
+import tempfile
+import threading
+import subprocess
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.tools.sandbox import kill_process_group, read_bounded, resource_limits
+from config.agent_configs import SANDBOX_POOL_ENABLED, SANDBOX_POOL_SIZE, SANDBOX_PRELOAD_MODULES
+
+
+SERVER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_server.py")
+
+# Time allowed for a server to acknowledge a request or report a killed child
+SERVER_REPLY_TIMEOUT_SECONDS = 10.0
+
+
+class SandboxError(RuntimeError):
+    """The fork server failed; the run should be retried without the sandbox."""
+
+
+@dataclass
+class SandboxResult:
+    """Outcome of one run in the sandbox."""
+    returncode: int
+    stdout: str
+    stderr: str
+    timed_out: bool = False
+
+
+def sandbox_supported() -> bool:
+    """Whether this platform can fork warm children (POSIX only)."""
+    return hasattr(os, "fork") and hasattr(os, "setsid")
+
+
+class _ForkServer:
+    """One preloaded interpreter that runs a request at a time."""
+
+    def __init__(self, preload: Sequence[str]):
+        self.process = subprocess.Popen(
+            [sys.executable, SERVER_PATH, *preload],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self._buffer = b""
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def _read_message(self, timeout: Optional[float]) -> Optional[dict]:
+        """Read one reply, or return None if none arrives within the timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        fd = self.process.stdout.fileno()
+        while b"\n" not in self._buffer:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                return None
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                raise SandboxError("Sandbox server exited")
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        return json.loads(line)
+
+    def run(self, argv: List[str], cwd: str, timeout: float, stdout_path: str,
+            stderr_path: str, limits: Dict[str, int]) -> Tuple[int, bool]:
+        """Run one request and wait for the child, killing its process group on timeout.
+
+        Returns:
+            Tuple of (returncode, timed_out)
+        """
+        request = {"argv": argv, "cwd": cwd, "stdout": stdout_path, "stderr": stderr_path, "limits": limits}
+        try:
+            self.process.stdin.write((json.dumps(request) + "\n").encode("utf-8"))
+            self.process.stdin.flush()
+        except OSError as e:
+            raise SandboxError(f"Sandbox server unavailable: {e}")
+        started = self._read_message(SERVER_REPLY_TIMEOUT_SECONDS)
+        if started is None:
+            raise SandboxError("Sandbox server did not start the run")
+
+        finished = self._read_message(timeout)
+        timed_out = finished is None
+        # Also stops background processes the run left behind
+        kill_process_group(started["pid"])
+        if timed_out:
+            finished = self._read_message(SERVER_REPLY_TIMEOUT_SECONDS)
+            if finished is None:
+                raise SandboxError("Sandbox server did not reap a killed run")
+        return finished["returncode"], timed_out
+
+    def close(self) -> None:
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except Exception:
+            self.process.kill()
+
+
+class SandboxPool:
+    """Pre-warmed interpreters that run Python scripts and modules in forked children.
+
+    Each run gets its own child process (own session and working directory,
+    resource limits, stdin from /dev/null, bounded output capture), so runs
+    are isolated from each other and from this process. Servers are started
+    when the pool is created; a server that dies is replaced on its next use.
+    """
+
+    def __init__(self, size: int = SANDBOX_POOL_SIZE, preload: Sequence[str] = SANDBOX_PRELOAD_MODULES):
+        """Start the fork servers.
+
+        Args:
+            size: Number of servers, i.e. of concurrent runs
+            preload: Modules imported once by every server
+        """
+        self.preload = list(preload)
+        self._idle: "queue.Queue[_ForkServer]" = queue.Queue()
+        for _ in range(max(1, size)):
+            self._idle.put(_ForkServer(self.preload))
+
+    def run(self, argv: List[str], cwd: str, timeout: float) -> SandboxResult:
+        """Run Python code in a fresh child of a warm interpreter.
+
+        Args:
+            argv: Arguments as they would follow ``python`` (a script path and
+                its arguments, or ``-m module ...``)
+            cwd: Working directory of the run
+            timeout: Seconds before the run is killed, including the wait for
+                a free server when all of them are busy
+
+        Returns:
+            SandboxResult with the exit code and captured output
+
+        Raises:
+            SandboxError: If the server failed (the run did not complete) or
+                no server became free within the timeout
+        """
+        waiting_since = time.monotonic()
+        try:
+            server = self._idle.get(timeout=max(0.0, timeout))
+        except queue.Empty:
+            raise SandboxError(f"No sandbox server became free within {timeout:.1f}s")
+        timeout = max(0.0, timeout - (time.monotonic() - waiting_since))
+        if not server.alive:
+            server = _ForkServer(self.preload)
+        output_dir = tempfile.mkdtemp(prefix="sandbox-")
+        stdout_path = os.path.join(output_dir, "stdout")
+        stderr_path = os.path.join(output_dir, "stderr")
+        try:
+            returncode, timed_out = server.run(argv, os.path.abspath(cwd), timeout, stdout_path, stderr_path,
+                                               resource_limits(python=True))
+            return SandboxResult(returncode, read_bounded(stdout_path), read_bounded(stderr_path), timed_out)
+        except SandboxError:
+            server.close()
+            server = _ForkServer(self.preload)
+            raise
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+            self._idle.put(server)
+
+    def close(self) -> None:
+        """Stop all idle servers."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pool: Optional[SandboxPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_sandbox_pool() -> Optional[SandboxPool]:
+    """Get the process-wide sandbox pool, starting it on first use.
+
+    Returns:
+        Shared SandboxPool, or None when disabled or not supported here
+    """
+    global _pool
+    if not SANDBOX_POOL_ENABLED or not sandbox_supported():
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = SandboxPool()
+            atexit.register(_pool.close)
+        return _pool
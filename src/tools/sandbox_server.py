@@ -0,0 +1,174 @@
+"""Fork server for running generated Python code in warm child processes.
+
+Started by ``SandboxPool`` as ``python sandbox_server.py module ...``: the
+listed modules are imported once, then every request read from stdin is
+run in a child forked from this already-initialised interpreter, so the
+child skips interpreter startup and the preloaded imports.
+
+Protocol (one JSON object per line):
+    request  {"argv": [...], "cwd": ..., "stdout": path, "stderr": path,
+              "limits": {"RLIMIT_CPU": seconds, ...}}
+    replies  {"pid": child_pid} as soon as the child is forked, then
+             {"returncode": code} once it has exited (negative for signals)
+
+``argv`` is what would follow ``python`` on a command line: a script path
+and its arguments, or ``-m module`` and its arguments.
+
+This file must not import project modules: it runs with a clean
+interpreter state that every child inherits.
+"""
+
+import os
+import sys
+import json
+import runpy
+import atexit
+import importlib
+import traceback
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+PROTOCOL_FD = 1
+
+# Modules loaded at interpreter startup, which a project file cannot shadow anyway
+STARTUP_MODULES = set(sys.modules)
+
+
+def _send(message: dict) -> None:
+    os.write(PROTOCOL_FD, (json.dumps(message) + "\n").encode("utf-8"))
+
+
+def _drop_shadowed_modules(directory: str) -> None:
+    """Forget preloaded modules that a project file of the same name would shadow."""
+    for name in list(sys.modules):
+        top = name.split(".")[0]
+        if top in STARTUP_MODULES:
+            continue
+        if (os.path.exists(os.path.join(directory, top + ".py"))
+                or os.path.isdir(os.path.join(directory, top))):
+            del sys.modules[name]
+
+
+def apply_limits(limits: dict) -> None:
+    """Lower the resource limits of the current process.
+
+    Args:
+        limits: Mapping of ``resource`` limit names (e.g. "RLIMIT_CPU") to values;
+            limits this platform does not have are skipped
+    """
+    # Runs in forked children and in run_limited's wrapper: no imports or locks here
+    if resource is None:
+        return
+    for name, value in limits.items():
+        limit = getattr(resource, name, None)
+        if limit is None:
+            continue
+        soft, hard = resource.getrlimit(limit)
+        # The CPU soft limit sends SIGXCPU; the hard limit one second later kills
+        new_hard = value + 1 if limit == getattr(resource, "RLIMIT_CPU", None) else value
+        if hard != resource.RLIM_INFINITY:
+            new_hard = min(new_hard, hard)
+            value = min(value, hard)
+        try:
+            resource.setrlimit(limit, (value, new_hard))
+        except (ValueError, OSError):
+            pass
+
+
+def _print_exception(error: BaseException, path: str) -> None:
+    """Print a traceback starting at the user's code, like the interpreter does."""
+    tb = error.__traceback__
+    while tb is not None and path and tb.tb_frame.f_code.co_filename != path:
+        tb = tb.tb_next
+    traceback.print_exception(type(error), error, tb or error.__traceback__)
+
+
+def _run_child(request: dict) -> int:
+    """Run the requested script or module in this (forked) process."""
+    os.setsid()
+    apply_limits(request.get("limits", {}))
+    os.chdir(request["cwd"])
+    stdin = os.open(os.devnull, os.O_RDONLY)
+    stdout = os.open(request["stdout"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    stderr = os.open(request["stderr"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.dup2(stdin, 0)
+    os.dup2(stdout, 1)
+    os.dup2(stderr, 2)
+    sys.stdin = open(0, closefd=False)
+
+    argv = list(request["argv"])
+    path = ""
+    code = 0
+    try:
+        if argv[0] == "-m":
+            sys.argv = [argv[1]] + argv[2:]
+            sys.path.insert(0, os.getcwd())
+            _drop_shadowed_modules(sys.path[0])
+            runpy.run_module(argv[1], run_name="__main__", alter_sys=True)
+        else:
+            path = os.path.abspath(argv[0])
+            sys.argv = argv
+            sys.path.insert(0, os.path.dirname(path))
+            _drop_shadowed_modules(sys.path[0])
+            runpy.run_path(path, run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException as e:
+        _print_exception(e, path)
+        code = 1
+    try:
+        atexit._run_exitfuncs()
+        sys.stdout.flush()
+        sys.stderr.flush()
+    except BaseException:
+        pass
+    return code
+
+
+def serve(preload) -> None:
+    """Preload modules, then fork a child for each request until stdin closes."""
+    global PROTOCOL_FD
+    for module in preload:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            pass
+    # Replies go to a private copy of stdout; the children get their own fd 1
+    PROTOCOL_FD = os.dup(1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    requests = sys.stdin.buffer
+
+    while True:
+        line = requests.readline()
+        if not line:
+            break
+        request = json.loads(line)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                os.close(PROTOCOL_FD)
+                code = _run_child(request)
+            finally:
+                os._exit(code & 0xFF)
+        _send({"pid": pid})
+        _, status = os.waitpid(pid, 0)
+        _send({"returncode": os.waitstatus_to_exitcode(status)})
+
+
+if __name__ == "__main__":
+    sys.path.pop(0)
+    serve(sys.argv[1:])
@@ -0,0 +1,190 @@
+"""Local syntax and compile checks of generated code.
+
+Python files are compiled in-process; other languages use the checkers
+that are installed (``node --check``, ``tsc --noEmit``, ``javac``,
+``g++``/``gcc -fsyntax-only``). Files are checked concurrently, and each
+error becomes a ``TestFailure`` so it can be sent straight to a fix call.
+Only errors in the code itself are reported: diagnostics about packages
+or headers that are not installed here are dropped.
+"""
+
+import os
+import re
+import json
+import shutil
+import tempfile
+import traceback
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+from src.tools.sandbox import run_limited
+from src.tools.test_reports import TestFailure, parse_diagnostics, parse_node_error
+from config.agent_configs import SYNTAX_CHECK_TIMEOUT_SECONDS, TEST_PARALLEL_WORKERS
+
+
+PYTHON_EXTENSIONS = (".py",)
+JAVASCRIPT_EXTENSIONS = (".js", ".mjs", ".cjs")
+TYPESCRIPT_EXTENSIONS = (".ts", ".tsx")
+JAVA_EXTENSIONS = (".java",)
+C_EXTENSIONS = (".c",)
+CPP_EXTENSIONS = (".cpp", ".cc", ".cxx")
+CHECKED_EXTENSIONS = (PYTHON_EXTENSIONS + JAVASCRIPT_EXTENSIONS + TYPESCRIPT_EXTENSIONS + JAVA_EXTENSIONS
+                      + C_EXTENSIONS + CPP_EXTENSIONS + (".json",))
+
+# JavaScript files written as ES modules, which node only checks as such under a .mjs name
+ES_MODULE_PATTERN = re.compile(r'^\s*(?:import\s*[\w{*"\']|export\s)', re.MULTILINE)
+
+# tsc codes of syntax errors; other codes need the project's type packages installed
+TSC_SYNTAX_ERROR_PATTERN = re.compile(r'^error TS1\d{3}$')
+
+# javac and gcc errors caused by dependencies missing here rather than by the code
+MISSING_DEPENDENCY_PATTERN = re.compile(r'package \S+ does not exist|cannot find symbol|cannot access '
+                                        r'|(?P<header>[\w./-]+): No such file or directory')
+
+
+def _check_python(filename: str, code: str) -> List[TestFailure]:
+    """Compile Python source in-process, as py_compile does, without running it."""
+    try:
+        compile(code, filename, "exec", dont_inherit=True)
+    except SyntaxError as e:
+        details = "".join(traceback.format_exception_only(type(e), e)).strip()
+        return [TestFailure(test_id=filename, file=filename, line=e.lineno or 0, exception=type(e).__name__,
+                            message=e.msg, details=details)]
+    except ValueError as e:
+        # Source containing null bytes
+        return [TestFailure(test_id=filename, file=filename, exception="ValueError", message=str(e))]
+    return []
+
+
+def _check_json(filename: str, code: str) -> List[TestFailure]:
+    try:
+        json.loads(code)
+    except json.JSONDecodeError as e:
+        return [TestFailure(test_id=filename, file=filename, line=e.lineno, exception="JSONDecodeError",
+                            message=e.msg, details=f"{filename}:{e.lineno}:{e.colno}: {e.msg}")]
+    return []
+
+
+def _run_checker(command: List[str], root: str) -> Optional[str]:
+    """Output of a failed check, "" if it passed, or None if the checker could not run."""
+    try:
+        result = run_limited(command, root, SYNTAX_CHECK_TIMEOUT_SECONDS)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return "" if result.returncode == 0 else result.stdout + result.stderr
+
+
+def _relative_output(output: str, root: str) -> str:
+    return output.replace(root + os.sep, "").strip()
+
+
+def _check_node(filename: str, code: str, root: str) -> List[TestFailure]:
+    path = filename
+    if ES_MODULE_PATTERN.search(code) and not filename.endswith(".mjs"):
+        path = filename + ".mjs"
+        with open(os.path.join(root, path), "w", encoding="utf-8") as f:
+            f.write(code)
+    output = _run_checker(["node", "--check", path], root)
+    if not output:
+        return []
+    output = _relative_output(output, root).replace(path, filename)
+    failure = parse_node_error(output, filename, root)
+    if failure is None:
+        return [TestFailure(test_id=filename, file=filename, message=output.split('\n', 1)[0], details=output)]
+    failure.file = filename
+    return [failure]
+
+
+def _check_with_compiler(command: List[str], root: str, codes: Dict[str, str],
+                         keep: Callable[[TestFailure], bool] = lambda failure: True) -> List[TestFailure]:
+    """Run a compiler and keep the error diagnostics about the project's own code."""
+    output = _run_checker(command, root)
+    if not output:
+        return []
+    failures = []
+    for failure in parse_diagnostics(_relative_output(output, root), root):
+        missing = MISSING_DEPENDENCY_PATTERN.search(failure.message)
+        if missing and not (missing.group("header") and
+                            any(name.endswith(missing.group("header")) for name in codes)):
+            continue
+        if keep(failure):
+            failures.append(failure)
+    return failures
+
+
+def _write_project(codes: Dict[str, str], root: str) -> Dict[str, str]:
+    """Write the files to check into a scratch directory.
+
+    Returns:
+        The files written (names that would leave the directory are skipped)
+    """
+    written = {}
+    for filename, code in codes.items():
+        path = os.path.normpath(os.path.join(root, filename))
+        if not path.startswith(root + os.sep):
+            continue
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(code)
+        written[filename] = code
+    return written
+
+
+def check_syntax(codes: Dict[str, str], max_workers: int = TEST_PARALLEL_WORKERS) -> List[TestFailure]:
+    """Check every file for syntax and compile errors.
+
+    Files of languages without an installed checker are skipped.
+
+    Args:
+        codes: Dictionary mapping filename to code content
+        max_workers: Maximum number of checks run at the same time
+
+    Returns:
+        Errors found, ordered by file and line (empty if the code passes)
+    """
+    jobs: List[Callable[[], List[TestFailure]]] = []
+    for filename, code in codes.items():
+        if filename.endswith(PYTHON_EXTENSIONS):
+            jobs.append(partial(_check_python, filename, code))
+        elif filename.endswith(".json"):
+            jobs.append(partial(_check_json, filename, code))
+    external = {filename: code for filename, code in codes.items() if filename.endswith(CHECKED_EXTENSIONS)
+                and not filename.endswith(PYTHON_EXTENSIONS + (".json",))}
+
+    root = tempfile.mkdtemp(prefix="syntax-") if external else ""
+    try:
+        if external:
+            root = os.path.realpath(root)
+            # Every file is written, so that headers and package.json are found
+            written = _write_project(codes, root)
+            files = sorted(filename for filename in external if filename in written)
+            if shutil.which("node"):
+                jobs += [partial(_check_node, filename, codes[filename], root)
+                         for filename in files if filename.endswith(JAVASCRIPT_EXTENSIONS)]
+            typescript = [filename for filename in files if filename.endswith(TYPESCRIPT_EXTENSIONS)]
+            if typescript and shutil.which("tsc"):
+                command = ["tsc", "--noEmit", "--pretty", "false", "--skipLibCheck", "--jsx", "preserve", *typescript]
+                jobs.append(partial(_check_with_compiler, command, root, codes,
+                                    lambda failure: bool(TSC_SYNTAX_ERROR_PATTERN.match(failure.exception))))
+            java = [filename for filename in files if filename.endswith(JAVA_EXTENSIONS)]
+            if java and shutil.which("javac"):
+                command = ["javac", "-proc:none", "-d", os.path.join(root, ".classes"), *java]
+                jobs.append(partial(_check_with_compiler, command, root, codes))
+            for extensions, compilers in ((C_EXTENSIONS, ("gcc", "clang")), (CPP_EXTENSIONS, ("g++", "clang++"))):
+                compiler = next((name for name in compilers if shutil.which(name)), None)
+                if compiler:
+                    jobs += [partial(_check_with_compiler, [compiler, "-fsyntax-only", "-I", root, filename], root,
+                                     codes) for filename in files if filename.endswith(extensions)]
+
+        failures: List[TestFailure] = []
+        if jobs:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs))),
+                                    thread_name_prefix="syntax") as executor:
+                for result in executor.map(lambda job: job(), jobs):
+                    failures.extend(result)
+    finally:
+        if root:
+            shutil.rmtree(root, ignore_errors=True)
+    return sorted(failures, key=lambda failure: (failure.file, failure.line))
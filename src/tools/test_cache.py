@@ -0,0 +1,146 @@
+"""Persistent cache of test results keyed on the project's content."""
+
+import os
+import sys
+import hashlib
+import threading
+import subprocess
+import importlib.metadata
+from functools import lru_cache
+from typing import Callable, Dict, Optional
+
+from config.agent_configs import (
+    TEST_CACHE_ENABLED,
+    TEST_CACHE_PATH,
+    TEST_CACHE_MAX_ENTRIES,
+    TEST_CACHE_MAX_MB,
+    TEST_CACHE_MAX_AGE_DAYS,
+    TEST_FILE_TIMEOUT_SECONDS,
+    TEST_SUITE_TIMEOUT_SECONDS,
+)
+from src.tools.disk_cache import DiskCache
+from src.tools.test_runner import find_files, run_tests
+from src.tools.test_reports import TestFailure, TestRun
+
+
+# Bump when run_tests changes in a way that changes its results
+RUNNER_VERSION = "2"
+
+# Results that depend on timing rather than on the code are not cached
+UNCACHEABLE_MARKERS = ("timed out after", "test deadline reached")
+
+# Stands for the project directory in cached output, which may be reused by another project
+DIRECTORY_PLACEHOLDER = "<project>"
+
+
+@lru_cache(maxsize=None)
+def _tool_versions(language: str) -> str:
+    """Versions of the interpreter and test tools used for a language."""
+    if language in ("javascript", "js", "typescript", "ts"):
+        try:
+            return subprocess.run(["node", "--version"], capture_output=True, text=True, timeout=10).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return "no node"
+    versions = [sys.version]
+    for package in ("pytest", "pytest-xdist"):
+        try:
+            versions.append(f"{package} {importlib.metadata.version(package)}")
+        except importlib.metadata.PackageNotFoundError:
+            pass
+    return "; ".join(versions)
+
+
+def make_test_cache_key(directory: str, language: str) -> str:
+    """Hash the project files, the language and the test runner setup.
+
+    Args:
+        directory: Project directory
+        language: Programming language
+
+    Returns:
+        Hex SHA-256 digest identifying a test run
+    """
+    language = language.lower()
+    digest = hashlib.sha256()
+    header = (f"{RUNNER_VERSION}\0{language}\0{_tool_versions(language)}\0"
+              f"{TEST_FILE_TIMEOUT_SECONDS}\0{TEST_SUITE_TIMEOUT_SECONDS}\0")
+    digest.update(header.encode("utf-8"))
+    for path in find_files(directory, lambda file: True):
+        digest.update(path.replace(os.sep, "/").encode("utf-8") + b"\0")
+        with open(os.path.join(directory, path), "rb") as f:
+            content = f.read()
+        digest.update(str(len(content)).encode("ascii") + b"\0" + content)
+    return digest.hexdigest()
+
+
+def _replace_in_run(run: Dict, old: str, new: str) -> Dict:
+    """Copy of a cache entry with a path replaced in its output and failures."""
+    return {
+        "success": run["success"],
+        "output": run["output"].replace(old, new),
+        "failures": [{name: value.replace(old, new) if isinstance(value, str) else value
+                      for name, value in failure.items()} for failure in run["failures"]],
+    }
+
+
+_cache: Optional[DiskCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_test_cache() -> Optional[DiskCache]:
+    """Get the process-wide test result cache.
+
+    Returns:
+        Shared DiskCache, or None when caching is disabled
+    """
+    global _cache
+    if not TEST_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache(
+                TEST_CACHE_PATH,
+                max_entries=TEST_CACHE_MAX_ENTRIES,
+                max_bytes=int(TEST_CACHE_MAX_MB * 1024 * 1024),
+                max_age_seconds=TEST_CACHE_MAX_AGE_DAYS * 24 * 3600,
+            )
+        return _cache
+
+
+def run_tests_cached(directory: str, language: str, on_result: Optional[Callable[[str], None]] = None,
+                     usage_tracker=None) -> TestRun:
+    """Run the project's tests unless the same files were already tested.
+
+    Results are reused when no file changed since an earlier run (in this
+    or another project with identical files). Runs that hit a timeout are
+    not cached.
+
+    Args:
+        directory: Project directory
+        language: Programming language
+        on_result: Called with the result line of each file run (not on a cache hit)
+        usage_tracker: Optional UsageTracker recording the cache lookup
+
+    Returns:
+        TestRun with the success flag, the output and the structured failures
+    """
+    cache = get_test_cache()
+    key = None
+    directory_path = os.path.abspath(directory)
+    if cache is not None:
+        key = make_test_cache_key(directory, language)
+        cached = cache.get(key)
+        if usage_tracker is not None:
+            usage_tracker.record_test_cache_lookup(cached is not None)
+        if cached is not None:
+            print("No file changed since an identical project was tested; reusing its results")
+            cached = _replace_in_run(cached, DIRECTORY_PLACEHOLDER, directory_path)
+            return TestRun(cached["success"], cached["output"],
+                           [TestFailure.from_dict(failure) for failure in cached["failures"]])
+
+    run = run_tests(directory, language, on_result=on_result)
+    if key is not None and not any(marker in run.output for marker in UNCACHEABLE_MARKERS):
+        entry = {"success": run.success, "output": run.output,
+                 "failures": [failure.to_dict() for failure in run.failures]}
+        cache.put(key, _replace_in_run(entry, directory_path, DIRECTORY_PLACEHOLDER))
+    return run
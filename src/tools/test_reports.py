@@ -0,0 +1,506 @@
+"""Structured failures from machine-readable test reports and tool output.
+
+The test runner asks each tool for a report it can parse (pytest JUnit XML,
+node's TAP reporter) and falls back to reading the failures out of plain
+output (unittest, pytest summaries, Python and Node tracebacks, compiler
+diagnostics). Every failure becomes a ``TestFailure`` record, so prompts
+carry a compact list instead of the whole log and the testing loop knows
+exactly which tests fail.
+"""
+
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+# Failures listed one per line in error summaries before the rest is counted
+MAX_LISTED_FAILURES = 20
+
+# Exception lines such as "ValueError: bad input" or "mod.CustomError"
+EXCEPTION_LINE_PATTERN = re.compile(r'^(?P<exception>(?:[A-Za-z_]\w*\.)*[A-Z]\w*)(?::\s*(?P<message>.*))?$')
+
+# pytest longrepr locations, e.g. "calc.py:2: ZeroDivisionError" or "test_app.py:1: in <module>"
+PYTEST_LOCATION_PATTERN = re.compile(r'^(?P<file>[^\s:][^:]*):(?P<line>\d+): ?(?:in \S.*|(?P<exception>[\w.]+))?$')
+
+# pytest "E   ..." lines carrying the error
+PYTEST_ERROR_LINE_PATTERN = re.compile(r'^E\s+(?P<text>\S.*)$')
+
+# pytest section titles within FAILURES/ERRORS, e.g. "____ TestCalc.test_add ____"
+PYTEST_SECTION_TITLE_PATTERN = re.compile(r'^_{3,} (?P<title>.+?) _{3,}$', re.MULTILINE)
+
+# pytest short test summary lines
+PYTEST_SUMMARY_PATTERN = re.compile(r'^(?:FAILED|ERROR) (?P<test_id>\S+)(?: - (?P<message>.*))?$', re.MULTILINE)
+
+# unittest failure headers, e.g. "FAIL: test_add (test_calc.TestCalc.test_add)"
+UNITTEST_HEADER_PATTERN = re.compile(r'^(?:FAIL|ERROR): (?P<name>\S+) \((?P<test_id>[^)]*)\)', re.MULTILINE)
+
+UNITTEST_SECTION_END_PATTERN = re.compile(r'^(?:={20,}|-{20,}\nRan \d+ tests?)', re.MULTILINE)
+
+PYTHON_FRAME_PATTERN = re.compile(r'^\s*File "(?P<file>[^"]+)", line (?P<line>\d+)')
+
+# TAP result lines of failing tests, e.g. "not ok 3 - adds numbers"
+TAP_FAILURE_PATTERN = re.compile(r'^(?P<indent>\s*)not ok \d+(?: -)? ?(?P<name>[^#\n]*?)\s*(?:#\s*(?P<directive>\w+).*)?$')
+
+# Node stack frames, e.g. "    at add (/app/calc.js:3:9)" or "    at /app/calc.js:3:9"
+NODE_FRAME_PATTERN = re.compile(r'^\s*at (?:.*?\()?(?P<file>[^()\s]+?):(?P<line>\d+):\d+\)?$')
+
+# First line of Node's report of an uncaught error: "/app/calc.js:3"
+NODE_SOURCE_LINE_PATTERN = re.compile(r'^(?P<file>\S+\.[cm]?[jt]sx?):(?P<line>\d+)$')
+
+NODE_ERROR_LINE_PATTERN = re.compile(r'^(?P<exception>[A-Z]\w*(?:Error|Exception))(?: \[\w+\])?: (?P<message>.*)$')
+
+# Compiler diagnostics: gcc/clang/javac/swiftc, tsc and rustc
+DIAGNOSTIC_PATTERNS = (
+    re.compile(r'^(?P<file>[^\s:(][^:(\n]*\.\w+):(?P<line>\d+)(?::\d+)?: (?:fatal )?(?P<exception>error)(?:\[\w+\])?: '
+               r'(?P<message>.+)$', re.MULTILINE),
+    re.compile(r'^(?P<file>[^\s(][^(\n]*\.\w+)\((?P<line>\d+),\d+\): (?P<exception>error TS\d+): (?P<message>.+)$',
+               re.MULTILINE),
+    re.compile(r'^(?P<exception>error(?:\[E\d+\])?): (?P<message>.+)\n\s*--> (?P<file>[^\s:]+):(?P<line>\d+):\d+$',
+               re.MULTILINE),
+)
+
+# Parts of paths that mark installed rather than project code
+LIBRARY_PATH_MARKERS = ("site-packages", "dist-packages", "node_modules", "node:", "<frozen")
+
+
+@dataclass
+class TestFailure:
+    """One failing test, script or compiler diagnostic."""
+    __test__ = False  # not a pytest test class
+
+    test_id: str
+    file: str = ""
+    line: int = 0
+    exception: str = ""
+    message: str = ""
+    details: str = ""
+
+    @property
+    def location(self) -> str:
+        """``file:line`` of the failure, or just the file when the line is unknown."""
+        return f"{self.file}:{self.line}" if self.file and self.line else self.file
+
+    def summary(self) -> str:
+        """One line naming the test, where it failed, the exception and its message."""
+        head = self.test_id
+        if self.location and self.location != self.test_id:
+            head += f" ({self.location})"
+        error = ": ".join(part for part in (self.exception, self.message) if part)
+        return f"{head}: {error}" if error else head
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TestFailure":
+        return cls(**data)
+
+
+@dataclass
+class TestRun:
+    """Outcome of running a project's tests."""
+    __test__ = False  # not a pytest test class
+
+    success: bool
+    output: str
+    failures: List[TestFailure] = field(default_factory=list)
+
+
+def _relative_path(path: str, directory: str) -> str:
+    """Path relative to the project directory when it lies inside it."""
+    if directory and os.path.isabs(path):
+        root = os.path.abspath(directory)
+        if os.path.commonpath([root, os.path.abspath(path)]) == root:
+            return os.path.relpath(path, root)
+    return path
+
+
+def is_library_path(path: str, directory: str = "") -> bool:
+    """Whether a path belongs to installed code rather than to the project.
+
+    Args:
+        path: Path from a traceback or stack frame
+        directory: Project directory; without it only installed packages and
+            the standard library are recognised as library code
+
+    Returns:
+        True for library code
+    """
+    if any(marker in path for marker in LIBRARY_PATH_MARKERS):
+        return True
+    if not os.path.isabs(path):
+        return False
+    if directory:
+        return _relative_path(path, directory) == path
+    return path.startswith((sys.prefix, sys.base_prefix))
+
+
+def _first_line(text: str) -> str:
+    return text.strip().split('\n', 1)[0].strip() if text else ""
+
+
+def _compact(text: str, limit: int = 200) -> str:
+    """Multi-line text joined into one line of at most ``limit`` characters."""
+    joined = " ".join(part.strip() for part in text.split('\n') if part.strip())
+    return joined if len(joined) <= limit else joined[:limit - 3] + "..."
+
+
+def _split_exception(text: str) -> Tuple[str, str]:
+    """Split "ValueError: bad input" into its exception and message."""
+    match = EXCEPTION_LINE_PATTERN.match(text.strip())
+    if not match:
+        return "", text.strip()
+    return match.group("exception"), (match.group("message") or "").strip()
+
+
+def _pytest_failure(test_id: str, details: str, message_attribute: str, directory: str,
+                    file: str = "", line: int = 0) -> TestFailure:
+    """Failure record from a pytest failure report (longrepr) and its message.
+
+    ``file`` and ``line`` locate the test itself, which is where the failure
+    is placed unless the report names a deeper frame.
+    """
+    details = details.strip()
+    failure = TestFailure(test_id=test_id, file=file, line=line, details=details)
+    # The last location line of the longrepr is the innermost frame
+    for text_line in details.split('\n'):
+        location = PYTEST_LOCATION_PATTERN.match(text_line)
+        if location and not is_library_path(location.group("file"), directory):
+            failure.file = _relative_path(location.group("file"), directory)
+            failure.line = int(location.group("line"))
+            failure.exception = location.group("exception") or failure.exception
+    error_lines = [match.group("text") for match in map(PYTEST_ERROR_LINE_PATTERN.match, details.split('\n')) if match]
+    exception, message = _split_exception(_first_line(message_attribute))
+    if exception and (not failure.exception or exception.endswith(failure.exception)):
+        failure.exception, failure.message = exception, message
+    elif error_lines:
+        # Collection and fixture errors carry a generic message attribute
+        exception, message = _split_exception(error_lines[0])
+        failure.exception = exception or failure.exception
+        failure.message = _first_line(message)
+    else:
+        failure.message = _first_line(message_attribute)
+    return failure
+
+
+def parse_junit_xml(path: str, directory: str = "") -> Optional[List[TestFailure]]:
+    """Read the failures from a JUnit XML report written by pytest.
+
+    Args:
+        path: Report file (pytest ``--junitxml`` with ``junit_family=xunit1``)
+        directory: Project directory, to which file paths are made relative
+
+    Returns:
+        Failures in report order, or None if the report is missing or unreadable
+    """
+    try:
+        root = ET.parse(path).getroot()
+    except (OSError, ET.ParseError):
+        return None
+    failures = []
+    for case in root.iter("testcase"):
+        for element in case:
+            if element.tag not in ("failure", "error"):
+                continue
+            file = case.get("file", "")
+            classname, name = case.get("classname", ""), case.get("name", "")
+            module = file[:-3].replace('/', '.') if file.endswith(".py") else ""
+            if file and classname.startswith(module + "."):
+                test_id = "::".join([file, *classname[len(module) + 1:].split('.'), name])
+            elif file and classname in ("", module):
+                test_id = f"{file}::{name}" if classname else file
+            else:
+                test_id = f"{classname}.{name}" if classname else name
+            line = case.get("line", "")
+            # JUnit lines count from zero
+            failures.append(_pytest_failure(test_id, element.text or "", element.get("message", ""), directory,
+                                            file, int(line) + 1 if line.isdigit() else 0))
+    return failures
+
+
+def parse_python_traceback(text: str, test_id: str, directory: str = "") -> Optional[TestFailure]:
+    """Failure record from the last Python traceback in some output.
+
+    The location is the innermost frame in the project's own code (the
+    innermost frame overall when no frame is). Syntax errors, which Python
+    reports without a ``Traceback`` header, are recognised as well.
+
+    Args:
+        text: Output containing a traceback
+        test_id: Test or script the traceback belongs to
+        directory: Project directory, to which file paths are made relative
+
+    Returns:
+        TestFailure, or None if the text has no traceback
+    """
+    frames: List[Tuple[str, int]] = []
+    result = None
+    start = 0
+    lines = text.split('\n')
+    for index, text_line in enumerate(lines):
+        if text_line.startswith("Traceback (most recent call last):"):
+            frames, start = [], index
+            continue
+        frame = PYTHON_FRAME_PATTERN.match(text_line)
+        if frame:
+            if not frames and not (index and lines[index - 1].startswith("Traceback")):
+                # Syntax errors start at their frame, without a header
+                start = index
+            frames.append((frame.group("file"), int(frame.group("line"))))
+            continue
+        if frames and text_line and not text_line[0].isspace():
+            exception, message = _split_exception(text_line)
+            if exception:
+                project = [frame for frame in frames if not is_library_path(frame[0], directory)]
+                file, line = (project or frames)[-1]
+                result = TestFailure(test_id=test_id, file=_relative_path(file, directory), line=line,
+                                     exception=exception, message=message,
+                                     details='\n'.join(lines[start:index + 1]).strip())
+            frames = []
+    return result
+
+
+def parse_unittest_output(output: str, directory: str = "") -> List[TestFailure]:
+    """Failures reported by ``python -m unittest -v``.
+
+    Args:
+        output: unittest output
+        directory: Project directory, to which file paths are made relative
+
+    Returns:
+        One failure per FAIL/ERROR section
+    """
+    failures = []
+    headers = list(UNITTEST_HEADER_PATTERN.finditer(output))
+    for header in headers:
+        end = UNITTEST_SECTION_END_PATTERN.search(output, header.end())
+        section = output[header.end():end.start() if end else len(output)]
+        test_id = header.group("test_id")
+        if not test_id.endswith("." + header.group("name")):
+            # Python before 3.11 shows only the class
+            test_id += "." + header.group("name")
+        failure = parse_python_traceback(section, test_id, directory)
+        failures.append(failure or TestFailure(test_id=test_id, details=section.strip()))
+    return failures
+
+
+def _pytest_sections(output: str) -> Dict[str, str]:
+    """Failure reports of pytest's FAILURES/ERRORS sections by their title."""
+    sections = {}
+    titles = list(PYTEST_SECTION_TITLE_PATTERN.finditer(output))
+    for index, title in enumerate(titles):
+        end = titles[index + 1].start() if index + 1 < len(titles) else len(output)
+        # The last report runs until the next "====" banner
+        banner = re.search(r'^={3,}', output[title.end():end], re.MULTILINE)
+        sections[title.group("title")] = output[title.end():title.end() + banner.start() if banner else end]
+    return sections
+
+
+def parse_pytest_summary(output: str, directory: str = "") -> List[TestFailure]:
+    """Failures listed in pytest's short test summary, when no report was written.
+
+    Each failure is located from its report in the FAILURES/ERRORS section.
+
+    Args:
+        output: pytest output
+        directory: Project directory, to which file paths are made relative
+
+    Returns:
+        One failure per FAILED/ERROR line
+    """
+    failures = []
+    sections = _pytest_sections(output)
+    for match in PYTEST_SUMMARY_PATTERN.finditer(output):
+        test_id = match.group("test_id")
+        parts = test_id.split("::")
+        # Sections are titled "Class.test" for methods and after the module for collection errors
+        title = ".".join(parts[1:]) if len(parts) > 1 else f"ERROR collecting {parts[0]}"
+        failures.append(_pytest_failure(test_id, sections.get(title, ""), match.group("message") or "",
+                                        directory, file=parts[0]))
+    return failures
+
+
+def _tap_block(lines: List[str], start: int, indent: int) -> Tuple[Dict[str, str], int]:
+    """Parse the YAML diagnostics block following a TAP result line.
+
+    Returns:
+        Tuple of (flat mapping of the block's top-level keys, index after the block)
+    """
+    values: Dict[str, str] = {}
+    index = start
+    if index >= len(lines) or lines[index].strip() != "---":
+        return values, index
+    index += 1
+    key = None
+    block: List[str] = []
+    while index < len(lines) and lines[index].strip() != "...":
+        text_line = lines[index]
+        stripped = text_line.strip()
+        line_indent = len(text_line) - len(text_line.lstrip())
+        match = re.match(r'^(\w+):\s*(.*)$', stripped)
+        if match and line_indent <= indent + 2:
+            if key:
+                values[key] = '\n'.join(block).strip()
+            key, value = match.group(1), match.group(2)
+            block = [] if value in ("|", "|-", ">", ">-") else [value.strip("'\"")]
+        elif key:
+            block.append(stripped)
+        index += 1
+    if key:
+        values[key] = '\n'.join(block).strip()
+    return values, index + 1
+
+
+def parse_tap(output: str, directory: str = "") -> List[TestFailure]:
+    """Failures reported in TAP output, such as ``node --test --test-reporter=tap``.
+
+    Suites whose only problem is a failing subtest are not listed; the
+    subtest is.
+
+    Args:
+        output: TAP output
+        directory: Project directory, to which file paths are made relative
+
+    Returns:
+        One failure per failing test
+    """
+    failures = []
+    lines = output.split('\n')
+    index = 0
+    while index < len(lines):
+        match = TAP_FAILURE_PATTERN.match(lines[index])
+        index += 1
+        if not match or (match.group("directive") or "").upper() in ("TODO", "SKIP"):
+            continue
+        values, index = _tap_block(lines, index, len(match.group("indent")))
+        if values.get("failureType") == "subtestsFailed":
+            continue
+        failure = TestFailure(test_id=match.group("name").strip() or "test",
+                              exception=values.get("name", "") or values.get("code", ""),
+                              message=_compact(values.get("error", "")),
+                              details='\n'.join(part for part in (values.get("error", ""),
+                                                                  values.get("stack", "")) if part))
+        location = values.get("location", "")
+        if location:
+            parts = location.rsplit(':', 2)
+            failure.file = _relative_path(parts[0], directory)
+            failure.line = int(parts[1]) if len(parts) == 3 and parts[1].isdigit() else 0
+        # The innermost frame in the project's code is more precise than the test's own location
+        for stack_line in values.get("stack", "").split('\n'):
+            frame = NODE_FRAME_PATTERN.match("at " + stack_line.strip())
+            if frame and not is_library_path(frame.group("file"), directory):
+                failure.file = _relative_path(frame.group("file"), directory)
+                failure.line = int(frame.group("line"))
+                break
+        failures.append(failure)
+    return failures
+
+
+def parse_node_error(text: str, test_id: str, directory: str = "") -> Optional[TestFailure]:
+    """Failure record from Node's report of an uncaught error.
+
+    Args:
+        text: Output of a failed node run
+        test_id: Script the error belongs to
+        directory: Project directory, to which file paths are made relative
+
+    Returns:
+        TestFailure, or None if the text has no error report
+    """
+    lines = text.split('\n')
+    for index, text_line in enumerate(lines):
+        error = NODE_ERROR_LINE_PATTERN.match(text_line.strip())
+        if not error:
+            continue
+        failure = TestFailure(test_id=test_id, exception=error.group("exception"), message=error.group("message"))
+        for frame_line in lines[index + 1:]:
+            frame = NODE_FRAME_PATTERN.match(frame_line)
+            if not frame:
+                break
+            if not is_library_path(frame.group("file"), directory):
+                failure.file = _relative_path(frame.group("file"), directory)
+                failure.line = int(frame.group("line"))
+                break
+        if not failure.file:
+            # Syntax errors have no stack in the project; Node names the line first
+            for source_line in lines[:index]:
+                source = NODE_SOURCE_LINE_PATTERN.match(source_line.strip())
+                if source:
+                    failure.file = _relative_path(source.group("file"), directory)
+                    failure.line = int(source.group("line"))
+                    break
+        failure.details = text.strip()
+        return failure
+    return None
+
+
+def parse_diagnostics(output: str, directory: str = "") -> List[TestFailure]:
+    """Errors reported by compilers and type checkers (gcc, clang, javac, tsc, rustc).
+
+    Args:
+        output: Compiler output
+        directory: Project directory, to which file paths are made relative
+
+    Returns:
+        One failure per error diagnostic, identified by its file
+    """
+    failures = []
+    for pattern in DIAGNOSTIC_PATTERNS:
+        for match in pattern.finditer(output):
+            file = _relative_path(match.group("file"), directory)
+            failures.append(TestFailure(test_id=file, file=file, line=int(match.group("line")),
+                                        exception=match.group("exception"), message=match.group("message").strip(),
+                                        details=match.group(0)))
+    return sorted(failures, key=lambda failure: (failure.file, failure.line))
+
+
+def parse_failures(output: str, directory: str = "") -> List[TestFailure]:
+    """Failures read out of plain test output, whatever tool produced it.
+
+    Args:
+        output: Test or compiler output
+        directory: Project directory, to which file paths are made relative
+
+    Returns:
+        Failures found (empty if the output is in no known format)
+    """
+    for parse in (parse_tap, parse_unittest_output):
+        failures = parse(output, directory)
+        if failures:
+            return failures
+    failures = parse_pytest_summary(output, directory)
+    if failures:
+        return failures
+    for parse_error in (parse_python_traceback, parse_node_error):
+        failure = parse_error(output, "", directory)
+        if failure:
+            failure.test_id = failure.file or "run"
+            return [failure]
+    return parse_diagnostics(output, directory)
+
+
+def format_failures(failures: List[TestFailure], details: bool = False,
+                    max_listed: int = MAX_LISTED_FAILURES) -> str:
+    """Render failures as a compact list for prompts and summaries.
+
+    Args:
+        failures: Failures to list
+        details: Whether to add each failure's traceback or report excerpt
+        max_listed: Failures listed before the rest are only counted
+
+    Returns:
+        One line per failure (followed by its details when requested)
+    """
+    if not failures:
+        return ""
+    lines = [f"{len(failures)} failing test{'s' if len(failures) != 1 else ''}:"]
+    for failure in failures[:max_listed]:
+        lines.append(f"- {failure.summary()}")
+        if details and failure.details:
+            lines.append('\n'.join("    " + text_line for text_line in failure.details.split('\n')))
+    if len(failures) > max_listed:
+        lines.append(f"... and {len(failures) - max_listed} more")
+    return '\n'.join(lines)
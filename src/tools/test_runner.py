@@ -1,148 +1,360 @@
 """Test execution and error parsing utilities."""
 
-import subprocess
 import os
-from typing import Tuple
+import re
+import time
+import shutil
+import tempfile
+import subprocess
+import importlib.util
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.tools.sandbox import run_limited
+from src.tools.sandbox_pool import SandboxError, get_sandbox_pool
+from src.tools.syntax_check import CHECKED_EXTENSIONS, check_syntax
+from src.tools.test_reports import (
+    TestFailure,
+    TestRun,
+    format_failures,
+    parse_failures,
+    parse_junit_xml,
+    parse_node_error,
+    parse_python_traceback,
+)
+from config.agent_configs import (
+    TEST_PARALLEL_WORKERS,
+    TEST_FILE_TIMEOUT_SECONDS,
+    TEST_SUITE_TIMEOUT_SECONDS,
+    TEST_DEADLINE_SECONDS,
+)
+
+
+# Directories never searched for files to run
+SKIPPED_DIRECTORIES = {"node_modules", "__pycache__", "venv", ".venv"}
 
+# Result lines of passing tests and scripts (pytest -v, unittest -v, run_files_parallel)
+PASSED_LINE_PATTERN = re.compile(r'(?: PASSED(?:\s+\[\s*\d+%\])?|\.\.\. ok|: OK)\s*$')
 
-def run_tests(directory: str, language: str) -> Tuple[bool, str]:
+# pytest section headers from which the output only concerns failures
+PYTEST_FAILURE_SECTION_PATTERN = re.compile(r'^=+ (?:FAILURES|ERRORS) =+$', re.MULTILINE)
+
+
+def run_tests(directory: str, language: str, on_result: Optional[Callable[[str], None]] = None,
+              deadline_seconds: float = TEST_DEADLINE_SECONDS) -> TestRun:
     """Run tests for the project.
     
+    Test tools are asked for machine-readable reports (pytest JUnit XML,
+    node's TAP reporter), from which the failures are read.
+    
     Args:
         directory: Project directory
         language: Programming language (python, javascript, etc.)
+        on_result: Called with the result line of each file run as soon as it finishes
+        deadline_seconds: Time allowed for the whole test run
         
     Returns:
-        Tuple of (success: bool, output: str)
+        TestRun with the success flag, the output and the structured failures
     """
+    deadline = time.monotonic() + deadline_seconds
     if language.lower() == "python":
-        return _run_python_tests(directory)
+        return _run_python_tests(directory, deadline, on_result)
     elif language.lower() in ["javascript", "js", "typescript", "ts"]:
-        return _run_node_tests(directory)
+        return _run_node_tests(directory, deadline, on_result)
     else:
         # For unsupported languages, just check if code compiles/runs
         return _check_basic_syntax(directory, language)
 
 
-def _run_python_tests(directory: str) -> Tuple[bool, str]:
+def _sandbox_argv(command: List[str]) -> Optional[List[str]]:
+    """Arguments for the sandbox pool if the command runs Python code, else None."""
+    if command[0] == "python":
+        return command[1:]
+    if command[0] == "pytest" and importlib.util.find_spec("pytest") is not None:
+        return ["-m", "pytest"] + command[1:]
+    return None
+
+
+def _execute(command: List[str], cwd: str, timeout: float,
+             env: Optional[Dict[str, str]] = None) -> subprocess.CompletedProcess:
+    """Run a command, in a warm sandbox child when it runs Python code.
+    
+    Commands given their own ``env`` run outside the sandbox pool.
+    
+    Raises:
+        subprocess.TimeoutExpired: If the command did not finish in time
+        FileNotFoundError: If the executable does not exist
+    """
+    pool = get_sandbox_pool()
+    argv = _sandbox_argv(command) if pool and env is None else None
+    if argv is not None:
+        started = time.monotonic()
+        try:
+            result = pool.run(argv, cwd, timeout)
+        except SandboxError as e:
+            # Time spent waiting for a busy pool counts against the run
+            remaining = timeout - (time.monotonic() - started)
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(command, timeout)
+            print(f"Sandbox unavailable ({e}); running {command[0]} directly")
+            return run_limited(command, cwd, remaining, env=env)
+        else:
+            if result.timed_out:
+                raise subprocess.TimeoutExpired(command, timeout, result.stdout, result.stderr)
+            return subprocess.CompletedProcess(command, result.returncode, result.stdout, result.stderr)
+    return run_limited(command, cwd, timeout, env=env)
+
+
+def find_files(directory: str, accept: Callable[[str], bool]) -> List[str]:
+    """Find project files, skipping dependency, cache and hidden directories.
+    
+    Args:
+        directory: Project directory
+        accept: Predicate on the file name
+        
+    Returns:
+        Paths relative to the directory, in a stable order
+    """
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d not in SKIPPED_DIRECTORIES and not d.startswith('.'))
+        for file in sorted(files):
+            if accept(file):
+                found.append(os.path.relpath(os.path.join(root, file), directory))
+    return found
+
+
+def _run_file(name: str, command: List[str], cwd: str, deadline: float) -> Tuple[bool, str]:
+    """Run one file within its own timeout and the overall deadline."""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return False, f"Skipped {name}: test deadline reached"
+    timeout = min(TEST_FILE_TIMEOUT_SECONDS, remaining)
+    try:
+        result = _execute(command, cwd, timeout)
+    except subprocess.TimeoutExpired:
+        return False, f"Error running {name}: timed out after {timeout:.0f} seconds"
+    except Exception as e:
+        return False, f"Error running {name}: {str(e)}"
+    if result.returncode != 0:
+        return False, f"Error in {name}: {result.stderr}"
+    return True, f"{name}: OK"
+
+
+def run_files_parallel(commands: List[Tuple[str, List[str]]], cwd: str, deadline: float,
+                       on_result: Optional[Callable[[str], None]] = None,
+                       max_workers: int = TEST_PARALLEL_WORKERS) -> List[Tuple[bool, str]]:
+    """Run files concurrently on a bounded pool of subprocesses.
+    
+    Each file keeps its own timeout, cut short by the deadline; files that
+    have not started when the deadline passes are reported as skipped.
+    
+    Args:
+        commands: List of (name, command) pairs
+        cwd: Working directory of the commands
+        deadline: time.monotonic() value by which all runs must finish
+        on_result: Called with each result line as soon as its file finishes
+        max_workers: Maximum number of files run at the same time
+        
+    Returns:
+        (success, result line) per command, in the order of ``commands``
+    """
+    results: Dict[str, Tuple[bool, str]] = {}
+    if commands:
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(commands))),
+                                      thread_name_prefix="test")
+        futures = {executor.submit(_run_file, name, command, cwd, deadline): name for name, command in commands}
+        try:
+            # Every run ends by the deadline; the grace period covers process cleanup
+            for future in as_completed(futures, timeout=max(0.0, deadline - time.monotonic()) + 5):
+                results[futures[future]] = future.result()
+                if on_result:
+                    on_result(results[futures[future]][1])
+        except FuturesTimeoutError:
+            pass
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    return [results.get(name, (False, f"Skipped {name}: test deadline reached")) for name, _ in commands]
+
+
+def _count_test_files(directory: str) -> int:
+    """Number of pytest-style test files in the project."""
+    return len(find_files(directory, lambda file: file.endswith('.py') and
+                           (file.startswith('test_') or file.endswith('_test.py'))))
+
+
+def _suite_failures(name: str, output: str, failures: List[TestFailure]) -> List[TestFailure]:
+    """Failures of a failed suite run, or one naming the run when none could be read."""
+    if failures:
+        return failures
+    lines = [line.strip() for line in output.split('\n') if line.strip()]
+    return [TestFailure(test_id=name, message=lines[-1] if lines else "failed without output")]
+
+
+def _file_failure(name: str, line: str, directory: str, parse_error) -> TestFailure:
+    """Failure record of a file run, from its traceback or else from its result line."""
+    failure = parse_error(line, name, directory)
+    if failure is None:
+        failure = TestFailure(test_id=name, file=name, message=line.split(": ", 1)[-1].strip(), details=line)
+    return failure
+
+
+def _pytest_command(directory: str, report_path: str) -> List[str]:
+    """pytest command line writing a JUnit XML report, spreading test files over
+    workers when pytest-xdist is installed."""
+    # xunit1 reports record each test's file and line
+    command = ["pytest", directory, "-v", f"--junitxml={report_path}", "-o", "junit_family=xunit1"]
+    # xdist workers are CPU-bound, unlike the scripts run by run_files_parallel
+    workers = min(os.cpu_count() or 1, TEST_PARALLEL_WORKERS, _count_test_files(directory))
+    if workers > 1 and importlib.util.find_spec("xdist") is not None:
+        command += ["-n", str(workers)]
+    return command
+
+
+def _run_python_tests(directory: str, deadline: float,
+                      on_result: Optional[Callable[[str], None]] = None) -> TestRun:
     """Run Python tests using pytest or unittest."""
+    timeout = max(1.0, min(TEST_SUITE_TIMEOUT_SECONDS, deadline - time.monotonic()))
+    report_dir = tempfile.mkdtemp(prefix="pytest-report-")
+    report_path = os.path.join(report_dir, "report.xml")
     try:
         # Try pytest first
-        result = subprocess.run(
-            ["pytest", directory, "-v"],
-            capture_output=True,
-            text=True,
-            timeout=30,
-            cwd=directory
-        )
+        result = _execute(_pytest_command(directory, report_path), directory, timeout)
+        output = result.stdout if result.returncode == 0 else result.stdout + result.stderr
+        failures = parse_junit_xml(report_path, directory)
+        if failures is None:
+            # No report (pytest stopped early): read the failures from its output
+            failures = parse_failures(output, directory)
         if result.returncode == 0:
-            return True, result.stdout
-        else:
-            return False, result.stdout + result.stderr
+            return TestRun(True, output)
+        return TestRun(False, output, _suite_failures("pytest", output, failures))
+    except subprocess.TimeoutExpired:
+        message = f"pytest timed out after {timeout:.0f} seconds"
+        return TestRun(False, message, [TestFailure(test_id="pytest", message=message)])
     except FileNotFoundError:
         # Try unittest if pytest not available
         try:
-            result = subprocess.run(
-                ["python", "-m", "unittest", "discover", "-s", directory, "-v"],
-                capture_output=True,
-                text=True,
-                timeout=30,
-                cwd=directory
-            )
-            return result.returncode == 0, result.stdout + result.stderr
+            result = _execute(["python", "-m", "unittest", "discover", "-s", directory, "-v"],
+                              directory, timeout)
+            output = result.stdout + result.stderr
+            if result.returncode == 0:
+                return TestRun(True, output)
+            return TestRun(False, output, _suite_failures("unittest", output, parse_failures(output, directory)))
         except Exception as e:
             # Fallback: try to run main files
-            return _run_python_files(directory)
+            return _run_python_files(directory, deadline, on_result)
+    finally:
+        shutil.rmtree(report_dir, ignore_errors=True)
 
 
-def _run_python_files(directory: str) -> Tuple[bool, str]:
+def _run_python_files(directory: str, deadline: float,
+                      on_result: Optional[Callable[[str], None]] = None) -> TestRun:
     """Try to run Python files directly."""
-    output = []
-    success = True
-    
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file.endswith('.py') and file != '__init__.py':
-                file_path = os.path.join(root, file)
-                try:
-                    result = subprocess.run(
-                        ["python", file_path],
-                        capture_output=True,
-                        text=True,
-                        timeout=10,
-                        cwd=directory
-                    )
-                    if result.returncode != 0:
-                        success = False
-                        output.append(f"Error in {file}: {result.stderr}")
-                    else:
-                        output.append(f"{file}: OK")
-                except Exception as e:
-                    success = False
-                    output.append(f"Error running {file}: {str(e)}")
-    
-    return success, "\n".join(output)
+    files = find_files(directory, lambda file: file.endswith('.py') and file != '__init__.py')
+    results = run_files_parallel([(file, ["python", file]) for file in files], directory, deadline, on_result)
+    failures = [_file_failure(file, line, directory, parse_python_traceback)
+                for file, (success, line) in zip(files, results) if not success]
+    return TestRun(not failures, "\n".join(line for _, line in results), failures)
 
 
-def _run_node_tests(directory: str) -> Tuple[bool, str]:
+@lru_cache(maxsize=None)
+def _node_tap_options() -> str:
+    """NODE_OPTIONS selecting the TAP reporter of ``node --test``, if node supports it."""
+    try:
+        version = subprocess.run(["node", "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    match = re.match(r'v(\d+)', version.strip())
+    # Older versions reject the option in NODE_OPTIONS, which would break every node process
+    return "--test-reporter=tap" if match and int(match.group(1)) >= 20 else ""
+
+
+def _run_node_tests(directory: str, deadline: float,
+                    on_result: Optional[Callable[[str], None]] = None) -> TestRun:
     """Run Node.js tests."""
+    timeout = max(1.0, min(TEST_SUITE_TIMEOUT_SECONDS, deadline - time.monotonic()))
+    env = None
+    if _node_tap_options():
+        env = dict(os.environ)
+        env["NODE_OPTIONS"] = f"{env.get('NODE_OPTIONS', '')} {_node_tap_options()}".strip()
     try:
-        result = subprocess.run(
-            ["npm", "test"],
-            capture_output=True,
-            text=True,
-            timeout=30,
-            cwd=directory
-        )
-        return result.returncode == 0, result.stdout + result.stderr
+        result = _execute(["npm", "test"], directory, timeout, env=env)
+        output = result.stdout + result.stderr
+        if result.returncode == 0:
+            return TestRun(True, output)
+        return TestRun(False, output, _suite_failures("npm test", output, parse_failures(output, directory)))
+    except subprocess.TimeoutExpired:
+        message = f"npm test timed out after {timeout:.0f} seconds"
+        return TestRun(False, message, [TestFailure(test_id="npm test", message=message)])
     except FileNotFoundError:
         # Try running with node directly
-        return _run_node_files(directory)
+        return _run_node_files(directory, deadline, on_result)
 
 
-def _run_node_files(directory: str) -> Tuple[bool, str]:
+def _run_node_files(directory: str, deadline: float,
+                    on_result: Optional[Callable[[str], None]] = None) -> TestRun:
     """Try to run Node.js files directly."""
-    output = []
-    success = True
-    
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file.endswith('.js') and not file.endswith('.test.js'):
-                file_path = os.path.join(root, file)
-                try:
-                    result = subprocess.run(
-                        ["node", file_path],
-                        capture_output=True,
-                        text=True,
-                        timeout=10,
-                        cwd=directory
-                    )
-                    if result.returncode != 0:
-                        success = False
-                        output.append(f"Error in {file}: {result.stderr}")
-                except Exception as e:
-                    success = False
-                    output.append(f"Error running {file}: {str(e)}")
-    
-    return success, "\n".join(output)
+    files = find_files(directory, lambda file: file.endswith('.js') and not file.endswith('.test.js'))
+    results = run_files_parallel([(file, ["node", file]) for file in files], directory, deadline, on_result)
+    failures = [_file_failure(file, line, directory, parse_node_error)
+                for file, (success, line) in zip(files, results) if not success]
+    return TestRun(not failures, "\n".join(line for success, line in results if not success), failures)
+
+
+def _check_basic_syntax(directory: str, language: str) -> TestRun:
+    """Syntax and compile check for languages without a test runner."""
+    files = find_files(directory, lambda file: file.endswith(CHECKED_EXTENSIONS))
+    if not files:
+        return TestRun(True, f"No syntax checker available for {language}")
+    codes = {}
+    for file in files:
+        with open(os.path.join(directory, file), encoding="utf-8", errors="replace") as f:
+            codes[file] = f.read()
+    failures = check_syntax(codes)
+    if not failures:
+        return TestRun(True, f"Syntax check passed for {len(files)} files")
+    return TestRun(False, "\n\n".join(failure.details or failure.summary() for failure in failures), failures)
 
 
-def _check_basic_syntax(directory: str, language: str) -> Tuple[bool, str]:
-    """Basic syntax checking for unsupported languages."""
-    # For now, just return success
-    # Can be extended with language-specific syntax checkers
-    return True, "Syntax check not implemented for this language"
+def failure_report(output: str) -> str:
+    """Reduce test output to the parts about failures.
+    
+    Drops the pytest session header and progress lines before the
+    FAILURES/ERRORS sections, and every line reporting a passing test or
+    script.
+    
+    Args:
+        output: Test execution output
+        
+    Returns:
+        Output concerning the failures
+    """
+    section = PYTEST_FAILURE_SECTION_PATTERN.search(output)
+    if section:
+        output = output[section.start():]
+    lines = [line for line in output.split('\n') if not PASSED_LINE_PATTERN.search(line)]
+    return '\n'.join(lines).strip()
 
 
-def parse_test_errors(output: str) -> str:
+def parse_test_errors(output: str, failures: Optional[List[TestFailure]] = None) -> str:
     """Extract error summary from test output.
     
+    Failures from the run's report are listed one per line (test id,
+    file:line, exception and message). Only output in no known format
+    falls back to the lines mentioning errors.
+    
     Args:
         output: Test execution output
+        failures: Failures of the run, read from the output when not given
         
     Returns:
         Summary of errors found
     """
+    if failures is None:
+        failures = parse_failures(output) if output else []
+    if failures:
+        return format_failures(failures)
     if not output:
         return ""
     
@@ -159,8 +371,3 @@ def parse_test_errors(output: str) -> str:
         return "\n".join(errors[:10])  # Limit to first 10 errors
     else:
         return "No specific errors found in test output"
-
-
-
-
-
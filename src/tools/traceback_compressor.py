@@ -0,0 +1,233 @@
+"""Compress test failures for the Tester prompt.
+
+When many tests fail for the same reason, their tracebacks are nearly
+identical. Failures are grouped by exception type and innermost frame, and
+each group is sent once, with its size and the other test ids. Within a
+traceback, runs of library frames (site-packages, the standard library,
+node internals) and repeated frames (recursion) are collapsed. The result
+is cut to a token budget, keeping the summary of every group before any
+traceback.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from src.tools.context_builder import CHARS_PER_TOKEN
+from src.tools.test_reports import (
+    NODE_FRAME_PATTERN,
+    PYTEST_LOCATION_PATTERN,
+    PYTHON_FRAME_PATTERN,
+    TestFailure,
+    is_library_path,
+)
+from config.agent_configs import TEST_REPORT_MAX_TOKENS
+
+
+# Separator between the frames of a pytest failure report
+PYTEST_FRAME_SEPARATOR_PATTERN = re.compile(r'^(?:_ ){3,}_?\s*$')
+
+# Other test ids named for each group of failures
+MAX_NAMED_DUPLICATES = 5
+
+# Characters of traceback still worth including for a group
+MIN_DETAILS_CHARS = 160
+
+INDENT = "    "
+
+
+@dataclass
+class _Frame:
+    """Lines of a traceback: one frame (key set) or text between frames."""
+    lines: List[str]
+    key: Optional[str] = None
+    library: bool = False
+
+
+def _indent_of(line: str) -> int:
+    return len(line) - len(line.lstrip())
+
+
+def _pytest_frames(lines: List[str]) -> List[_Frame]:
+    """Split a pytest failure report into frames.
+
+    Frames in the long style are separated by "_ _ _" lines and end with
+    their location; frames in the short style (as in recursion) start with
+    "file:line: in function" and share a section.
+    """
+    chunks: List[List[str]] = [[]]
+    for line in lines:
+        if PYTEST_FRAME_SEPARATOR_PATTERN.match(line):
+            chunks.append([])
+        else:
+            chunks[-1].append(line)
+    frames: List[_Frame] = []
+    for chunk in chunks:
+        locations = [(index, match) for index, match in enumerate(map(PYTEST_LOCATION_PATTERN.match, chunk))
+                     if match]
+        if not locations:
+            frames.append(_Frame(chunk))
+        elif ": in " in chunk[locations[0][0]] and not ''.join(chunk[:locations[0][0]]).strip():
+            bounds = [index for index, match in locations] + [len(chunk)]
+            for (index, match), end in zip(locations, bounds[1:]):
+                frames.append(_Frame(chunk[index:end], key=match.group(0), library=is_library_path(match.group("file"))))
+        else:
+            index, match = locations[-1]
+            frames.append(_Frame(chunk, key=match.group(0), library=is_library_path(match.group("file"))))
+    return frames
+
+
+def _line_frames(lines: List[str]) -> List[_Frame]:
+    """Split a Python traceback or a Node stack into frames."""
+    frames: List[_Frame] = []
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        python = PYTHON_FRAME_PATTERN.match(line)
+        node = NODE_FRAME_PATTERN.match(line) or NODE_FRAME_PATTERN.match("at " + line.strip())
+        if python:
+            # The frame's source and caret lines are indented below it
+            end = index + 1
+            while end < len(lines) and lines[end].strip() and _indent_of(lines[end]) > _indent_of(line):
+                end += 1
+            frames.append(_Frame(lines[index:end], key=line.strip(),
+                                 library=is_library_path(python.group("file"))))
+            index = end
+            continue
+        if node:
+            frames.append(_Frame([line], key=line.strip(), library=is_library_path(node.group("file"))))
+        elif frames and frames[-1].key is None:
+            frames[-1].lines.append(line)
+        else:
+            frames.append(_Frame([line]))
+        index += 1
+    return frames
+
+
+def _essential_lines(frame: _Frame) -> List[str]:
+    """The failing line, error lines and location of a pytest frame, without its source."""
+    lines = [line for line in frame.lines if line.startswith((">", "E ")) or line == frame.key]
+    return lines or frame.lines
+
+
+def compress_traceback(details: str) -> str:
+    """Collapse library frames and repeated frames of a traceback.
+
+    Understands Python tracebacks, pytest failure reports and Node stacks;
+    other lines are kept as they are. The innermost frame, which holds the
+    error, is always kept; in library code only its failing and error lines.
+
+    Args:
+        details: Traceback or failure report
+
+    Returns:
+        The traceback with each run of library frames replaced by a count
+        and each run of identical frames reduced to one
+    """
+    lines = details.split('\n')
+    pytest = any(PYTEST_FRAME_SEPARATOR_PATTERN.match(line) for line in lines)
+    frames = _pytest_frames(lines) if pytest else _line_frames(lines)
+    framed = [index for index, frame in enumerate(frames) if frame.key is not None]
+    innermost = framed[-1] if framed else -1
+
+    result: List[str] = []
+    index = 0
+    while index < len(frames):
+        frame = frames[index]
+        end = index + 1
+        indent = "" if pytest else " " * _indent_of(frame.lines[0])
+        if frame.key is not None and frame.library and index != innermost:
+            while (end < len(frames) and end != innermost and frames[end].key is not None
+                   and frames[end].library):
+                end += 1
+            count = end - index
+            result.append(f"{indent}... {count} library frame{'s' if count != 1 else ''} ...")
+        else:
+            result.extend(_essential_lines(frame) if pytest and frame.library else frame.lines)
+            if frame.key is not None:
+                while end < len(frames) and end != innermost and frames[end].key == frame.key:
+                    end += 1
+                if end - index > 1:
+                    result.append(f"{indent}[previous frame repeated {end - index - 1} more times]")
+        index = end
+    return '\n'.join(result).strip()
+
+
+def _group_key(failure: TestFailure) -> Tuple[str, str]:
+    """Failures with the same exception raised at the same place share a key."""
+    if failure.exception or failure.location:
+        return failure.exception, failure.location
+    # Without either there is nothing to tell the failures apart by
+    return "", failure.test_id
+
+
+def _cut_to_tail(text: str, max_chars: int) -> str:
+    """Keep the last lines of a traceback (innermost frames and the error) within max_chars."""
+    if len(text) <= max_chars:
+        return text
+    kept: List[str] = []
+    size = len(INDENT + "...\n")
+    for line in reversed(text.split('\n')):
+        if size + len(line) + 1 > max_chars:
+            break
+        kept.insert(0, line)
+        size += len(line) + 1
+    return '\n'.join([INDENT + "..."] + kept)
+
+
+def compress_failures(failures: List[TestFailure], max_tokens: int = TEST_REPORT_MAX_TOKENS) -> str:
+    """Render failures for a prompt, one representative per group, within a token budget.
+
+    Args:
+        failures: Failures of a test run
+        max_tokens: Upper bound on the tokens of the result
+
+    Returns:
+        Compressed failure report (empty if there are no failures); its
+        length is at most ``max_tokens`` times ``CHARS_PER_TOKEN``
+    """
+    if not failures:
+        return ""
+    groups: Dict[Tuple[str, str], List[TestFailure]] = {}
+    for failure in failures:
+        groups.setdefault(_group_key(failure), []).append(failure)
+
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    header = f"{len(failures)} failing test{'s' if len(failures) != 1 else ''}"
+    if len(groups) != len(failures):
+        header += f" ({len(groups)} distinct failure{'s' if len(groups) != 1 else ''})"
+    header += ":"
+
+    # Summaries come first, so failures are named even when tracebacks are cut, but take
+    # at most half of the budget to leave room for the first tracebacks
+    heads: List[str] = []
+    size = len(header)
+    for members in groups.values():
+        head = f"- {members[0].summary()}"
+        if len(members) > 1:
+            others = [member.test_id for member in members[1:MAX_NAMED_DUPLICATES + 1]]
+            more = len(members) - 1 - len(others)
+            head += (f"\n{INDENT}Same failure in {len(members) - 1} more test{'s' if len(members) > 2 else ''}: "
+                     f"{', '.join(others)}{f' and {more} more' if more else ''}")
+        if heads and size + len(head) + 1 > max_chars // 2:
+            break
+        heads.append(head)
+        size += len(head) + 1
+    unlisted = len(groups) - len(heads)
+    note = f"... and {unlisted} more distinct failure{'s' if unlisted != 1 else ''}" if unlisted else ""
+    size += len(note) + 1
+
+    sections = []
+    for head, members in zip(heads, groups.values()):
+        details = compress_traceback(members[0].details) if members[0].details else ""
+        available = max_chars - size - 1
+        if details and available >= MIN_DETAILS_CHARS:
+            indented = '\n'.join(INDENT + line for line in details.split('\n'))
+            details = _cut_to_tail(indented, available)
+            size += len(details) + 1
+            sections.append(f"{head}\n{details}")
+        else:
+            sections.append(head)
+    if note:
+        sections.append(note)
+    return '\n'.join([header] + sections)[:max_chars]
@@ -1,8 +1,71 @@
 """Usage tracking for time and cost monitoring."""
 
 import time
-from typing import Dict, List
-from dataclasses import dataclass, field
+import threading
+from typing import Dict, List, Optional
+from dataclasses import asdict, dataclass, field
+
+
+# OpenRouter pricing in USD per token (approximation)
+# - google/gemini-2.5-flash: $0.30/1M input, $2.50/1M output, $0.075/1M cached input
+# - google/gemini-2.0-flash-001: $0.10/1M input, $0.40/1M output
+# - google/gemini-2.0-pro-exp: $0.00/1M (Free tier / Low)
+# - openai/gpt-4o-mini: $0.15/1M input, $0.60/1M output, $0.075/1M cached input
+# - meta-llama/llama-3.1-405b: $2.00/1M input, $2.00/1M output
+MODEL_PRICING = {
+    "google/gemini-2.5-flash": {
+        "input": 0.30 / 1_000_000,
+        "output": 2.50 / 1_000_000,
+        "cached_input": 0.075 / 1_000_000
+    },
+    "google/gemini-2.0-flash-001": {
+        "input": 0.10 / 1_000_000,
+        "output": 0.40 / 1_000_000
+    },
+    "google/gemini-2.0-pro-exp": {
+        "input": 0.00 / 1_000_000,
+        "output": 0.00 / 1_000_000
+    },
+    "openai/gpt-4o-mini": {
+        "input": 0.15 / 1_000_000,
+        "output": 0.60 / 1_000_000,
+        "cached_input": 0.075 / 1_000_000
+    },
+    "meta-llama/llama-3.1-405b": {
+        "input": 2.00 / 1_000_000,
+        "output": 2.00 / 1_000_000
+    }
+}
+DEFAULT_PRICING_MODEL = "google/gemini-2.0-flash-001"
+
+
+def get_model_pricing(model: str) -> Optional[Dict[str, float]]:
+    """Look up per-token pricing for a model.
+    
+    Served model names may carry suffixes (e.g. dated versions), so the
+    longest known model ID that prefixes the name is used.
+    
+    Args:
+        model: Model name
+        
+    Returns:
+        Pricing dictionary, or None if the model is unknown
+    """
+    model_key = (model or "").lower()
+    if model_key in MODEL_PRICING:
+        return MODEL_PRICING[model_key]
+    matches = [known for known in MODEL_PRICING if model_key.startswith(known)]
+    if matches:
+        return MODEL_PRICING[max(matches, key=len)]
+    return None
+
+
+@dataclass
+class TokenUsage:
+    """Token counts reported by the provider for one call."""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
 
 
 @dataclass
@@ -14,6 +77,33 @@ class APIUsage:
     input_tokens: int = 0
     output_tokens: int = 0
     model: str = ""
+    time_to_first_token: float = 0.0
+    cached_input_tokens: int = 0
+    latency: float = 0.0
+    finish_reason: str = ""
+    # "api" for billed calls, "cache" / "merged" for responses that cost nothing
+    source: str = "api"
+    # True when tokens were estimated from text rather than reported by the provider
+    estimated: bool = False
+    cost: float = 0.0
+    
+    def calculate_cost(self, default_model: str = DEFAULT_PRICING_MODEL) -> float:
+        """Price this call with its own model.
+        
+        Args:
+            default_model: Model whose pricing is used if this call's model is unknown
+            
+        Returns:
+            Cost in USD
+        """
+        pricing = (get_model_pricing(self.model) or get_model_pricing(default_model)
+                   or MODEL_PRICING[DEFAULT_PRICING_MODEL])
+        cached = min(self.cached_input_tokens, self.input_tokens)
+        cached_price = pricing.get("cached_input", pricing["input"])
+        self.cost = ((self.input_tokens - cached) * pricing["input"]
+                     + cached * cached_price
+                     + self.output_tokens * pricing["output"])
+        return self.cost
 
 
 @dataclass
@@ -26,6 +116,13 @@ class UsageSummary:
     total_input_tokens: int = 0
     total_output_tokens: int = 0
     estimated_cost: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    merged_calls: int = 0
+    test_cache_hits: int = 0
+    test_cache_misses: int = 0
+    total_cached_input_tokens: int = 0
+    hedging: Dict[str, Dict[str, int]] = field(default_factory=dict)
     
     def calculate_duration(self):
         """Calculate total duration."""
@@ -36,45 +133,17 @@ class UsageSummary:
         """Calculate total tokens."""
         self.total_input_tokens = sum(call.input_tokens for call in self.api_calls)
         self.total_output_tokens = sum(call.output_tokens for call in self.api_calls)
+        self.total_cached_input_tokens = sum(call.cached_input_tokens for call in self.api_calls)
     
-    def calculate_cost(self, model: str = "google/gemini-2.0-flash-001"):
+    def calculate_cost(self, model: str = DEFAULT_PRICING_MODEL):
         """Calculate estimated cost based on OpenRouter model pricing.
         
-        Pricing (approximation):
-        - google/gemini-2.0-flash-001: $0.10/1M input, $0.40/1M output
-        - google/gemini-2.0-pro-exp: $0.00/1M (Free tier / Low)
-        - openai/gpt-4o-mini: $0.15/1M input, $0.60/1M output
-        - meta-llama/llama-3.1-405b: $2.00/1M input, $2.00/1M output
-        """
-        pricing = {
-            "google/gemini-2.0-flash-001": {
-                "input": 0.10 / 1_000_000,
-                "output": 0.40 / 1_000_000
-            },
-            "google/gemini-2.0-pro-exp": {
-                "input": 0.00 / 1_000_000,
-                "output": 0.00 / 1_000_000
-            },
-            "openai/gpt-4o-mini": {
-                "input": 0.15 / 1_000_000,
-                "output": 0.60 / 1_000_000
-            },
-            "meta-llama/llama-3.1-405b": {
-                "input": 2.00 / 1_000_000,
-                "output": 2.00 / 1_000_000
-            }
-        }
+        Each call is priced with the model that served it (see MODEL_PRICING).
         
-        # Handle model name variations or fallback
-        model_key = model.lower()
-        if model_key not in pricing:
-            # Default to gemini-flash pricing if unknown
-            model_key = "google/gemini-2.0-flash-001"
-            
-        model_pricing = pricing.get(model_key, pricing["google/gemini-2.0-flash-001"])
-        input_cost = self.total_input_tokens * model_pricing["input"]
-        output_cost = self.total_output_tokens * model_pricing["output"]
-        self.estimated_cost = input_cost + output_cost
+        Args:
+            model: Model whose pricing is used for calls to unknown models
+        """
+        self.estimated_cost = sum(call.calculate_cost(model) for call in self.api_calls)
 
 
 class UsageTracker:
@@ -82,9 +151,39 @@ class UsageTracker:
     
     def __init__(self):
         self.summary = UsageSummary(start_time=time.time())
+        # Agents of one project may run concurrently (sharded review, parallel fixes)
+        self._lock = threading.RLock()
+    
+    def to_dict(self) -> Dict:
+        """Serialise the recorded calls and counters.
+        
+        Returns:
+            JSON-compatible dictionary of the usage summary
+        """
+        with self._lock:
+            return asdict(self.summary)
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "UsageTracker":
+        """Rebuild a tracker serialised with to_dict, to continue recording into it.
+        
+        Args:
+            data: Dictionary returned by to_dict
+            
+        Returns:
+            UsageTracker holding the same calls and counters
+        """
+        tracker = cls()
+        values = dict(data)
+        values["api_calls"] = [APIUsage(**call) for call in values.get("api_calls", [])]
+        tracker.summary = UsageSummary(**values)
+        return tracker
     
     def record_api_call(self, agent_name: str, phase: str, model: str = "gemini-pro",
-                       input_tokens: int = 0, output_tokens: int = 0):
+                       input_tokens: int = 0, output_tokens: int = 0,
+                       time_to_first_token: float = 0.0, cached_input_tokens: int = 0,
+                       latency: float = 0.0, finish_reason: str = "",
+                       source: str = "api", estimated: bool = False):
         """Record an API call.
         
         Args:
@@ -93,6 +192,12 @@ class UsageTracker:
             model: Model name used
             input_tokens: Number of input tokens (0 if unknown)
             output_tokens: Number of output tokens (0 if unknown)
+            time_to_first_token: Seconds until the first streamed token (0 if not streamed)
+            cached_input_tokens: Input tokens served from the provider's prompt cache
+            latency: Request latency in seconds
+            finish_reason: Why generation stopped (e.g. "stop", "length")
+            source: "api", or "cache"/"merged" for responses that were not billed
+            estimated: True if token counts are estimates rather than provider-reported
         """
         usage = APIUsage(
             agent_name=agent_name,
@@ -100,9 +205,108 @@ class UsageTracker:
             timestamp=time.time(),
             input_tokens=input_tokens,
             output_tokens=output_tokens,
-            model=model
+            model=model,
+            time_to_first_token=time_to_first_token,
+            cached_input_tokens=cached_input_tokens,
+            latency=latency,
+            finish_reason=finish_reason,
+            source=source,
+            estimated=estimated
         )
-        self.summary.api_calls.append(usage)
+        with self._lock:
+            self.summary.api_calls.append(usage)
+    
+    def record_response(self, agent_name: str, phase: str, response, input_text: str = "",
+                        agent_model: str = ""):
+        """Record a call from the response returned by an agent.
+        
+        Uses the provider-reported token usage, served model, latency and
+        finish reason when the response carries them, and falls back to
+        estimating tokens from text otherwise (e.g. for error messages).
+        Responses served from the response cache or merged with an identical
+        in-flight request are recorded with zero billed tokens.
+        
+        Args:
+            agent_name: Name of the agent
+            phase: Phase name
+            response: Response returned by the agent (LLMResponse or str)
+            input_text: Prompt text, used only when usage is not reported
+            agent_model: Configured model of the agent
+        """
+        cached = getattr(response, 'cached', None)
+        if cached is not None:
+            self.record_cache_lookup(cached)
+        deduplicated = getattr(response, 'deduplicated', False)
+        if deduplicated:
+            self.record_merged_call()
+        hedged = getattr(response, 'hedged', None)
+        if hedged is not None:
+            self.record_hedge(agent_model, hedged, getattr(response, 'hedge_won', False))
+        
+        model = getattr(response, 'model', "") or agent_model
+        timing = dict(
+            time_to_first_token=getattr(response, 'time_to_first_token', 0.0),
+            latency=getattr(response, 'latency', 0.0),
+            finish_reason=getattr(response, 'finish_reason', "")
+        )
+        usage = getattr(response, 'usage', None)
+        
+        if cached or deduplicated:
+            self.record_api_call(agent_name, phase, model, 0, 0,
+                                 source="cache" if cached else "merged", **timing)
+        elif usage is not None:
+            self.record_api_call(agent_name, phase, model, usage.prompt_tokens, usage.completion_tokens,
+                                 cached_input_tokens=usage.cached_tokens, **timing)
+        else:
+            self.record_api_call(agent_name, phase, model,
+                                 self.estimate_tokens_from_text(input_text),
+                                 self.estimate_tokens_from_text(str(response)),
+                                 estimated=True, **timing)
+    
+    def record_cache_lookup(self, hit: bool):
+        """Record a response cache lookup.
+        
+        Args:
+            hit: True if the response was served from the cache
+        """
+        with self._lock:
+            if hit:
+                self.summary.cache_hits += 1
+            else:
+                self.summary.cache_misses += 1
+    
+    def record_test_cache_lookup(self, hit: bool):
+        """Record a test result cache lookup.
+        
+        Args:
+            hit: True if the test run was skipped because the files were already tested
+        """
+        with self._lock:
+            if hit:
+                self.summary.test_cache_hits += 1
+            else:
+                self.summary.test_cache_misses += 1
+    
+    def record_merged_call(self):
+        """Record a call that shared the result of an identical in-flight request."""
+        with self._lock:
+            self.summary.merged_calls += 1
+    
+    def record_hedge(self, model: str, hedged: bool, backup_won: bool = False):
+        """Record the hedging outcome of a call to a model with a backup configured.
+        
+        Args:
+            model: Primary model of the agent
+            hedged: True if the request was also sent to the backup model
+            backup_won: True if the backup model answered first
+        """
+        with self._lock:
+            stats = self.summary.hedging.setdefault(model, {"calls": 0, "hedged": 0, "backup_wins": 0})
+            stats["calls"] += 1
+            if hedged:
+                stats["hedged"] += 1
+            if backup_won:
+                stats["backup_wins"] += 1
     
     def estimate_tokens_from_text(self, text: str) -> int:
         """Estimate token count from text (rough approximation: ~4 chars per token).
@@ -119,7 +323,8 @@ class UsageTracker:
         return len(text) // 4
     
     def record_api_call_with_text(self, agent_name: str, phase: str, model: str,
-                                  input_text: str = "", output_text: str = ""):
+                                  input_text: str = "", output_text: str = "",
+                                  time_to_first_token: float = 0.0):
         """Record an API call by estimating tokens from text.
         
         Args:
@@ -128,16 +333,18 @@ class UsageTracker:
             model: Model name
             input_text: Input text (for token estimation)
             output_text: Output text (for token estimation)
+            time_to_first_token: Seconds until the first streamed token (0 if not streamed)
         """
         input_tokens = self.estimate_tokens_from_text(input_text)
         output_tokens = self.estimate_tokens_from_text(output_text)
-        self.record_api_call(agent_name, phase, model, input_tokens, output_tokens)
+        self.record_api_call(agent_name, phase, model, input_tokens, output_tokens,
+                             time_to_first_token, estimated=True)
     
     def finish(self, model: str = "gemini-pro"):
         """Finish tracking and calculate totals.
         
         Args:
-            model: Model name for cost calculation
+            model: Model name used to price calls whose own model has no known pricing
         """
         self.summary.end_time = time.time()
         self.summary.calculate_duration()
@@ -158,6 +365,16 @@ class UsageTracker:
             "total_output_tokens": self.summary.total_output_tokens,
             "total_tokens": self.summary.total_input_tokens + self.summary.total_output_tokens,
             "estimated_cost_usd": round(self.summary.estimated_cost, 4),
+            "cache_hits": self.summary.cache_hits,
+            "cache_misses": self.summary.cache_misses,
+            "merged_calls": self.summary.merged_calls,
+            "test_cache_hits": self.summary.test_cache_hits,
+            "test_cache_misses": self.summary.test_cache_misses,
+            "total_cached_input_tokens": self.summary.total_cached_input_tokens,
+            "estimated_token_calls": sum(1 for call in self.summary.api_calls if call.estimated),
+            "truncated_calls": sum(1 for call in self.summary.api_calls if call.finish_reason == "length"),
+            "calls_by_model": self._group_by_model(),
+            "hedging": self.summary.hedging,
             "calls_by_phase": self._group_by_phase(),
             "calls_by_agent": self._group_by_agent()
         }
@@ -187,16 +404,32 @@ class UsageTracker:
             Dictionary with phase statistics
         """
         phases = {}
+        first_token_times = {}
+        latencies = {}
         for call in self.summary.api_calls:
             if call.phase not in phases:
                 phases[call.phase] = {
                     "calls": 0,
                     "input_tokens": 0,
-                    "output_tokens": 0
+                    "output_tokens": 0,
+                    "cost_usd": 0.0,
+                    "avg_latency": 0.0,
+                    "avg_time_to_first_token": 0.0
                 }
             phases[call.phase]["calls"] += 1
             phases[call.phase]["input_tokens"] += call.input_tokens
             phases[call.phase]["output_tokens"] += call.output_tokens
+            phases[call.phase]["cost_usd"] += call.cost
+            if call.latency > 0:
+                latencies.setdefault(call.phase, []).append(call.latency)
+            if call.time_to_first_token > 0:
+                first_token_times.setdefault(call.phase, []).append(call.time_to_first_token)
+        for phase, times in latencies.items():
+            phases[phase]["avg_latency"] = round(sum(times) / len(times), 2)
+        for phase, times in first_token_times.items():
+            phases[phase]["avg_time_to_first_token"] = round(sum(times) / len(times), 2)
+        for stats in phases.values():
+            stats["cost_usd"] = round(stats["cost_usd"], 4)
         return phases
     
     def _group_by_agent(self) -> Dict:
@@ -218,6 +451,29 @@ class UsageTracker:
             agents[call.agent_name]["output_tokens"] += call.output_tokens
         return agents
     
+    def _group_by_model(self) -> Dict:
+        """Group API calls by the model that served them.
+        
+        Returns:
+            Dictionary with model statistics
+        """
+        models = {}
+        for call in self.summary.api_calls:
+            if call.model not in models:
+                models[call.model] = {
+                    "calls": 0,
+                    "input_tokens": 0,
+                    "output_tokens": 0,
+                    "cost_usd": 0.0
+                }
+            models[call.model]["calls"] += 1
+            models[call.model]["input_tokens"] += call.input_tokens
+            models[call.model]["output_tokens"] += call.output_tokens
+            models[call.model]["cost_usd"] += call.cost
+        for stats in models.values():
+            stats["cost_usd"] = round(stats["cost_usd"], 4)
+        return models
+    
     def print_summary(self):
         """Print formatted summary."""
         summary = self.get_summary()
@@ -229,16 +485,46 @@ class UsageTracker:
         print(f"Total Tokens: {summary['total_tokens']:,}")
         print(f"   - Input:  {summary['total_input_tokens']:,}")
         print(f"   - Output: {summary['total_output_tokens']:,}")
+        if summary['total_cached_input_tokens']:
+            print(f"   - Cached Input (provider prompt cache): {summary['total_cached_input_tokens']:,}")
+        if summary['estimated_token_calls']:
+            print(f"   ({summary['estimated_token_calls']} call(s) without reported usage were estimated from text)")
         print(f"Estimated Cost: ${summary['estimated_cost_usd']:.4f} USD")
+        if summary['truncated_calls']:
+            print(f"Truncated Responses (hit max_tokens): {summary['truncated_calls']}")
+        lookups = summary['cache_hits'] + summary['cache_misses']
+        if lookups:
+            hit_rate = summary['cache_hits'] / lookups * 100
+            print(f"Response Cache: {summary['cache_hits']} hits / {summary['cache_misses']} misses ({hit_rate:.0f}% hit rate)")
+        if summary['merged_calls']:
+            print(f"Merged In-Flight Calls: {summary['merged_calls']}")
+        if summary['test_cache_hits'] + summary['test_cache_misses']:
+            print(f"Test Result Cache: {summary['test_cache_hits']} hits / {summary['test_cache_misses']} misses")
+        if summary['hedging']:
+            print("\nHedged Requests:")
+            for model, stats in summary['hedging'].items():
+                hedge_rate = stats['hedged'] / stats['calls'] * 100
+                print(f"   {model}: {stats['hedged']}/{stats['calls']} hedged ({hedge_rate:.0f}%), backup won {stats['backup_wins']}")
         print("\nBreakdown by Phase:")
         for phase, stats in summary['calls_by_phase'].items():
             print(f"   {phase}:")
             print(f"      Calls: {stats['calls']}")
             print(f"      Tokens: {stats['input_tokens'] + stats['output_tokens']:,}")
+            print(f"      Cost: ${stats['cost_usd']:.4f}")
+            if stats['avg_latency']:
+                print(f"      Avg Latency: {stats['avg_latency']}s")
+            if stats['avg_time_to_first_token']:
+                print(f"      Avg Time to First Token: {stats['avg_time_to_first_token']}s")
         print("\nBreakdown by Agent:")
         for agent, stats in summary['calls_by_agent'].items():
             print(f"   {agent}:")
             print(f"      Calls: {stats['calls']}")
             print(f"      Tokens: {stats['input_tokens'] + stats['output_tokens']:,}")
+        print("\nBreakdown by Model:")
+        for model, stats in summary['calls_by_model'].items():
+            print(f"   {model}:")
+            print(f"      Calls: {stats['calls']}")
+            print(f"      Tokens: {stats['input_tokens'] + stats['output_tokens']:,}")
+            print(f"      Cost: ${stats['cost_usd']:.4f}")
         print("=" * 60)
 
@@ -0,0 +1,337 @@
+"""Multi-process workers pulling projects from the local job queue.
+
+Usage:
+    python -m src.worker enqueue tasks.jsonl [--model ...]
+    python -m src.worker enqueue --task "A todo app" --name todo
+    python -m src.worker run --workers 4 [--exit-when-empty]
+    python -m src.worker status
+    python -m src.worker show 12
+    python -m src.worker retry 12
+
+Jobs are leased with heartbeats: if a worker process crashes, its lease
+runs out and the job is picked up again by another worker.
+"""
+
+import argparse
+import contextlib
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+from config.agent_configs import (
+    DEFAULT_MODEL,
+    FIX_MODE,
+    FIX_MODES,
+    REVIEW_MODE,
+    REVIEW_MODES,
+    TESTER_MODE,
+    TESTER_MODES,
+    JOB_QUEUE_PATH,
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+)
+from src.tools.job_queue import JobQueue, Job, QUEUED, RUNNING
+
+
+def _heartbeat(queue: JobQueue, job: Job, worker_id: str, lease_seconds: float,
+               stop: threading.Event, lost: threading.Event) -> None:
+    """Keep the lease of a running job alive until ``stop`` is set.
+
+    If the lease is lost, another worker may already have the job, so
+    ``lost`` is set to stop this run before it writes to the project again.
+    """
+    while not stop.wait(lease_seconds / 3):
+        if not queue.heartbeat(job.id, worker_id, lease_seconds):
+            print(f"[{worker_id}] Lost the lease of job {job.id}; stopping it", file=sys.__stderr__)
+            lost.set()
+            return
+
+
+def process_job(queue: JobQueue, job: Job, worker_id: str, lease_seconds: float, log_dir: str) -> None:
+    """Build the project of a leased job and record the outcome.
+
+    The chain's console output goes to a per-job log file. A job requeued
+    after its worker died resumes from the project's checkpoint.
+
+    Args:
+        queue: Job queue
+        job: Leased job
+        worker_id: ID of this worker
+        lease_seconds: Lease duration renewed by heartbeats
+        log_dir: Directory for job logs
+    """
+    from src.batch import run_project
+    from src.chain.development_chain import create_development_chain
+
+    params = job.params
+
+    def chain_factory():
+        return create_development_chain(
+            model_name=params.get("model"),
+            max_review_iterations=params.get("max_review_iterations", 3),
+            max_test_iterations=params.get("max_test_iterations", 3),
+            fix_mode=params.get("fix_mode", FIX_MODE),
+            review_mode=params.get("review_mode", REVIEW_MODE),
+            tester_mode=params.get("tester_mode", TESTER_MODE)
+        )
+
+    os.makedirs(log_dir, exist_ok=True)
+    log_path = os.path.join(log_dir, f"job-{job.id}-{job.name}.log")
+    stop = threading.Event()
+    lost = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(queue, job, worker_id, lease_seconds, stop, lost),
+                                 daemon=True)
+    heartbeat.start()
+    try:
+        with open(log_path, "a", encoding="utf-8") as log, \
+                contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            print(f"=== Job {job.id} attempt {job.attempts} on {worker_id} at {datetime.now().isoformat()}")
+            try:
+                result = run_project(
+                    {"task": job.task, "name": job.name, "output_dir": params.get("output_dir")},
+                    params.get("output_root", "./output"),
+                    chain_factory,
+                    params.get("model") or os.getenv("OPENROUTER_MODEL", DEFAULT_MODEL),
+                    cancelled=lost,
+                )
+            except Exception as e:
+                traceback.print_exc()
+                result = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+        result["log"] = log_path
+    finally:
+        stop.set()
+        heartbeat.join()
+
+    if result["status"] == "ok":
+        recorded = queue.complete(job.id, worker_id, result)
+    else:
+        recorded = queue.fail(job.id, worker_id, result["error"], result)
+    outcome = result["status"] if recorded else "discarded (lease lost)"
+    print(f"[{worker_id}] Job {job.id} ({job.name}): {outcome}")
+
+
+def worker_loop(index: int, queue_path: str, lease_seconds: float, poll_seconds: float,
+                log_dir: str, exit_when_empty: bool) -> None:
+    """Lease and run jobs until the queue is drained (or forever).
+
+    Args:
+        index: Worker number, used in the worker ID
+        queue_path: SQLite queue file
+        lease_seconds: Lease duration renewed by heartbeats
+        poll_seconds: Sleep between polls of an empty queue
+        log_dir: Directory for job logs
+        exit_when_empty: Stop once no job is queued or running
+    """
+    load_dotenv()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{index}"
+    queue = JobQueue(queue_path)
+    print(f"[{worker_id}] Started")
+    while True:
+        job = queue.lease(worker_id, lease_seconds)
+        if job is None:
+            counts = queue.counts()
+            if exit_when_empty and counts[QUEUED] == 0 and counts[RUNNING] == 0:
+                break
+            time.sleep(poll_seconds)
+            continue
+        print(f"[{worker_id}] Job {job.id} ({job.name}), attempt {job.attempts}/{job.max_attempts}")
+        process_job(queue, job, worker_id, lease_seconds, log_dir)
+    queue.close()
+    print(f"[{worker_id}] Queue drained, exiting")
+
+
+def run_workers(args) -> int:
+    """Start and supervise the worker processes.
+
+    Workers that die unexpectedly are restarted; their job is requeued
+    once its lease expires.
+    """
+    if not os.getenv("OPENROUTER_API_KEY"):
+        print("Error: OPENROUTER_API_KEY environment variable not set")
+        return 1
+
+    log_dir = args.log_dir or os.path.join(os.path.dirname(args.queue) or ".", "job_logs")
+    worker_args = (args.queue, args.lease, args.poll, log_dir, args.exit_when_empty)
+
+    def start(index):
+        process = multiprocessing.Process(target=worker_loop, args=(index,) + worker_args,
+                                          name=f"worker-{index}")
+        process.start()
+        return process
+
+    print(f"Starting {args.workers} workers on {args.queue} (logs in {log_dir})")
+    processes = {index: start(index) for index in range(args.workers)}
+    try:
+        while processes:
+            time.sleep(1)
+            for index, process in list(processes.items()):
+                if process.is_alive():
+                    continue
+                process.join()
+                if process.exitcode == 0:
+                    del processes[index]
+                else:
+                    print(f"Worker {index} exited with code {process.exitcode}; restarting")
+                    processes[index] = start(index)
+    except KeyboardInterrupt:
+        print("Stopping workers; their running jobs will be requeued when the leases expire")
+        for process in processes.values():
+            process.terminate()
+        for process in processes.values():
+            process.join()
+    return 0
+
+
+def enqueue_jobs(args) -> int:
+    """Add jobs from a JSONL/CSV file or from --task/--name."""
+    from src.batch import load_tasks
+
+    if args.tasks:
+        rows = load_tasks(args.tasks)
+    elif args.task and args.name:
+        rows = [{"task": args.task, "name": args.name}]
+    else:
+        print("Error: give a tasks file or both --task and --name")
+        return 1
+
+    queue = JobQueue(args.queue)
+    for row in rows:
+        params = {
+            "model": args.model,
+            "max_review_iterations": args.max_review_iterations,
+            "max_test_iterations": args.max_test_iterations,
+            "fix_mode": args.fix_mode,
+            "review_mode": args.review_mode,
+            "tester_mode": args.tester_mode,
+            "output_root": args.output_dir,
+            "output_dir": row.get("output_dir"),
+        }
+        job_id = queue.enqueue(row["task"], row["name"], params, max_attempts=args.max_attempts)
+        print(f"Enqueued job {job_id}: {row['name']}")
+    return 0
+
+
+def _format_time(timestamp) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S") if timestamp else "-"
+
+
+def show_status(args) -> int:
+    """Print job counts and the job list."""
+    queue = JobQueue(args.queue)
+    counts = queue.counts()
+    print("  ".join(f"{status}: {count}" for status, count in counts.items()))
+    jobs = queue.jobs(status=args.status, limit=args.limit)
+    if jobs:
+        print(f"{'id':>5}  {'status':<8} {'tries':>5}  {'started':<19}  {'duration':>8}  name")
+    for job in jobs:
+        duration = ""
+        if job.started_at and job.finished_at:
+            duration = f"{job.finished_at - job.started_at:.0f}s"
+        print(f"{job.id:>5}  {job.status:<8} {job.attempts:>2}/{job.max_attempts:<2}  "
+              f"{_format_time(job.started_at):<19}  {duration:>8}  {job.name}")
+    return 0
+
+
+def show_job(args) -> int:
+    """Print the details of one job."""
+    job = JobQueue(args.queue).get(args.job_id)
+    if job is None:
+        print(f"Job {args.job_id} not found")
+        return 1
+    print(f"Job {job.id}: {job.name} [{job.status}]")
+    print(f"Task: {job.task}")
+    print(f"Attempts: {job.attempts}/{job.max_attempts}  Worker: {job.worker or '-'}")
+    print(f"Created: {_format_time(job.created_at)}  Started: {_format_time(job.started_at)}  "
+          f"Finished: {_format_time(job.finished_at)}")
+    print(f"Params: {job.params}")
+    if job.error:
+        print(f"Error: {job.error}")
+    if job.result:
+        for key, value in job.result.items():
+            print(f"  {key}: {value}")
+    return 0
+
+
+def retry_job(args) -> int:
+    """Requeue a finished or failed job."""
+    if JobQueue(args.queue).retry(args.job_id):
+        print(f"Job {args.job_id} requeued")
+        return 0
+    print(f"Job {args.job_id} not found or still running")
+    return 1
+
+
+def parse_arguments():
+    """Parse command-line arguments.
+
+    Returns:
+        Parsed arguments namespace
+    """
+    parser = argparse.ArgumentParser(description="Local job queue and worker pool for building projects")
+    parser.add_argument("--queue", type=str, default=JOB_QUEUE_PATH,
+                        help=f"SQLite queue file (default: {JOB_QUEUE_PATH}, or JOB_QUEUE_PATH)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Start worker processes")
+    run.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                     help="Number of worker processes (default: CPU count)")
+    run.add_argument("--lease", type=float, default=JOB_LEASE_SECONDS,
+                     help="Lease duration in seconds, renewed by heartbeats")
+    run.add_argument("--poll", type=float, default=2.0, help="Seconds between polls of an empty queue")
+    run.add_argument("--log-dir", type=str, default=None, help="Job log directory (default: next to the queue)")
+    run.add_argument("--exit-when-empty", action="store_true", help="Stop once the queue is drained")
+    run.set_defaults(func=run_workers)
+
+    enqueue = commands.add_parser("enqueue", help="Add jobs to the queue")
+    enqueue.add_argument("tasks", nargs="?", help="JSONL or CSV file of {task, name} rows")
+    enqueue.add_argument("--task", type=str, help="Task description of a single job")
+    enqueue.add_argument("--name", type=str, help="Project name of a single job")
+    enqueue.add_argument("--output-dir", type=str, default="./output", help="Root output directory")
+    enqueue.add_argument("--model", type=str, default=None, help="OpenRouter model override for every role")
+    enqueue.add_argument("--max-review-iterations", type=int, default=3, help="Maximum code review iterations")
+    enqueue.add_argument("--max-test-iterations", type=int, default=3, help="Maximum test iterations")
+    enqueue.add_argument("--fix-mode", choices=FIX_MODES, default=FIX_MODE, help="Full-file or patch fixes")
+    enqueue.add_argument("--review-mode", choices=REVIEW_MODES, default=REVIEW_MODE,
+                         help="Single or sharded parallel code review")
+    enqueue.add_argument("--tester-mode", choices=TESTER_MODES, default=TESTER_MODE,
+                         help="Call the Tester only on failing test runs, or always")
+    enqueue.add_argument("--max-attempts", type=int, default=JOB_MAX_ATTEMPTS,
+                         help="Leases allowed before a job whose worker keeps dying is failed")
+    enqueue.set_defaults(func=enqueue_jobs)
+
+    status = commands.add_parser("status", help="Show job counts and list jobs")
+    status.add_argument("--status", choices=["queued", "running", "done", "failed"], help="Filter by status")
+    status.add_argument("--limit", type=int, default=None, help="Maximum number of jobs listed")
+    status.set_defaults(func=show_status)
+
+    show = commands.add_parser("show", help="Show one job with its result")
+    show.add_argument("job_id", type=int)
+    show.set_defaults(func=show_job)
+
+    retry = commands.add_parser("retry", help="Requeue a finished or failed job")
+    retry.add_argument("job_id", type=int)
+    retry.set_defaults(func=retry_job)
+
+    return parser.parse_args()
+
+
+def main():
+    """Worker CLI entry point."""
+    load_dotenv()
+    args = parse_arguments()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,7 +9,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.state import DevelopmentState
-from src.tools.code_manager import extract_code_blocks, format_code_for_prompt
+from src.tools.code_manager import extract_code_blocks, format_code_for_prompt, CodeBlockExtractor
 from src.tools.file_manager import create_project_directory, write_files
 
 
@@ -46,6 +46,35 @@ class TestBasicFlow(unittest.TestCase):
         self.assertIn("main.py", codes)
         self.assertIn("print", codes["main.py"])
     
+    def test_incremental_code_extraction(self):
+        """Test that streamed chunks yield each file once its fence closes."""
+        text = "main.py\n```python\nprint('a')\n```\nutil.py\n```python\nx = 1\n```\n"
+        extractor = CodeBlockExtractor()
+        completed = []
+        for i in range(0, len(text), 5):
+            completed.extend(extractor.feed(text[i:i + 5]))
+            if i < text.index("util.py"):
+                self.assertNotIn("util.py", dict(completed))
+        completed.extend(extractor.close())
+        self.assertEqual([name for name, _ in completed], ["main.py", "util.py"])
+        self.assertEqual(extractor.codes, extract_code_blocks(text))
+    
+    def test_nested_and_longer_fences(self):
+        """Test that fenced examples inside markdown files do not end the file."""
+        readme = "# App\n```bash\npip install app\n```\nDone."
+        text = (f"README.md\n```markdown\n{readme}\n```\n"
+                f"docs.md\n````\n```python\nprint(1)\n```\n````\n"
+                "main.py\n```python\nprint('ok')\n```\n")
+        codes = extract_code_blocks(text)
+        self.assertEqual(codes["README.md"], readme)
+        self.assertEqual(codes["docs.md"], "```python\nprint(1)\n```")
+        self.assertEqual(codes["main.py"], "print('ok')")
+    
+    def test_unnamed_code_blocks(self):
+        """Test the fallback naming of blocks without filename lines."""
+        codes = extract_code_blocks("Here you go:\n```python\nprint(1)\n```\nand\n```\nx = 2\n```\n")
+        self.assertEqual(codes, {"file_1.py": "print(1)", "file_2.py": "x = 2"})
+    
     def test_code_formatting(self):
         """Test code formatting for prompts."""
         codes = {
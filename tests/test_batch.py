@@ -0,0 +1,107 @@
+"""Tests for the concurrent batch runner."""
+
+import io
+import os
+import sys
+import time
+import json
+import asyncio
+import contextlib
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.batch import load_tasks, parse_arguments, run_batch, run_project
+from src.state import DevelopmentState
+from src.tools.checkpoint import checkpoint_path, save_checkpoint
+
+
+class FakeChain:
+    """Development chain stand-in that records usage without calling an LLM."""
+    
+    def run(self, input_text, state=None):
+        time.sleep(0.2)
+        if "fail" in input_text:
+            raise RuntimeError("boom")
+        state.codes = {"main.py": f"print({input_text!r})"}
+        state.usage_tracker.record_api_call("Programmer", "Coding", "openai/gpt-4o-mini", 1000, 500)
+        return "done"
+
+
+class TestBatch(unittest.TestCase):
+    """Test task loading and concurrent execution."""
+    
+    def test_load_jsonl_and_csv(self):
+        """Test both input formats and validation of names."""
+        with tempfile.TemporaryDirectory() as tmp:
+            jsonl = os.path.join(tmp, "tasks.jsonl")
+            with open(jsonl, "w") as f:
+                f.write(json.dumps({"task": "a calculator", "name": "calc"}) + "\n\n")
+                f.write(json.dumps({"task": "a todo app", "name": "todo"}) + "\n")
+            self.assertEqual([row["name"] for row in load_tasks(jsonl)], ["calc", "todo"])
+            
+            csv_path = os.path.join(tmp, "tasks.csv")
+            with open(csv_path, "w") as f:
+                f.write("task,name\n\"a game, with levels\",game\nsnake,game\n")
+            with self.assertRaises(ValueError):
+                load_tasks(csv_path)
+    
+    def test_concurrency_must_be_positive(self):
+        """Test that a concurrency below 1 is rejected before any project starts."""
+        self.assertEqual(parse_arguments(["tasks.jsonl", "--concurrency", "2"]).concurrency, 2)
+        for value in ("0", "-1", "two"):
+            with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+                parse_arguments(["tasks.jsonl", "--concurrency", value])
+    
+    def test_projects_run_concurrently_with_isolated_usage(self):
+        """Test that projects overlap in time and keep separate usage."""
+        rows = [{"task": f"project {i}", "name": f"p{i}"} for i in range(4)]
+        rows.append({"task": "fail please", "name": "broken"})
+        with tempfile.TemporaryDirectory() as tmp:
+            summary = asyncio.run(run_batch(rows, concurrency=5, output_root=tmp, chain_factory=FakeChain))
+        
+        self.assertLess(summary["wall_time_seconds"], 0.8)
+        self.assertEqual((summary["succeeded"], summary["failed"]), (4, 1))
+        ok = [result for result in summary["results"] if result["status"] == "ok"]
+        self.assertTrue(all(result["api_calls"] == 1 and result["total_tokens"] == 1500 for result in ok))
+        self.assertAlmostEqual(summary["total_cost_usd"], round(4 * (1000 * 0.15 + 500 * 0.60) / 1e6, 4))
+        self.assertIn("RuntimeError", summary["results"][-1]["error"])
+        self.assertGreater(summary["run_time_p95_seconds"], 0)
+
+    
+    def test_interrupted_project_resumes_from_checkpoint(self):
+        """Test that a rerun (e.g. a requeued job) continues from the project's checkpoint."""
+        states = []
+        
+        class RecordingChain:
+            def run(self, input_text, state=None):
+                states.append(state)
+                return "done"
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            interrupted = DevelopmentState()
+            interrupted.task_prompt = "a calculator"
+            interrupted.project_name = "calc"
+            interrupted.codes = {"calc.py": "print(1)\n"}
+            interrupted.completed_phases = ["Demand Analysis", "Coding"]
+            save_checkpoint(interrupted, os.path.join(tmp, "calc"))
+            
+            run_project({"task": "a calculator", "name": "calc"}, tmp, RecordingChain, "openai/gpt-4o-mini")
+            run_project({"task": "a todo app", "name": "todo"}, tmp, RecordingChain, "openai/gpt-4o-mini")
+            
+            resumed, fresh = states
+            self.assertEqual(resumed.completed_phases, ["Demand Analysis", "Coding"])
+            self.assertEqual(resumed.output_directory, os.path.join(tmp, "calc"))
+            with open(os.path.join(tmp, "calc", "calc.py")) as f:
+                self.assertEqual(f.read(), "print(1)\n")
+            self.assertEqual(fresh.completed_phases, [])
+            self.assertEqual(fresh.output_directory, tmp)
+            self.assertEqual(fresh.checkpoint_directory, os.path.join(tmp, "todo"))
+            self.assertFalse(os.path.exists(checkpoint_path(os.path.join(tmp, "todo"))))
+
+
+if __name__ == '__main__':
+    unittest.main()
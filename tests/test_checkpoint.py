@@ -0,0 +1,183 @@
+"""Tests for checkpointing and resuming the development state."""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.state import DevelopmentState
+from src.chain import development_chain
+from src.phases import code_review
+from src.tools.checkpoint import checkpoint_path, load_checkpoint, save_checkpoint
+from src.tools.test_reports import TestFailure
+
+
+class FakePhase:
+    """Phase stand-in that counts its runs and can fail once."""
+    
+    def __init__(self, name, fail=False):
+        self.name = name
+        self.fail = fail
+        self.runs = 0
+    
+    def run(self, input_text, state):
+        self.runs += 1
+        if self.fail:
+            self.fail = False
+            raise RuntimeError("worker preempted")
+        state.codes[f"{self.name}.txt"] = self.name
+        return f"{self.name} done"
+
+
+class FakeReviewer:
+    """Reviewer stand-in that always asks for changes."""
+    name = "Reviewer"
+    model = "test/model"
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def query(self, text, context=None):
+        self.calls += 1
+        return "main.py: needs another line"
+
+
+class TestCheckpoint(unittest.TestCase):
+    """Test saving and loading the state."""
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def test_round_trip(self):
+        state = DevelopmentState()
+        state.task_prompt = "Build a calculator"
+        state.language = "Python"
+        state.codes = {"calc.py": "def add(a, b):\n    return a + b\n"}
+        state.tests_passed = False
+        state.test_failures = [TestFailure(test_id="test_add", file="calc.py", line=2, exception="AssertionError")]
+        state.project_name = "calc"
+        state.output_directory = self.directory
+        state.completed_phases = ["Demand Analysis", "Coding"]
+        state.loop_iterations = {"Code Review": 1}
+        state.usage_tracker.record_api_call("Programmer", "Coding", "test/model", 100, 50)
+        path = save_checkpoint(state, self.directory)
+        
+        self.assertEqual(path, checkpoint_path(self.directory))
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["state.json"])
+        restored = load_checkpoint(self.directory)
+        self.assertEqual(restored.to_dict(), state.to_dict())
+        self.assertEqual(restored.test_failures[0].location, "calc.py:2")
+        self.assertEqual(restored.usage_tracker.summary.api_calls[0].input_tokens, 100)
+        self.assertEqual(restored.checkpoint_directory, self.directory)
+    
+    def test_output_directory_is_resolved_from_the_checkpoint(self):
+        state = DevelopmentState()
+        state.project_name = "calc"
+        state.output_directory = "./output"
+        project_directory = os.path.join(self.directory, "calc")
+        save_checkpoint(state, project_directory)
+        self.assertEqual(load_checkpoint(project_directory).output_directory, self.directory)
+        
+        state.completed_phases = ["Demand Analysis", "Coding"]
+        state.output_directory = "./output/calc"
+        save_checkpoint(state, project_directory)
+        self.assertEqual(load_checkpoint(project_directory).output_directory, project_directory)
+    
+    def test_no_directory_no_checkpoint(self):
+        self.assertIsNone(save_checkpoint(DevelopmentState()))
+    
+    def test_missing_checkpoint(self):
+        with self.assertRaises(FileNotFoundError):
+            load_checkpoint(self.directory)
+
+
+class TestResume(unittest.TestCase):
+    """Test that a resumed run does not repeat finished work."""
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.saved = (development_chain.create_demand_analysis_phase, development_chain.create_coding_phase,
+                      development_chain.create_code_review_phase, development_chain.create_testing_phase)
+    
+    def tearDown(self):
+        (development_chain.create_demand_analysis_phase, development_chain.create_coding_phase,
+         development_chain.create_code_review_phase, development_chain.create_testing_phase) = self.saved
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def _chain(self, fail_testing=False):
+        self.phases = [FakePhase("analysis"), FakePhase("coding"), FakePhase("review"),
+                       FakePhase("testing", fail=fail_testing)]
+        development_chain.create_demand_analysis_phase = lambda *args: self.phases[0]
+        development_chain.create_coding_phase = lambda *args: self.phases[1]
+        development_chain.create_code_review_phase = lambda *args: self.phases[2]
+        development_chain.create_testing_phase = lambda *args: self.phases[3]
+        return development_chain.create_development_chain()
+    
+    def test_resume_skips_completed_phases(self):
+        state = DevelopmentState()
+        state.task_prompt = "Build a calculator"
+        state.checkpoint_directory = self.directory
+        result = self._chain(fail_testing=True).run(state.task_prompt, state=state)
+        self.assertTrue(result.startswith("Error in development chain"))
+        
+        resumed = load_checkpoint(self.directory)
+        self.assertEqual(resumed.completed_phases, ["Demand Analysis", "Coding", "Code Review"])
+        result = self._chain().run(resumed.task_prompt, state=resumed)
+        self.assertEqual([phase.runs for phase in self.phases], [0, 0, 0, 1])
+        self.assertIn("Code Review:\nreview done", result)
+        self.assertEqual(load_checkpoint(self.directory).completed_phases,
+                         ["Demand Analysis", "Coding", "Code Review", "Testing"])
+    
+    def test_cancelled_run_stops_without_writing(self):
+        state = DevelopmentState()
+        state.task_prompt = "Build a calculator"
+        state.checkpoint_directory = self.directory
+        chain = self._chain()
+        coding = self.phases[1]
+        
+        def cancel_while_coding(input_text, state):
+            state.cancelled.set()  # e.g. the worker lost the job's lease
+            return FakePhase.run(coding, input_text, state)
+        
+        coding.run = cancel_while_coding
+        result = chain.run(state.task_prompt, state=state)
+        self.assertTrue(result.startswith("Error in development chain: Run cancelled"))
+        self.assertEqual([phase.runs for phase in self.phases], [1, 1, 0, 0])
+        self.assertEqual(load_checkpoint(self.directory).completed_phases, ["Demand Analysis"])
+    
+    def test_resumed_loop_continues_after_done_iterations(self):
+        saved = (code_review.create_reviewer_agent, code_review.create_programmer_agent, code_review.run_fix)
+        reviewer = FakeReviewer()
+        code_review.create_reviewer_agent = lambda model_name: reviewer
+        code_review.create_programmer_agent = lambda model_name: None
+        
+        def add_line(programmer_agent, feedback, state, *args, **kwargs):
+            state.codes = {"main.py": state.codes["main.py"] + "print(2)\n"}
+            return "added a line"
+        code_review.run_fix = add_line
+        try:
+            state = DevelopmentState()
+            state.codes = {"main.py": "print(1)\n"}
+            state.checkpoint_directory = self.directory
+            state.loop_iterations = {"Code Review": 2}
+            code_review.create_code_review_phase(max_iterations=3, syntax_gate=False).run("", state)
+        finally:
+            code_review.create_reviewer_agent, code_review.create_programmer_agent, code_review.run_fix = saved
+        
+        self.assertEqual(reviewer.calls, 1)
+        restored = load_checkpoint(self.directory)
+        self.assertEqual(restored.loop_iterations, {})
+        self.assertEqual(restored.completed_phases, ["Code Review"])
+        self.assertEqual(restored.codes["main.py"], "print(1)\nprint(2)\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
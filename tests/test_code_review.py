@@ -0,0 +1,112 @@
+"""Tests for sharded code review."""
+
+import sys
+import time
+import unittest
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.state import DevelopmentState
+from src.phases.code_review import run_sharded_review
+from src.tools.agent_runner import is_agent_error
+from src.tools.context_builder import group_related_files, make_review_shards
+
+
+class FakeReviewer:
+    """Reviewer stand-in that flags one file and passes the others."""
+    name = "Reviewer"
+    model = "test/model"
+    
+    def __init__(self, flagged):
+        self.flagged = flagged
+        self.prompts = []
+    
+    def query(self, text, context=None):
+        self.prompts.append((text, context))
+        time.sleep(0.3)
+        if self.flagged in text.splitlines()[0]:
+            return f"{self.flagged}: missing error handling"
+        return "<INFO>Finished</INFO>"
+
+
+class FlakyReviewer(FakeReviewer):
+    """Reviewer stand-in whose calls for the flagged shard fail a number of times."""
+    
+    def __init__(self, flagged, failures):
+        super().__init__(flagged)
+        self.failures = failures
+    
+    def query(self, text, context=None):
+        if self.flagged in text.splitlines()[0] and self.failures:
+            self.failures -= 1
+            self.prompts.append((text, context))
+            raise ConnectionError("connection reset")
+        return super().query(text, context)
+
+
+class TestShardedReview(unittest.TestCase):
+    """Test grouping of files and merging of shard feedback."""
+    
+    def setUp(self):
+        self.state = DevelopmentState()
+        self.state.codes = {
+            "index.html": '<link rel="stylesheet" href="style.css"><script src="app.js"></script>',
+            "style.css": "body { margin: 0; }",
+            "app.js": "document.title = 'x';",
+            "main.py": "from helpers import add\nprint(add(1, 2))",
+            "helpers.py": "def add(a, b):\n    return a + b",
+            "cli.py": "import sys\n" + "print(sys.argv)\n" * 200,
+        }
+    
+    def test_related_files_are_grouped(self):
+        """Test that imports and links keep files in the same shard."""
+        groups = group_related_files(self.state.codes)
+        self.assertIn(["index.html", "style.css", "app.js"], groups)
+        self.assertIn(["main.py", "helpers.py"], groups)
+        self.assertEqual(make_review_shards(self.state.codes, 100),
+                         [["index.html", "style.css", "app.js", "main.py", "helpers.py"], ["cli.py"]])
+    
+    def test_shards_run_in_parallel_and_merge(self):
+        """Test concurrent shard calls and a report that only passes when all shards pass."""
+        reviewer = FakeReviewer(flagged="cli.py")
+        start = time.time()
+        report = run_sharded_review(reviewer, self.state, max_tokens=100)
+        elapsed = time.time() - start
+        
+        self.assertEqual(len(reviewer.prompts), 2)
+        self.assertLess(elapsed, 0.55)
+        self.assertNotIn("<INFO>Finished</INFO>", report)
+        self.assertIn("### cli.py\ncli.py: missing error handling", report)
+        self.assertIn("No issues found.", report)
+        # Each shard sees its own files in full and the others as outlines
+        _, context = reviewer.prompts[0]
+        self.assertIn("cli.py (outline)", context)
+        self.assertIn("return a + b", context)
+        self.assertEqual(len(self.state.usage_tracker.summary.api_calls), 2)
+        
+        report = run_sharded_review(FakeReviewer(flagged="nothing"), self.state, max_tokens=100)
+        self.assertTrue(report.startswith("<INFO>Finished</INFO>"))
+
+    
+    def test_failed_shard_is_retried(self):
+        """Test that a shard whose call fails once is reviewed again, without the error in the report."""
+        reviewer = FlakyReviewer(flagged="cli.py", failures=1)
+        report = run_sharded_review(reviewer, self.state, max_tokens=100)
+        self.assertEqual(len(reviewer.prompts), 3)
+        self.assertNotIn("Error", report)
+        self.assertIn("### cli.py\ncli.py: missing error handling", report)
+        self.assertEqual(self.state.iteration_error, "")
+    
+    def test_failing_shard_returns_the_error(self):
+        """Test that a shard that keeps failing turns the review into an error, not feedback."""
+        reviewer = FlakyReviewer(flagged="cli.py", failures=2)
+        report = run_sharded_review(reviewer, self.state, max_tokens=100)
+        self.assertTrue(is_agent_error(report))
+        self.assertEqual(self.state.iteration_error, report)
+        self.assertNotIn("###", report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+"""Tests for the coding phase."""
+
+import sys
+import unittest
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.state import DevelopmentState
+from src.phases import coding
+
+
+class FakeAgent:
+    """Agent stand-in that streams its response to the file callback."""
+    model = "test/model"
+    
+    def __init__(self, name, response):
+        self.name = name
+        self.response = response
+    
+    def query(self, text, stream=False, on_file=None, context=None):
+        if stream and on_file:
+            on_file("main.py", "print('hi')")
+        return self.response
+
+
+class TestCodingPhase(unittest.TestCase):
+    """Test the coding phase's calls and usage records."""
+    
+    def setUp(self):
+        self.saved = (coding.create_cto_agent, coding.create_programmer_agent)
+        coding.create_cto_agent = lambda model_name: FakeAgent("CTO", "<INFO>Python</INFO>")
+        coding.create_programmer_agent = lambda model_name: FakeAgent(
+            "Programmer", "main.py\n```python\nprint('hi')\n```")
+    
+    def tearDown(self):
+        coding.create_cto_agent, coding.create_programmer_agent = self.saved
+    
+    def test_streamed_call_is_recorded_under_coding(self):
+        state = DevelopmentState()
+        state.task_prompt = "Say hi"
+        coding.create_coding_phase(stream=True).run("", state)
+        calls = state.usage_tracker.summary.api_calls
+        self.assertEqual([(call.agent_name, call.phase) for call in calls],
+                         [("CTO", "Coding"), ("Programmer", "Coding")])
+        self.assertEqual(state.codes, {"main.py": "print('hi')"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""Tests for token-budgeted code context."""
+
+import sys
+import unittest
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.state import DevelopmentState
+from src.tools.code_manager import format_code_for_prompt
+from src.tools.context_builder import build_code_context, outline_code
+
+
+LARGE_MODULE = (
+    "import os\n\n"
+    "class Store:\n"
+    "    \"\"\"Key-value store.\"\"\"\n"
+    "    def get(self, key):\n"
+    "        return self.data[key]\n\n"
+    "def main():\n" + "    print('step')\n" * 400
+)
+
+
+class TestContextBuilder(unittest.TestCase):
+    """Test budgeted formatting of code files."""
+    
+    def setUp(self):
+        self.codes = {
+            "main.py": LARGE_MODULE,
+            "util.py": "def helper():\n    return 1\n",
+            "app.js": "function start() {\n" + "  tick();\n" * 400 + "}\n",
+        }
+    
+    def test_unlimited_budget_is_unchanged(self):
+        """Test that the full format is used when everything fits."""
+        state = DevelopmentState()
+        state.codes = self.codes
+        self.assertEqual(state.get_codes_formatted(), format_code_for_prompt(self.codes))
+        self.assertEqual(state.get_codes_formatted(budget=100_000), format_code_for_prompt(self.codes))
+    
+    def test_python_outline(self):
+        """Test that outlines keep imports and signatures but drop bodies."""
+        outline = outline_code("main.py", LARGE_MODULE)
+        self.assertIn("import os", outline)
+        self.assertIn("def get(self, key):", outline)
+        self.assertIn('"""Key-value store."""', outline)
+        self.assertNotIn("print('step')", outline)
+    
+    def test_budget_keeps_relevant_files(self):
+        """Test that files named in the hint stay complete and the rest are outlined."""
+        context = build_code_context(self.codes, budget=2000,
+                                     hint='File "/tmp/project/main.py", line 9, in main')
+        self.assertEqual(context.full, ["main.py", "util.py"])
+        self.assertEqual(context.outlined, ["app.js"])
+        self.assertIn("print('step')", context.text)
+        self.assertIn("app.js (outline)", context.text)
+        self.assertNotIn("tick();", context.text)
+        self.assertIn("Outline only", context.text)
+    
+    def test_outlines_dropped_when_over_budget(self):
+        """Test that outlines are omitted (and reported) when even they do not fit."""
+        context = build_code_context(self.codes, budget=10, hint="util.py")
+        self.assertEqual(context.full, ["util.py"])
+        self.assertEqual(sorted(context.omitted), ["app.js", "main.py"])
+        self.assertIn("Not shown", context.text)
+
+
+if __name__ == '__main__':
+    unittest.main()
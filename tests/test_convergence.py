@@ -0,0 +1,127 @@
+"""Tests for early termination of review and test loops."""
+
+import sys
+import unittest
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.state import DevelopmentState
+from src.phases import code_review
+from src.tools.convergence import ConvergenceTracker, hash_codes
+
+
+VERSION_A = {"main.py": "print(1)\n"}
+VERSION_B = {"main.py": "print(2)\n"}
+
+
+class FakeReviewer:
+    """Reviewer stand-in that always asks for changes."""
+    name = "Reviewer"
+    model = "test/model"
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def query(self, text, context=None):
+        self.calls += 1
+        return "main.py: print the other number"
+
+
+class FailingAgent:
+    """Agent stand-in whose calls fail, as on a transient API error."""
+    name = "Programmer"
+    model = "test/model"
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def query(self, text, context=None):
+        self.calls += 1
+        raise ConnectionError("connection reset")
+
+
+class TestConvergenceTracker(unittest.TestCase):
+    """Test fixed point and oscillation detection."""
+    
+    def test_hash_ignores_file_order(self):
+        codes = {"a.py": "x = 1\n", "b.py": "y = 2\n"}
+        self.assertEqual(hash_codes(codes), hash_codes(dict(reversed(list(codes.items())))))
+        self.assertNotEqual(hash_codes(codes), hash_codes({"a.py": "x = 1\n", "b.py": "y = 3\n"}))
+    
+    def test_progress_continues(self):
+        tracker = ConvergenceTracker()
+        self.assertIsNone(tracker.record(hash_codes(VERSION_A), VERSION_B, "feedback"))
+        self.assertIsNone(tracker.record(hash_codes(VERSION_B), {"main.py": "print(3)\n"}, "feedback"))
+    
+    def test_unchanged_code_is_a_fixed_point(self):
+        tracker = ConvergenceTracker()
+        self.assertIsNone(tracker.record(hash_codes(VERSION_A), VERSION_B, "feedback", False))
+        reason = tracker.record(hash_codes(VERSION_B), VERSION_B, "feedback", False)
+        self.assertTrue(reason.startswith("fixed point"))
+    
+    def test_returning_code_is_an_oscillation(self):
+        tracker = ConvergenceTracker()
+        self.assertIsNone(tracker.record(hash_codes(VERSION_A), VERSION_B, "use 2"))
+        reason = tracker.record(hash_codes(VERSION_B), VERSION_A, "use 1")
+        self.assertEqual(reason, "oscillation: the fix brought the code back to the version iteration 1 started from")
+
+
+class TestReviewLoop(unittest.TestCase):
+    """Test that the review loop stops when fixes change nothing."""
+    
+    def setUp(self):
+        self.saved = (code_review.create_reviewer_agent, code_review.create_programmer_agent, code_review.run_fix)
+        self.reviewer = FakeReviewer()
+        code_review.create_reviewer_agent = lambda model_name: self.reviewer
+        code_review.create_programmer_agent = lambda model_name: None
+        self.state = DevelopmentState()
+        self.state.codes = dict(VERSION_A)
+    
+    def tearDown(self):
+        code_review.create_reviewer_agent, code_review.create_programmer_agent, code_review.run_fix = self.saved
+    
+    def _run(self, fix):
+        code_review.run_fix = lambda programmer_agent, feedback, state, *args, **kwargs: fix(state)
+        phase = code_review.create_code_review_phase(max_iterations=5, syntax_gate=False)
+        phase.run("", self.state)
+    
+    def test_stops_when_the_fix_changes_nothing(self):
+        self._run(lambda state: "no changes")
+        self.assertEqual(self.reviewer.calls, 1)
+    
+    def test_stops_on_oscillation(self):
+        def flip(state):
+            state.codes = dict(VERSION_B if state.codes == VERSION_A else VERSION_A)
+            return "flipped"
+        self._run(flip)
+        self.assertEqual(self.reviewer.calls, 2)
+        self.assertEqual(self.state.codes, VERSION_A)
+    
+    def test_runs_while_the_code_changes(self):
+        def bump(state):
+            state.codes = {"main.py": state.codes["main.py"] + "# more\n"}
+            return "changed"
+        self._run(bump)
+        self.assertEqual(self.reviewer.calls, 5)
+
+    
+    def test_failed_fix_is_not_a_fixed_point(self):
+        code_review.run_fix = self.saved[2]
+        programmer = FailingAgent()
+        code_review.create_programmer_agent = lambda model_name: programmer
+        code_review.create_code_review_phase(max_iterations=3, syntax_gate=False).run("", self.state)
+        self.assertEqual((self.reviewer.calls, programmer.calls), (3, 3))
+        self.assertTrue(self.state.iteration_error.startswith("Error running agent Programmer"))
+    
+    def test_failed_review_is_not_fixed(self):
+        reviewer = FailingAgent()
+        code_review.create_reviewer_agent = lambda model_name: reviewer
+        fixes = []
+        self._run(lambda state: fixes.append(1))
+        self.assertEqual((reviewer.calls, fixes), (5, []))
+
+
+if __name__ == '__main__':
+    unittest.main()
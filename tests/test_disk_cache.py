@@ -0,0 +1,55 @@
+"""Tests for the persistent LRU disk cache."""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.tools.disk_cache import DiskCache
+
+
+class TestDiskCache(unittest.TestCase):
+    """Test storage, LRU eviction and expiry."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.cache_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.cache_dir, "cache.sqlite3")
+    
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+    
+    def test_hit_and_miss(self):
+        """Test that stored values round-trip and counters update."""
+        cache = DiskCache(self.path)
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", {"text": "hello"})
+        self.assertEqual(cache.get("a"), {"text": "hello"})
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = DiskCache(self.path, max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+    
+    def test_expiry(self):
+        """Test that entries older than max_age_seconds are discarded."""
+        cache = DiskCache(self.path, max_age_seconds=-1)
+        cache.put("a", 1)
+        self.assertIsNone(cache.get("a"))
+
+
+if __name__ == "__main__":
+    unittest.main()
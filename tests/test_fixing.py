@@ -0,0 +1,140 @@
+"""Tests for feedback splitting and parallel per-file fixes."""
+
+import re
+import sys
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.state import DevelopmentState
+from src.phases.fixing import run_fix
+from config.agent_configs import CONTEXT_TOKEN_BUDGETS
+from src.tools.feedback_parser import split_feedback
+
+
+CODES = {
+    "main.py": "from utils import add\n\nprint(add(1, 2))\n",
+    "utils.py": "def add(a, b):\n    return a - b\n",
+    "README.md": "# Calculator\n",
+}
+
+
+class FakeProgrammer:
+    """Programmer stand-in that rewrites the file named in the prompt."""
+    name = "Programmer"
+    model = "test/model"
+    
+    def __init__(self, patch=False):
+        self.patch = patch
+        self.prompts = []
+    
+    def query(self, text, context=None):
+        self.prompts.append(text)
+        time.sleep(0.3)
+        filename = re.search(r"\w+\.py", text).group(0)
+        if self.patch:
+            return (f"{filename}\n```\n<<<<<<< SEARCH\nnot in the file\n=======\nx = 1\n>>>>>>> REPLACE\n```"
+                    if "SEARCH/REPLACE" in text else f"{filename}\n```python\n# full {filename}\n```")
+        # Also emits another existing file, which must be ignored
+        return f"{filename}\n```python\n# fixed {filename}\n```\n\nREADME.md\n```markdown\n# clobbered\n```"
+
+
+class TestSplitFeedback(unittest.TestCase):
+    """Test the assignment of feedback items to files."""
+    
+    def test_items_go_to_the_files_they_name(self):
+        feedback = ("Issues found:\n"
+                    "1. utils.py: add() subtracts instead of adding\n"
+                    "2. main.py does not handle errors\n"
+                    "3. Consider adding type hints everywhere")
+        result = split_feedback(CODES, feedback)
+        self.assertEqual(result.files, {
+            "utils.py": ["1. utils.py: add() subtracts instead of adding"],
+            "main.py": ["2. main.py does not handle errors"],
+        })
+        self.assertEqual(result.general, ["Issues found:", "3. Consider adding type hints everywhere"])
+        self.assertIn("General feedback", result.for_file("main.py"))
+    
+    def test_items_under_file_headings(self):
+        feedback = ("### main.py, utils.py\n- The result is wrong\n\n"
+                    "### README.md\nNo issues found.\n\n"
+                    "**utils.py**\n- Missing docstring\n  on add()\n\n"
+                    "## Summary\nOverall fine")
+        result = split_feedback(CODES, feedback)
+        self.assertEqual(result.files, {
+            "main.py": ["- The result is wrong"],
+            "utils.py": ["- The result is wrong", "- Missing docstring\n  on add()"],
+        })
+        self.assertEqual(result.general, ["Overall fine"])
+
+
+class TestParallelFix(unittest.TestCase):
+    """Test concurrent per-file Programmer calls."""
+    
+    def setUp(self):
+        self.state = DevelopmentState()
+        self.state.codes = dict(CODES)
+        self.state.project_name = ""
+        self.state.output_directory = None
+    
+    def test_files_are_fixed_concurrently_and_merged(self):
+        programmer = FakeProgrammer()
+        feedback = "- utils.py: wrong operator\n- main.py: no error handling"
+        start = time.time()
+        run_fix(programmer, feedback, self.state, "Code Review", parallel=True)
+        elapsed = time.time() - start
+        
+        self.assertEqual(len(programmer.prompts), 2)
+        self.assertLess(elapsed, 0.55)
+        self.assertEqual(self.state.codes["utils.py"], "# fixed utils.py")
+        self.assertEqual(self.state.codes["main.py"], "# fixed main.py")
+        self.assertEqual(self.state.codes["README.md"], "# Calculator\n")
+        self.assertNotIn("README.md", " ".join(programmer.prompts))
+    
+    def test_single_file_feedback_uses_one_call(self):
+        programmer = FakeProgrammer()
+        run_fix(programmer, "Fix utils.py: wrong operator", self.state, "Code Review", parallel=True)
+        self.assertEqual(len(programmer.prompts), 1)
+    
+    def test_patch_conflicts_fall_back_to_full_files(self):
+        programmer = FakeProgrammer(patch=True)
+        feedback = "- utils.py: wrong operator\n- main.py: no error handling"
+        run_fix(programmer, feedback, self.state, "Testing", fix_mode="patch", parallel=True)
+        self.assertEqual(len(programmer.prompts), 4)
+        self.assertEqual(self.state.codes["utils.py"], "# full utils.py")
+        self.assertEqual(self.state.codes["main.py"], "# full main.py")
+
+
+
+class TestOutlinedFiles(unittest.TestCase):
+    """Test that files shown only as outlines are not overwritten by a fix."""
+    
+    def test_outlined_file_is_not_overwritten(self):
+        big = "".join(f"def helper_{index}(x):\n    return x + {index}\n\n" for index in range(300))
+        state = DevelopmentState()
+        state.codes = {"utils.py": "def add(a, b):\n    return a - b\n", "helpers.py": big}
+        state.output_directory = None
+        
+        class StubbingProgrammer(FakeProgrammer):
+            def query(self, text, context=None):
+                self.prompts.append((text, context))
+                return ("utils.py\n```python\ndef add(a, b):\n    return a + b\n```\n\n"
+                        "helpers.py\n```python\ndef helper_0(x): ...\n```")
+        
+        programmer = StubbingProgrammer()
+        with patch.dict(CONTEXT_TOKEN_BUDGETS, {"Programmer": 2500}):
+            run_fix(programmer, "utils.py: add() subtracts", state, "Code Review", parallel=False)
+        
+        prompt, context = programmer.prompts[0]
+        self.assertIn("helpers.py (outline)", context)
+        self.assertIn("do not output them", prompt)
+        self.assertEqual(state.codes["utils.py"], "def add(a, b):\n    return a + b")
+        self.assertEqual(state.codes["helpers.py"], big)
+
+
+if __name__ == '__main__':
+    unittest.main()
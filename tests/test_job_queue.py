@@ -0,0 +1,78 @@
+"""Tests for the durable job queue."""
+
+import os
+import sys
+import time
+import tempfile
+import unittest
+import multiprocessing
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.tools.job_queue import JobQueue, QUEUED, RUNNING, DONE, FAILED
+
+
+def _lease_and_crash(path):
+    """Lease a job and die without reporting back."""
+    JobQueue(path).lease("crashing-worker", lease_seconds=0.2)
+    os._exit(1)
+
+
+class TestJobQueue(unittest.TestCase):
+    """Test leasing, heartbeats and requeueing of jobs."""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "jobs.sqlite3")
+        self.queue = JobQueue(self.path)
+    
+    def tearDown(self):
+        self.queue.close()
+        self.tmp.cleanup()
+    
+    def test_fifo_lease_and_complete(self):
+        """Test that jobs are leased in order and results are stored."""
+        first = self.queue.enqueue("a calculator", "calc", {"model": "m"})
+        second = self.queue.enqueue("a todo app", "todo")
+        
+        job = self.queue.lease("w1", lease_seconds=60)
+        self.assertEqual((job.id, job.status, job.attempts, job.params), (first, RUNNING, 1, {"model": "m"}))
+        self.assertEqual(self.queue.lease("w2", lease_seconds=60).id, second)
+        self.assertIsNone(self.queue.lease("w3", lease_seconds=60))
+        
+        self.assertTrue(self.queue.heartbeat(first, "w1", 60))
+        self.assertFalse(self.queue.heartbeat(first, "w2", 60))
+        self.assertTrue(self.queue.complete(first, "w1", {"files": ["main.py"]}))
+        self.assertEqual(self.queue.get(first).result, {"files": ["main.py"]})
+        self.assertTrue(self.queue.fail(second, "w2", "boom"))
+        self.assertEqual(self.queue.counts(), {QUEUED: 0, RUNNING: 0, DONE: 1, FAILED: 1})
+        
+        self.assertTrue(self.queue.retry(second))
+        self.assertEqual(self.queue.get(second).status, QUEUED)
+    
+    def test_crashed_worker_job_is_requeued(self):
+        """Test that a job whose worker died is leased again after its lease expires."""
+        job_id = self.queue.enqueue("a game", "game", max_attempts=2)
+        process = multiprocessing.Process(target=_lease_and_crash, args=(self.path,))
+        process.start()
+        process.join()
+        self.assertEqual(self.queue.get(job_id).status, RUNNING)
+        
+        time.sleep(0.3)
+        job = self.queue.lease("w2", lease_seconds=0.2)
+        self.assertEqual((job.id, job.attempts), (job_id, 2))
+        # The crashed worker's late report is rejected
+        self.assertFalse(self.queue.complete(job_id, "crashing-worker", {}))
+        
+        # After max_attempts expired leases the job fails instead of looping forever
+        time.sleep(0.3)
+        self.assertIsNone(self.queue.lease("w3", lease_seconds=0.2))
+        job = self.queue.get(job_id)
+        self.assertEqual(job.status, FAILED)
+        self.assertIn("Lease expired", job.error)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""Tests for patch-mode fixes."""
+
+import sys
+import unittest
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.state import DevelopmentState
+from src.tools.code_manager import apply_patches
+
+
+CODES = {
+    "main.py": "import os\n\ndef add(a, b):\n    return a - b\n\n\ndef main():\n    print(add(1, 2))\n",
+    "util.py": "X = 1\n",
+}
+
+
+class TestPatches(unittest.TestCase):
+    """Test applying SEARCH/REPLACE blocks and unified diffs."""
+    
+    def test_search_replace(self):
+        """Test an exact SEARCH/REPLACE edit."""
+        text = ("main.py\n```python\n<<<<<<< SEARCH\n    return a - b\n=======\n"
+                "    return a + b\n>>>>>>> REPLACE\n```\n")
+        result = apply_patches(CODES, text)
+        self.assertEqual(result.failed, [])
+        self.assertEqual(list(result.codes), ["main.py"])
+        self.assertIn("return a + b", result.codes["main.py"])
+        self.assertIn("return a - b", CODES["main.py"])
+    
+    def test_unified_diff_and_new_file(self):
+        """Test hunks with drifted whitespace and a file created from /dev/null."""
+        text = ("```diff\n--- a/main.py\n+++ b/main.py\n@@ -3,2 +3,2 @@\n def add(a, b):\n"
+                "-    return a - b   \n+    return a + b\n--- /dev/null\n+++ b/new.py\n"
+                "@@ -0,0 +1 @@\n+print('new')\n```\n")
+        result = apply_patches(CODES, text)
+        self.assertEqual(result.failed, [])
+        self.assertIn("return a + b", result.codes["main.py"])
+        self.assertEqual(result.codes["new.py"], "print('new')")
+    
+    def test_fuzzy_match_keeps_indentation(self):
+        """Test that a slightly wrong SEARCH still applies with the file's indentation."""
+        text = ("main.py\n<<<<<<< SEARCH\ndef main():\n  print(add(1,2))\n=======\n"
+                "def main():\n  print(add(1, 3))\n>>>>>>> REPLACE\n")
+        result = apply_patches(CODES, text)
+        self.assertIn("\n    print(add(1, 3))\n", result.codes["main.py"])
+    
+    def test_fences_inside_edits(self):
+        """Test edits to a markdown file whose text contains fenced blocks."""
+        codes = {"README.md": "# App\n\n```bash\npip install app\n```\n\nRun it.\n"}
+        text = ("README.md\n```markdown\n<<<<<<< SEARCH\n```bash\npip install app\n```\n=======\n"
+                "```bash\npip install app\napp --help\n```\n>>>>>>> REPLACE\n```\n")
+        result = apply_patches(codes, text)
+        self.assertEqual(result.failed, [])
+        self.assertEqual(result.codes["README.md"],
+                         "# App\n\n```bash\npip install app\napp --help\n```\n\nRun it.\n")
+    
+    def test_longer_fence_is_closed_only_by_its_own_length(self):
+        """Test a block opened with four backticks around edits that contain a bare fence."""
+        codes = {"docs.md": "Example:\n```\nold\n```\n"}
+        text = ("docs.md\n````\n<<<<<<< SEARCH\nold\n```\n=======\nnew\n```\n>>>>>>> REPLACE\n```\n"
+                "<<<<<<< SEARCH\nExample:\n=======\nUsage:\n>>>>>>> REPLACE\n````\n")
+        result = apply_patches(codes, text)
+        self.assertEqual(result.failed, [])
+        self.assertEqual(result.codes["docs.md"], "Usage:\n```\nnew\n```\n")
+    
+    def test_conflict_leaves_file_unchanged(self):
+        """Test that a file with an unmatched edit is reported and not partially patched."""
+        state = DevelopmentState()
+        state.codes = dict(CODES)
+        text = ("main.py\n<<<<<<< SEARCH\n    return a - b\n=======\n    return a + b\n>>>>>>> REPLACE\n"
+                "<<<<<<< SEARCH\nclass Missing:\n    pass\n=======\n>>>>>>> REPLACE\n"
+                "util.py\n<<<<<<< SEARCH\nX = 1\n=======\nX = 2\n>>>>>>> REPLACE\n")
+        failed = state.apply_patches(text)
+        self.assertEqual(failed, ["main.py"])
+        self.assertEqual(state.codes["main.py"], CODES["main.py"])
+        self.assertEqual(state.codes["util.py"], "X = 2\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
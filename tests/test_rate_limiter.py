@@ -0,0 +1,44 @@
+"""Tests for the header-aware rate limiter."""
+
+import sys
+import time
+import asyncio
+import unittest
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.agents.rate_limiter import ModelRateLimiter, retry_delay_from_headers
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test retry hints and adaptive throttling."""
+    
+    def test_retry_after_headers(self):
+        """Test parsing of the supported retry headers."""
+        self.assertEqual(retry_delay_from_headers({"retry-after": "7"}), 7.0)
+        self.assertEqual(retry_delay_from_headers({"retry-after-ms": "250"}), 0.25)
+        self.assertEqual(retry_delay_from_headers({"x-ratelimit-reset-requests": "1m30s"}), 90.0)
+        reset_ms = str(int((time.time() + 10) * 1000))
+        self.assertAlmostEqual(retry_delay_from_headers({"x-ratelimit-reset": reset_ms}), 10.0, delta=1.0)
+        self.assertIsNone(retry_delay_from_headers({}))
+    
+    def test_rate_limited_pauses_model(self):
+        """Test that a 429 halves the rate and blocks until the server's hint."""
+        limiter = ModelRateLimiter("test/model", requests_per_second=4, max_concurrency=2)
+        delay = limiter.on_rate_limited({"retry-after": "0.2"}, attempt=0)
+        self.assertGreaterEqual(delay, 0.2)
+        self.assertEqual(limiter.rate, 2)
+        
+        async def acquire_once():
+            started = time.monotonic()
+            async with limiter:
+                pass
+            return time.monotonic() - started
+        
+        self.assertGreaterEqual(asyncio.run(acquire_once()), 0.2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""Tests for resource-limited test runs with bounded output."""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+import unittest
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.tools.sandbox import read_bounded, resource_limits, run_limited
+
+
+class TestReadBounded(unittest.TestCase):
+    """Test head + tail output capture."""
+    
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+    
+    def tearDown(self):
+        os.remove(self.path)
+    
+    def test_small_output_is_kept(self):
+        with open(self.path, "w") as f:
+            f.write("hello\n")
+        self.assertEqual(read_bounded(self.path, head=10, tail=10), "hello\n")
+    
+    def test_large_output_keeps_head_and_tail(self):
+        with open(self.path, "w") as f:
+            f.write("A" * 100 + "B" * 1000 + "C" * 100)
+        text = read_bounded(self.path, head=100, tail=100)
+        self.assertEqual(text, "A" * 100 + "\n... [1000 bytes of output truncated] ...\n" + "C" * 100)
+
+
+@unittest.skipIf(sys.platform == "win32", "rlimits and process groups are POSIX only")
+class TestRunLimited(unittest.TestCase):
+    """Test limits and process-group cleanup of subprocess runs."""
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def _write(self, name, code):
+        with open(os.path.join(self.directory, name), "w") as f:
+            f.write(code)
+    
+    def test_output_is_bounded(self):
+        self._write("spam.py", "for _ in range(200000):\n    print('x' * 99)\n")
+        result = run_limited([sys.executable, "spam.py"], self.directory, 30)
+        self.assertEqual(result.returncode, 0)
+        self.assertLess(len(result.stdout), 40000)
+        self.assertIn("bytes of output truncated", result.stdout)
+    
+    def test_memory_limit(self):
+        self._write("hog.py", "data = bytearray(8 * 1024 ** 3)\n")
+        limits = dict(resource_limits(python=True), RLIMIT_AS=512 * 1024 * 1024)
+        result = run_limited([sys.executable, "hog.py"], self.directory, 30, limits=limits)
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("MemoryError", result.stderr)
+    
+    def test_limits_are_applied_to_the_command(self):
+        result = run_limited([sys.executable, "-c", "import resource; print(resource.getrlimit(resource.RLIMIT_NOFILE)[0])"],
+                             self.directory, 30, limits={"RLIMIT_NOFILE": 64})
+        self.assertEqual(result.stdout.strip(), "64")
+    
+    def test_missing_executable(self):
+        with self.assertRaises(FileNotFoundError):
+            run_limited(["no-such-executable-here"], self.directory, 30)
+        with self.assertRaises(FileNotFoundError):
+            run_limited(["./missing.py"], self.directory, 30)
+    
+    def test_timeout_kills_background_processes(self):
+        marker = os.path.join(self.directory, "marker")
+        self._write("child.py", f"import time\ntime.sleep(1)\nopen({marker!r}, 'w').close()\n")
+        self._write("spawn.py", "import subprocess, sys, time\n"
+                                "subprocess.Popen([sys.executable, 'child.py'])\n"
+                                "time.sleep(30)\n")
+        start = time.time()
+        with self.assertRaises(subprocess.TimeoutExpired):
+            run_limited([sys.executable, "spawn.py"], self.directory, 0.5)
+        self.assertLess(time.time() - start, 3)
+        time.sleep(1.5)
+        self.assertFalse(os.path.exists(marker))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+"""Tests for the pre-warmed sandbox pool."""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.tools.sandbox_pool import SandboxError, SandboxPool, sandbox_supported
+
+
+@unittest.skipUnless(sandbox_supported(), "fork server needs a POSIX platform")
+class TestSandboxPool(unittest.TestCase):
+    """Test runs in children of the warm interpreters."""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = SandboxPool(size=2, preload=["json", "csv"])
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def _write(self, name, code):
+        with open(os.path.join(self.directory, name), "w") as f:
+            f.write(code)
+    
+    def test_script_output_and_exit_code(self):
+        self._write("app.py", "import sys\nprint('hello', sys.argv[1:])\nprint('oops', file=sys.stderr)\nsys.exit(3)\n")
+        result = self.pool.run(["app.py", "x"], self.directory, 10)
+        self.assertEqual((result.returncode, result.stdout, result.stderr), (3, "hello ['x']\n", "oops\n"))
+    
+    def test_traceback_starts_at_user_code(self):
+        self._write("bad.py", "def f():\n    raise ValueError('boom')\nf()\n")
+        result = self.pool.run(["bad.py"], self.directory, 10)
+        self.assertEqual(result.returncode, 1)
+        self.assertIn('File "' + os.path.join(self.directory, "bad.py"), result.stderr.splitlines()[1])
+        self.assertTrue(result.stderr.endswith("ValueError: boom\n"))
+    
+    def test_runs_are_isolated(self):
+        self._write("mutate.py", "import json\njson.dumps = None\nopen('marker', 'w').close()\n")
+        self._write("check.py", "import json, os\nprint(json.dumps([1]), os.path.exists('marker'))\n")
+        self._write("csv.py", "print('local csv')\n")
+        self._write("uses_csv.py", "import csv\n")
+        self.pool.run(["mutate.py"], self.directory, 10)
+        self.assertEqual(self.pool.run(["check.py"], self.directory, 10).stdout, "[1] True\n")
+        # A project module shadows a preloaded one, as it would in a fresh interpreter
+        self.assertEqual(self.pool.run(["uses_csv.py"], self.directory, 10).stdout, "local csv\n")
+        # stdin is closed rather than shared with the caller
+        self._write("ask.py", "input()\n")
+        self.assertIn("EOFError", self.pool.run(["ask.py"], self.directory, 10).stderr)
+    
+    def test_timeout_kills_the_process_group(self):
+        self._write("spin.py", "import subprocess\nsubprocess.Popen(['sleep', '30'])\nwhile True:\n    pass\n")
+        start = time.time()
+        result = self.pool.run(["spin.py"], self.directory, 0.5)
+        self.assertTrue(result.timed_out)
+        self.assertLess(time.time() - start, 3)
+        # The pool keeps working after a killed run
+        self._write("ok.py", "print('ok')\n")
+        self.assertEqual(self.pool.run(["ok.py"], self.directory, 10).stdout, "ok\n")
+    
+    def test_wait_for_a_busy_pool_is_bounded(self):
+        pool = SandboxPool(size=1, preload=[])
+        self._write("slow.py", "import time\ntime.sleep(2)\n")
+        busy = threading.Thread(target=pool.run, args=(["slow.py"], self.directory, 10))
+        busy.start()
+        try:
+            time.sleep(0.3)
+            start = time.time()
+            with self.assertRaises(SandboxError):
+                pool.run(["slow.py"], self.directory, 0.5)
+            self.assertLess(time.time() - start, 1.5)
+        finally:
+            busy.join()
+            pool.close()
+    
+    def test_module_runs(self):
+        self._write("test_sample.py", "import unittest\n\nclass T(unittest.TestCase):\n    def test_it(self):\n        pass\n")
+        result = self.pool.run(["-m", "unittest", "discover", "-s", "."], self.directory, 30)
+        self.assertEqual(result.returncode, 0)
+        self.assertIn("Ran 1 test", result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
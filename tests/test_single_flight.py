@@ -0,0 +1,109 @@
+"""Tests for single-flight request de-duplication."""
+
+import sys
+import time
+import asyncio
+import threading
+import unittest
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.agents.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test that concurrent identical calls are merged."""
+    
+    def test_threads_share_one_call(self):
+        """Test that threads with the same key share the leader's result."""
+        flights = SingleFlight()
+        calls = []
+        results = []
+        
+        def slow_call():
+            calls.append(1)
+            time.sleep(0.2)
+            return "answer"
+        
+        threads = [
+            threading.Thread(target=lambda: results.append(flights.do("key", slow_call)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flights.merged, 4)
+        self.assertEqual(sorted(shared for _, shared in results), [False, True, True, True, True])
+        self.assertTrue(all(result == "answer" for result, _ in results))
+    
+    def test_asyncio_tasks_share_one_call(self):
+        """Test that asyncio tasks with the same key share the leader's result."""
+        flights = SingleFlight()
+        calls = []
+        
+        async def slow_call():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return "answer"
+        
+        async def run_all():
+            return await asyncio.gather(*[flights.ado("key", slow_call) for _ in range(3)])
+        
+        results = asyncio.run(run_all())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flights.merged, 2)
+        self.assertEqual([result for result, _ in results], ["answer"] * 3)
+
+    
+    def test_follower_retries_when_leader_is_cancelled(self):
+        """Test that a follower runs the call itself when the leader is cancelled."""
+        flights = SingleFlight()
+        calls = []
+        
+        async def slow_call():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return "answer"
+        
+        async def run_all():
+            leader = asyncio.ensure_future(flights.ado("key", slow_call))
+            await asyncio.sleep(0.01)
+            follower = asyncio.ensure_future(flights.ado("key", slow_call))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await follower
+        
+        result = asyncio.run(run_all())
+        self.assertEqual(result, ("answer", False))
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(flights.merged, 0)
+    
+    def test_cancelled_follower_leaves_leader_running(self):
+        """Test that cancelling a follower raises in it and not in the leader."""
+        flights = SingleFlight()
+        
+        async def slow_call():
+            await asyncio.sleep(0.1)
+            return "answer"
+        
+        async def run_all():
+            leader = asyncio.ensure_future(flights.ado("key", slow_call))
+            await asyncio.sleep(0.01)
+            follower = asyncio.ensure_future(flights.ado("key", slow_call))
+            await asyncio.sleep(0.01)
+            follower.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await follower
+            return await leader
+        
+        self.assertEqual(asyncio.run(run_all()), ("answer", False))
+        self.assertEqual(flights.merged, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
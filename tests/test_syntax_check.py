@@ -0,0 +1,119 @@
+"""Tests for the local syntax check and the gate before LLM review."""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.state import DevelopmentState
+from src.phases.syntax_gate import run_syntax_gate
+from src.tools import test_runner
+from src.tools.syntax_check import check_syntax
+
+
+class FakeProgrammer:
+    """Programmer stand-in that returns a corrected main.py."""
+    name = "Programmer"
+    model = "test/model"
+    
+    def __init__(self, fixed_code):
+        self.fixed_code = fixed_code
+        self.prompts = []
+    
+    def query(self, text, context=None):
+        self.prompts.append(text)
+        return f"main.py\n```python\n{self.fixed_code}```"
+
+
+class TestCheckSyntax(unittest.TestCase):
+    """Test the per-language checks."""
+    
+    def test_valid_code_passes(self):
+        codes = {"main.py": "def f():\n    return 1\n", "data.json": '{"a": 1}', "README.md": "# {"}
+        self.assertEqual(check_syntax(codes), [])
+    
+    def test_python_errors(self):
+        failures = check_syntax({"b.py": "def f(:\n    pass\n", "a.py": "x = 1\n  y = 2\n"})
+        self.assertEqual([(failure.file, failure.line, failure.exception) for failure in failures],
+                         [("a.py", 2, "IndentationError"), ("b.py", 1, "SyntaxError")])
+        self.assertIn("def f(:", failures[1].details)
+    
+    def test_json_error(self):
+        failure, = check_syntax({"package.json": '{"name": "app",}'})
+        self.assertEqual((failure.file, failure.line, failure.exception), ("package.json", 1, "JSONDecodeError"))
+    
+    @unittest.skipUnless(shutil.which("node"), "node is not installed")
+    def test_javascript_errors(self):
+        failures = check_syntax({"app.js": "function f() {\n  return 1;\n\n",
+                                 "mod.js": "import fs from 'fs';\nexport const x = ;\n",
+                                 "ok.js": "module.exports = 1;\n"})
+        self.assertEqual([(failure.file, failure.line) for failure in failures], [("app.js", 4), ("mod.js", 2)])
+        self.assertEqual(failures[1].exception, "SyntaxError")
+    
+    @unittest.skipUnless(shutil.which("gcc"), "gcc is not installed")
+    def test_missing_system_headers_are_not_errors(self):
+        self.assertEqual(check_syntax({"main.c": "#include <not_installed.h>\nint main(void) { return 0; }\n"}), [])
+        codes = {"main.c": "#include \"util.h\"\nint main(void) { return add(1, 2); }\n",
+                 "util.h": "static int add(int a, int b) {\n    return a +;\n}\n"}
+        failure, = check_syntax(codes)
+        self.assertEqual((failure.file, failure.line), ("util.h", 2))
+
+
+class TestSyntaxGate(unittest.TestCase):
+    """Test that syntax errors go to a fix call before review."""
+    
+    def test_errors_are_fixed_before_review(self):
+        state = DevelopmentState()
+        state.codes = {"main.py": "print('hi'\n"}
+        programmer = FakeProgrammer("print('hi')\n")
+        self.assertEqual(run_syntax_gate(programmer, state), [])
+        self.assertEqual(state.codes["main.py"].strip(), "print('hi')")
+        self.assertEqual(len(programmer.prompts), 1)
+        self.assertIn("main.py", programmer.prompts[0])
+        self.assertIn("SyntaxError", programmer.prompts[0])
+    
+    def test_fix_attempts_are_bounded(self):
+        state = DevelopmentState()
+        state.codes = {"main.py": "print('hi'\n"}
+        programmer = FakeProgrammer("print('still broken'\n")
+        remaining = run_syntax_gate(programmer, state, max_fixes=2)
+        self.assertEqual([failure.file for failure in remaining], ["main.py"])
+        self.assertEqual(len(programmer.prompts), 2)
+    
+    def test_valid_code_makes_no_calls(self):
+        state = DevelopmentState()
+        state.codes = {"main.py": "print('hi')\n"}
+        programmer = FakeProgrammer("")
+        self.assertEqual(run_syntax_gate(programmer, state), [])
+        self.assertEqual(programmer.prompts, [])
+
+
+class TestBasicSyntaxRun(unittest.TestCase):
+    """Test the syntax check used for languages without a test runner."""
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def test_errors_fail_the_run(self):
+        with open(os.path.join(self.directory, "config.json"), "w") as f:
+            f.write("{oops}")
+        run = test_runner._check_basic_syntax(self.directory, "Unknown")
+        self.assertFalse(run.success)
+        self.assertEqual([failure.file for failure in run.failures], ["config.json"])
+    
+    def test_nothing_to_check(self):
+        run = test_runner._check_basic_syntax(self.directory, "Unknown")
+        self.assertTrue(run.success)
+        self.assertIn("No syntax checker", run.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
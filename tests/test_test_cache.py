@@ -0,0 +1,91 @@
+"""Tests for the content-hash test result cache."""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.tools import test_cache
+from src.tools.disk_cache import DiskCache
+from src.tools.test_cache import make_test_cache_key, run_tests_cached
+from src.tools.test_reports import TestFailure, TestRun
+from src.tools.usage_tracker import UsageTracker
+
+
+class TestTestCache(unittest.TestCase):
+    """Test keys, hits across projects and uncacheable runs."""
+    
+    def setUp(self):
+        """Use a private cache and count the real test runs."""
+        self.root = tempfile.mkdtemp()
+        self.saved = (test_cache._cache, test_cache.run_tests)
+        test_cache._cache = DiskCache(os.path.join(self.root, "cache.sqlite3"))
+        self.runs = []
+        
+        def fake_run_tests(directory, language, on_result=None):
+            self.runs.append(directory)
+            output = f"Error in {os.path.abspath(directory)}/main.py: boom"
+            return TestRun(False, output, [TestFailure(test_id="main.py", file="main.py", line=1,
+                                                       exception="ValueError", details=output)])
+        
+        test_cache.run_tests = fake_run_tests
+        self.project_a = self._project("a", {"main.py": "print(1)\n", "lib/util.py": "X = 1\n"})
+        self.project_b = self._project("b", {"main.py": "print(1)\n", "lib/util.py": "X = 1\n"})
+    
+    def tearDown(self):
+        """Restore the module state."""
+        test_cache._cache, test_cache.run_tests = self.saved
+        shutil.rmtree(self.root, ignore_errors=True)
+    
+    def _project(self, name, files):
+        directory = os.path.join(self.root, name)
+        for path, content in files.items():
+            os.makedirs(os.path.dirname(os.path.join(directory, path)), exist_ok=True)
+            with open(os.path.join(directory, path), "w") as f:
+                f.write(content)
+        return directory
+    
+    def test_key_depends_on_content_and_language(self):
+        """Test that only file contents, names and the language change the key."""
+        key = make_test_cache_key(self.project_a, "python")
+        os.makedirs(os.path.join(self.project_a, "__pycache__"))
+        with open(os.path.join(self.project_a, "__pycache__", "main.pyc"), "w") as f:
+            f.write("bytecode")
+        self.assertEqual(make_test_cache_key(self.project_a, "Python"), key)
+        self.assertEqual(make_test_cache_key(self.project_b, "python"), key)
+        self.assertNotEqual(make_test_cache_key(self.project_a, "javascript"), key)
+        with open(os.path.join(self.project_b, "lib", "util.py"), "a") as f:
+            f.write("Y = 2\n")
+        self.assertNotEqual(make_test_cache_key(self.project_b, "python"), key)
+    
+    def test_identical_files_reuse_results(self):
+        """Test hits within and across projects, with paths of the current project."""
+        tracker = UsageTracker()
+        first = run_tests_cached(self.project_a, "python", usage_tracker=tracker)
+        again = run_tests_cached(self.project_a, "python", usage_tracker=tracker)
+        other = run_tests_cached(self.project_b, "python", usage_tracker=tracker)
+        
+        self.assertEqual(self.runs, [self.project_a])
+        self.assertEqual(first, again)
+        output = f"Error in {self.project_b}/main.py: boom"
+        self.assertEqual(other, TestRun(False, output, [TestFailure(test_id="main.py", file="main.py", line=1,
+                                                                     exception="ValueError", details=output)]))
+        summary = tracker.get_summary()
+        self.assertEqual((summary["test_cache_hits"], summary["test_cache_misses"]), (2, 1))
+    
+    def test_timeouts_are_not_cached(self):
+        """Test that timing-dependent results run again."""
+        test_cache.run_tests = lambda directory, language, on_result=None: (
+            self.runs.append(directory) or TestRun(False, "Error running main.py: timed out after 10 seconds"))
+        run_tests_cached(self.project_a, "python")
+        run_tests_cached(self.project_a, "python")
+        self.assertEqual(len(self.runs), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
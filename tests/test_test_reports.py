@@ -0,0 +1,148 @@
+"""Tests for structured failures read from test reports and tool output."""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.tools import test_runner
+from src.tools.test_reports import (
+    format_failures,
+    parse_diagnostics,
+    parse_failures,
+    parse_node_error,
+    parse_tap,
+    parse_unittest_output,
+)
+
+
+TAP_OUTPUT = """TAP version 13
+# Subtest: calc
+    # Subtest: adds
+    not ok 1 - adds
+      ---
+      duration_ms: 1.2
+      location: '/app/calc.test.js:4:3'
+      failureType: 'testCodeFailure'
+      error: |-
+        Expected values to be strictly equal:
+
+        2 !== 3
+
+      code: 'ERR_ASSERTION'
+      name: 'AssertionError'
+      stack: |-
+        add (/app/calc.js:2:10)
+        TestContext.<anonymous> (/app/calc.test.js:5:5)
+        node:internal/test_runner/harness:255:12
+      ...
+    ok 2 - subtracts
+    1..2
+not ok 1 - calc
+  ---
+  duration_ms: 3.1
+  location: '/app/calc.test.js:3:1'
+  failureType: 'subtestsFailed'
+  error: '1 subtest failed'
+  code: 'ERR_TEST_FAILURE'
+  ...
+not ok 2 - later # TODO
+1..2
+# fail 1"""
+
+UNITTEST_OUTPUT = """test_add (test_calc.TestCalc.test_add) ... ok
+test_div (test_calc.TestCalc.test_div) ... ERROR
+
+======================================================================
+ERROR: test_div (test_calc.TestCalc.test_div)
+----------------------------------------------------------------------
+Traceback (most recent call last):
+  File "/app/test_calc.py", line 9, in test_div
+    self.assertEqual(div(1, 0), 0)
+  File "/app/calc.py", line 2, in div
+    return a / b
+ZeroDivisionError: division by zero
+
+----------------------------------------------------------------------
+Ran 2 tests in 0.001s
+
+FAILED (errors=1)"""
+
+
+class TestTextReports(unittest.TestCase):
+    """Test parsing of TAP, unittest, Node and compiler output."""
+
+    def test_tap_lists_failing_tests_not_suites(self):
+        failures = parse_tap(TAP_OUTPUT, "/app")
+        self.assertEqual([failure.summary() for failure in failures],
+                         ["adds (calc.js:2): AssertionError: Expected values to be strictly equal: 2 !== 3"])
+
+    def test_unittest_failures_point_at_project_frame(self):
+        failure, = parse_unittest_output(UNITTEST_OUTPUT, "/app")
+        self.assertEqual((failure.test_id, failure.location), ("test_calc.TestCalc.test_div", "calc.py:2"))
+        self.assertEqual((failure.exception, failure.message), ("ZeroDivisionError", "division by zero"))
+        self.assertTrue(failure.details.startswith("Traceback"))
+
+    def test_node_uncaught_error(self):
+        output = ("/app/app.js:3\n    null.x;\n         ^\n\nTypeError: Cannot read properties of null\n"
+                  "    at main (/app/app.js:3:10)\n    at Module._compile (node:internal/modules/cjs/loader:1364:14)")
+        failure = parse_node_error(output, "app.js", "/app")
+        self.assertEqual(failure.summary(), "app.js (app.js:3): TypeError: Cannot read properties of null")
+
+    def test_compiler_diagnostics(self):
+        output = ("main.c:3:5: error: expected ';' before '}' token\n"
+                  "main.c:9:1: warning: control reaches end of non-void function\n"
+                  "src/app.ts(4,7): error TS2322: Type 'string' is not assignable to type 'number'.\n")
+        self.assertEqual([failure.summary() for failure in parse_diagnostics(output)],
+                         ["main.c (main.c:3): error: expected ';' before '}' token",
+                          "src/app.ts (src/app.ts:4): error TS2322: Type 'string' is not assignable to type 'number'."])
+
+    def test_unknown_output_has_no_failures(self):
+        self.assertEqual(parse_failures("Segmentation fault (core dumped)"), [])
+
+    def test_long_lists_are_cut(self):
+        failures = parse_tap("\n".join(f"not ok {index} - case {index}" for index in range(1, 6)))
+        self.assertEqual(format_failures(failures, max_listed=2),
+                         "5 failing tests:\n- case 1\n- case 2\n... and 3 more")
+
+
+class TestPytestReport(unittest.TestCase):
+    """Test failures read from the JUnit XML report of a real pytest run."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self._write("calc.py", "def div(a, b):\n    return a / b\n")
+        self._write("test_calc.py", "from calc import div\n\n\n"
+                                    "def test_div():\n    assert div(1, 0) == 0\n\n\n"
+                                    "class TestDiv:\n    def test_half(self):\n        assert div(1, 2) == 0.25\n\n\n"
+                                    "def test_ok():\n    assert div(4, 2) == 2\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _write(self, name, code):
+        with open(os.path.join(self.directory, name), "w") as f:
+            f.write(code)
+
+    def test_failures_come_from_the_report(self):
+        run = test_runner._run_python_tests(self.directory, time.monotonic() + 60)
+        self.assertFalse(run.success)
+        self.assertEqual([failure.summary() for failure in run.failures],
+                         ["test_calc.py::test_div (calc.py:2): ZeroDivisionError: division by zero",
+                          "test_calc.py::TestDiv::test_half (test_calc.py:10): AssertionError: assert 0.5 == 0.25"])
+        self.assertFalse(os.path.exists(os.path.join(self.directory, "report.xml")))
+
+    def test_passing_run_has_no_failures(self):
+        self._write("test_calc.py", "from calc import div\n\n\ndef test_ok():\n    assert div(4, 2) == 2\n")
+        run = test_runner._run_python_tests(self.directory, time.monotonic() + 60)
+        self.assertEqual((run.success, run.failures), (True, []))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+"""Tests for concurrent test execution."""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.tools import test_runner
+from src.tools.test_runner import failure_report, parse_test_errors, run_files_parallel
+from src.tools.test_reports import TestRun, parse_failures
+from src.state import DevelopmentState
+from src.phases import testing
+
+
+class TestRunFilesParallel(unittest.TestCase):
+    """Test the bounded parallel file runner."""
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for index in range(4):
+            self._write(f"slow_{index}.py", "import time\ntime.sleep(0.5)\nprint('done')\n")
+        self._write("broken.py", "raise ValueError('boom')\n")
+        self._write("reads_input.py", "input()\n")
+        os.makedirs(os.path.join(self.directory, "__pycache__"))
+        self._write(os.path.join("__pycache__", "ignored.py"), "raise SystemExit(1)\n")
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def _write(self, name, code):
+        with open(os.path.join(self.directory, name), "w") as f:
+            f.write(code)
+    
+    def test_files_run_concurrently_and_stream_results(self):
+        streamed = []
+        start = time.time()
+        run = test_runner._run_python_files(self.directory, time.monotonic() + 30, streamed.append)
+        elapsed = time.time() - start
+        output = run.output
+        
+        self.assertFalse(run.success)
+        self.assertLess(elapsed, 1.9)
+        lines = output.split("\n")
+        self.assertEqual(lines[0].split(":")[0], "Error in broken.py")
+        self.assertIn("slow_3.py: OK", lines)
+        self.assertIn("EOFError", output)
+        self.assertNotIn("ignored.py", output)
+        self.assertEqual([failure.summary() for failure in run.failures],
+                         ["broken.py (broken.py:1): ValueError: boom", "reads_input.py (reads_input.py:1): EOFError: EOF when reading a line"])
+        # Results arrive in completion order: the failing scripts finish before the slow ones
+        self.assertEqual(len(streamed), 6)
+        self.assertTrue(streamed[0].startswith("Error in"))
+    
+    def test_deadline_skips_and_times_out(self):
+        commands = [(f"slow_{index}.py", [sys.executable, f"slow_{index}.py"]) for index in range(4)]
+        start = time.time()
+        results = run_files_parallel(commands, self.directory, time.monotonic() + 0.2, max_workers=2)
+        
+        self.assertLess(time.time() - start, 2)
+        self.assertEqual([success for success, _ in results], [False] * 4)
+        self.assertIn("timed out", results[0][1])
+        self.assertEqual(results[3][1], "Skipped slow_3.py: test deadline reached")
+
+
+
+PYTEST_OUTPUT = """============================= test session starts ==============================
+collected 3 items
+
+test_calc.py::test_add PASSED                                            [ 33%]
+test_calc.py::test_sub PASSED                                            [ 66%]
+test_calc.py::test_div FAILED                                            [100%]
+
+=================================== FAILURES ===================================
+___________________________________ test_div ___________________________________
+    def test_div():
+>       assert div(1, 0) == 0
+E       ZeroDivisionError: division by zero
+calc.py:5: ZeroDivisionError
+=========================== short test summary info ============================
+FAILED test_calc.py::test_div - ZeroDivisionError: division by zero
+========================= 1 failed, 2 passed in 0.05s =========================="""
+
+
+class TestFailureReport(unittest.TestCase):
+    """Test the reduction of test output to its failures."""
+    
+    def test_pytest_output_starts_at_failures(self):
+        report = failure_report(PYTEST_OUTPUT)
+        self.assertTrue(report.startswith("=================================== FAILURES"))
+        self.assertNotIn("test_add", report)
+        self.assertIn("FAILED test_calc.py::test_div", report)
+    
+    def test_error_summary_lists_failures(self):
+        self.assertEqual(parse_test_errors(PYTEST_OUTPUT),
+                         "1 failing test:\n- test_calc.py::test_div (calc.py:5): ZeroDivisionError: division by zero")
+    
+    def test_passing_scripts_are_dropped(self):
+        self.assertEqual(failure_report("a.py: OK\nError in b.py: Traceback\nc.py: OK"), "Error in b.py: Traceback")
+
+
+class FakeAgent:
+    """Agent stand-in recording its prompts."""
+    name = "Tester"
+    model = "test/model"
+    
+    def __init__(self, response):
+        self.response = response
+        self.calls = []
+    
+    def query(self, text, context=None):
+        self.calls.append((text, context))
+        return self.response
+
+
+class TestTesterPolicy(unittest.TestCase):
+    """Test when the Tester is called and what it is sent."""
+    
+    def setUp(self):
+        self.saved = (testing.create_tester_agent, testing.create_programmer_agent,
+                      testing.run_tests_cached, testing.run_fix, testing.get_sandbox_pool)
+        self.tester = FakeAgent("calc.py: div() does not handle zero")
+        testing.create_tester_agent = lambda model_name: self.tester
+        testing.create_programmer_agent = lambda model_name: FakeAgent("")
+        testing.run_fix = lambda *args, **kwargs: "fixed"
+        testing.get_sandbox_pool = lambda: None
+        self.state = DevelopmentState()
+        self.state.output_directory = "project"
+        self.state.language = "python"
+        self.state.codes = {"calc.py": "def div(a, b):\n    return a / b\n", "cli.py": "import sys\n\ndef main():\n    pass\n"}
+    
+    def tearDown(self):
+        (testing.create_tester_agent, testing.create_programmer_agent,
+         testing.run_tests_cached, testing.run_fix, testing.get_sandbox_pool) = self.saved
+    
+    def _run(self, success, output, tester_mode):
+        testing.run_tests_cached = lambda *args, **kwargs: TestRun(success, output,
+                                                                   [] if success else parse_failures(output))
+        return testing.create_testing_phase(max_iterations=1, tester_mode=tester_mode).run("", self.state)
+    
+    def test_passing_tests_skip_the_tester(self):
+        result = self._run(True, "calc.py: OK", "on_failure")
+        self.assertIn("<INFO>No errors</INFO>", result)
+        self.assertEqual(self.tester.calls, [])
+    
+    def test_failures_send_compact_context(self):
+        self._run(False, PYTEST_OUTPUT, "on_failure")
+        prompt, context = self.tester.calls[0]
+        self.assertNotIn("test session starts", prompt)
+        self.assertIn("- test_calc.py::test_div (calc.py:5): ZeroDivisionError: division by zero", prompt)
+        self.assertIn("return a / b", context)
+        self.assertIn("cli.py (outline)", context)
+    
+    def test_loop_continues_on_local_results(self):
+        self._run(False, PYTEST_OUTPUT, "on_failure")
+        self.assertEqual(len(self.state.test_failures), 1)
+        self.assertTrue(testing.test_condition("Test Analysis: no problems left", self.state))
+        self._run(True, "calc.py: OK", "on_failure")
+        self.assertFalse(testing.test_condition("<INFO>No errors</INFO>", self.state))
+    
+    def test_sandbox_pool_starts_when_testing_runs(self):
+        started = []
+        testing.get_sandbox_pool = lambda: started.append(1)
+        phase = testing.create_testing_phase(max_iterations=1)
+        self.assertEqual(started, [])
+        testing.run_tests_cached = lambda *args, **kwargs: TestRun(True, "calc.py: OK")
+        phase.run("", self.state)
+        self.assertEqual(started, [1])
+    
+    def test_always_mode_calls_the_tester(self):
+        self._run(True, "calc.py: OK", "always")
+        prompt, context = self.tester.calls[0]
+        self.assertIn("calc.py: OK", prompt)
+        self.assertNotIn("(outline)", context)
+
+
+if __name__ == '__main__':
+    unittest.main()
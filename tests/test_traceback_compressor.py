@@ -0,0 +1,131 @@
+"""Tests for grouping and compressing test failures."""
+
+import sys
+import unittest
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.tools.context_builder import estimate_tokens
+from src.tools.test_reports import TestFailure
+from src.tools.traceback_compressor import compress_failures, compress_traceback
+
+
+PYTHON_TRACEBACK = """Traceback (most recent call last):
+  File "/app/main.py", line 3, in <module>
+    rec(0)
+  File "/app/main.py", line 2, in rec
+    return rec(n + 1) if n < 50 else requests.get(url)
+           ^^^^^^^^^^
+  File "/app/main.py", line 2, in rec
+    return rec(n + 1) if n < 50 else requests.get(url)
+           ^^^^^^^^^^
+  File "/app/main.py", line 2, in rec
+    return rec(n + 1) if n < 50 else requests.get(url)
+           ^^^^^^^^^^
+  File "/venv/lib/python3.11/site-packages/requests/api.py", line 73, in get
+    return request("get", url, params=params, **kwargs)
+  File "/venv/lib/python3.11/site-packages/requests/api.py", line 59, in request
+    return session.request(method=method, url=url, **kwargs)
+  File "/venv/lib/python3.11/site-packages/requests/sessions.py", line 575, in request
+    prep = self.prepare_request(req)
+ValueError: Invalid URL"""
+
+PYTEST_REPORT = """def test_rec():
+>       rec(0)
+
+test_app.py:8:
+_ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _
+app.py:2: in rec
+    return rec(n + 1)
+app.py:2: in rec
+    return rec(n + 1)
+app.py:2: in rec
+    return rec(n + 1)
+_ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _
+
+n = 3
+
+>   return rec(n + 1)
+E   RecursionError: maximum recursion depth exceeded
+
+app.py:2: RecursionError"""
+
+
+class TestCompressTraceback(unittest.TestCase):
+    """Test collapsing of library and repeated frames."""
+
+    def test_python_traceback(self):
+        self.assertEqual(compress_traceback(PYTHON_TRACEBACK), """Traceback (most recent call last):
+  File "/app/main.py", line 3, in <module>
+    rec(0)
+  File "/app/main.py", line 2, in rec
+    return rec(n + 1) if n < 50 else requests.get(url)
+           ^^^^^^^^^^
+  [previous frame repeated 2 more times]
+  ... 2 library frames ...
+  File "/venv/lib/python3.11/site-packages/requests/sessions.py", line 575, in request
+    prep = self.prepare_request(req)
+ValueError: Invalid URL""")
+
+    def test_pytest_report(self):
+        self.assertEqual(compress_traceback(PYTEST_REPORT), """def test_rec():
+>       rec(0)
+
+test_app.py:8:
+app.py:2: in rec
+    return rec(n + 1)
+[previous frame repeated 2 more times]
+
+n = 3
+
+>   return rec(n + 1)
+E   RecursionError: maximum recursion depth exceeded
+
+app.py:2: RecursionError""")
+
+    def test_node_stack(self):
+        stack = ("TypeError: x is not a function\n    at run (/app/app.js:4:3)\n"
+                 "    at Module._compile (node:internal/modules/cjs/loader:1364:14)\n"
+                 "    at Module.load (node:internal/modules/cjs/loader:1203:32)\n"
+                 "    at main (/app/app.js:9:1)")
+        self.assertEqual(compress_traceback(stack), "TypeError: x is not a function\n    at run (/app/app.js:4:3)\n"
+                                                    "    ... 2 library frames ...\n    at main (/app/app.js:9:1)")
+
+
+class TestCompressFailures(unittest.TestCase):
+    """Test grouping of failures and the token budget."""
+
+    def _failures(self, count, line=2):
+        return [TestFailure(test_id=f"test_app.py::test_zero[{index}]", file="app.py", line=line,
+                            exception="ZeroDivisionError", message="division by zero",
+                            details=f"n = {index}\n>   return a / b\nE   ZeroDivisionError: division by zero")
+                for index in range(count)]
+
+    def test_same_failures_are_sent_once(self):
+        failures = self._failures(8) + [TestFailure(test_id="test_app.py::test_name", file="app.py", line=7,
+                                                    exception="NameError", message="name 'x' is not defined")]
+        report = compress_failures(failures)
+        self.assertTrue(report.startswith("9 failing tests (2 distinct failures):\n"
+                                          "- test_app.py::test_zero[0] (app.py:2): ZeroDivisionError: division by zero\n"
+                                          "    Same failure in 7 more tests: test_app.py::test_zero[1], "))
+        self.assertIn("test_app.py::test_zero[5] and 2 more\n    n = 0\n", report)
+        self.assertEqual(report.count(">   return a / b"), 1)
+        self.assertTrue(report.endswith("- test_app.py::test_name (app.py:7): NameError: name 'x' is not defined"))
+
+    def test_report_stays_within_budget(self):
+        failures = [TestFailure(test_id=f"test_{index}", file=f"mod_{index}.py", line=1, exception="ValueError",
+                                details="\n".join(f"  line {number}" for number in range(200)) + "\nValueError")
+                    for index in range(100)]
+        report = compress_failures(failures, max_tokens=500)
+        self.assertLessEqual(estimate_tokens(report), 500)
+        self.assertIn("- test_0 (mod_0.py:1): ValueError\n    ...\n", report)
+        self.assertTrue(report.endswith("more distinct failures"))
+
+    def test_no_failures(self):
+        self.assertEqual(compress_failures([]), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Tests for per-call usage accounting."""
+
+import sys
+import unittest
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.agents.openrouter_agent import LLMResponse
+from src.tools.usage_tracker import UsageTracker, TokenUsage, get_model_pricing
+
+
+class TestUsageTracker(unittest.TestCase):
+    """Test recording of provider-reported usage."""
+    
+    def test_pricing_prefix_match(self):
+        """Test that dated model names resolve to their base pricing."""
+        self.assertIs(get_model_pricing("openai/gpt-4o-mini-2024-07-18"),
+                      get_model_pricing("openai/gpt-4o-mini"))
+        self.assertIsNone(get_model_pricing("unknown/model"))
+    
+    def test_record_reported_usage(self):
+        """Test that reported tokens are priced with the served model."""
+        tracker = UsageTracker()
+        response = LLMResponse(
+            "done", model="openai/gpt-4o-mini", latency=1.5, finish_reason="length",
+            usage=TokenUsage(prompt_tokens=1000, completion_tokens=100, cached_tokens=400)
+        )
+        tracker.record_response("Reviewer", "Code Review", response,
+                                input_text="x" * 10_000, agent_model="google/gemini-2.5-flash")
+        tracker.finish()
+        
+        call = tracker.summary.api_calls[0]
+        self.assertEqual((call.input_tokens, call.output_tokens, call.cached_input_tokens),
+                         (1000, 100, 400))
+        self.assertFalse(call.estimated)
+        expected = (600 * 0.15 + 400 * 0.075 + 100 * 0.60) / 1_000_000
+        self.assertAlmostEqual(tracker.summary.estimated_cost, expected)
+        
+        summary = tracker.get_summary()
+        self.assertEqual(summary["truncated_calls"], 1)
+        self.assertIn("openai/gpt-4o-mini", summary["calls_by_model"])
+    
+    def test_cached_and_plain_responses(self):
+        """Test zero-cost cache hits and estimation for plain strings."""
+        tracker = UsageTracker()
+        tracker.record_response("CEO", "Demand Analysis", LLMResponse("hit", cached=True),
+                                agent_model="openai/gpt-4o-mini")
+        tracker.record_response("CEO", "Demand Analysis", "Error: boom", input_text="a" * 40)
+        
+        hit, plain = tracker.summary.api_calls
+        self.assertEqual(hit.source, "cache")
+        self.assertEqual(hit.input_tokens + hit.output_tokens, 0)
+        self.assertTrue(plain.estimated)
+        self.assertEqual(plain.input_tokens, 10)
+        self.assertEqual(tracker.summary.cache_hits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()